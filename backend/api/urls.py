@@ -4,5 +4,6 @@ from . import views
 urlpatterns = [
     path('hello/', views.hello_world, name='hello_world'),
     path('status/', views.api_status, name='api_status'),
+    path('status/providers/', views.provider_status, name='provider_status'),
     path('data/', views.sample_data, name='sample_data'),
 ]
@@ -2,6 +2,9 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 
+from common.circuit_breaker import circuit_breaker_status
+from common.model_routing import model_routing_status
+
 
 @api_view(['GET'])
 def hello_world(request):
@@ -27,6 +30,18 @@ def api_status(request):
     })
 
 
+@api_view(['GET'])
+def provider_status(request):
+    """
+    LLM provider circuit breaker status (closed / open / half_open) and per-task
+    model routes with their call counts, tokens, cost and latency for this process
+    """
+    return Response({
+        'providers': circuit_breaker_status(),
+        'tasks': model_routing_status()
+    })
+
+
 @api_view(['GET', 'POST'])
 def sample_data(request):
     """
@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from common.config import (
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+    CIRCUIT_BREAKER_HALF_OPEN_PROBES,
+)
+
+logger = logging.getLogger("django")
+
+PROVIDERS = ("cerebras", "perplexity")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open"""
+
+    def __init__(self, provider: str, retry_in: float):
+        self.provider = provider
+        self.retry_in = retry_in
+        super().__init__(f"{provider} circuit open (provider failing), retry in {retry_in:.0f}s")
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probing.
+
+    closed: calls go through; ``failure_threshold`` failures in a row open it.
+    open: calls fail immediately with CircuitOpenError for ``recovery_timeout``.
+    half_open: up to ``half_open_probes`` calls are let through as probes; a
+    success closes the circuit, a failure re-opens it for another timeout.
+    Every call admitted by before_call() must report record_success() or
+    record_failure(). State is per process and guarded by a lock.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                 recovery_timeout: float = CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+                 half_open_probes: int = CIRCUIT_BREAKER_HALF_OPEN_PROBES):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_probes = half_open_probes
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._last_error = None
+        self._rejected = 0
+
+    def _retry_in(self, now: float) -> float:
+        return max(0.0, self._opened_at + self.recovery_timeout - now)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._retry_in(time.monotonic()) == 0:
+                return self.HALF_OPEN
+            return self._state
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected outright (does not use up a probe)"""
+        return self.state == self.OPEN
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError"""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == self.OPEN:
+                if self._retry_in(now) > 0:
+                    self._rejected += 1
+                    raise CircuitOpenError(self.name, self._retry_in(now))
+                self._state = self.HALF_OPEN
+                self._probes_in_flight = 0
+                logger.info(f"Circuit {self.name}: half-open, probing")
+            if self._state == self.HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_probes:
+                    self._rejected += 1
+                    raise CircuitOpenError(self.name, 0)
+                self._probes_in_flight += 1
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                logger.info(f"Circuit {self.name}: closed after successful probe")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probes_in_flight = 0
+
+    def record_failure(self, error: Optional[BaseException] = None):
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error) if error is not None else None
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit {self.name}: open after {self._failures} consecutive failures ({self._last_error})")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probes_in_flight = 0
+
+    def reset(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probes_in_flight = 0
+            self._last_error = None
+            self._rejected = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly view of the breaker for status endpoints"""
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "retry_in_seconds": round(self._retry_in(time.monotonic()), 1) if state == self.OPEN else 0,
+                "rejected_calls": self._rejected,
+                "last_error": self._last_error,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    """Return the process-wide breaker for a provider"""
+    breaker = _breakers.get(provider)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(provider, CircuitBreaker(provider))
+    return breaker
+
+
+def raise_if_open(*providers: str):
+    """Fail fast before starting work that needs every one of the given providers"""
+    for provider in providers:
+        breaker = get_circuit_breaker(provider)
+        if breaker.is_open():
+            raise CircuitOpenError(provider, breaker.snapshot()["retry_in_seconds"])
+
+
+def circuit_breaker_status() -> Dict[str, Dict[str, Any]]:
+    return {provider: get_circuit_breaker(provider).snapshot() for provider in PROVIDERS}
@@ -0,0 +1,188 @@
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+import requests
+from cerebras.cloud.sdk import AsyncCerebras, Cerebras, DefaultAsyncHttpxClient, DefaultHttpxClient
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from common.config import (
+    CEREBRAS_API_KEY,
+    CEREBRAS_BASE_URL,
+    CEREBRAS_MAX_CONNECTIONS,
+    CEREBRAS_MAX_KEEPALIVE_CONNECTIONS,
+    CEREBRAS_KEEPALIVE_EXPIRY,
+    PERPLEXITY_POOL_SIZE,
+    PERPLEXITY_CONNECT_TIMEOUT,
+    PERPLEXITY_READ_TIMEOUT,
+    PERPLEXITY_MAX_RETRIES,
+    PERPLEXITY_RETRY_BACKOFF,
+)
+
+logger = logging.getLogger("django")
+
+# One long-lived client per (api key, base URL) pair, shared by every thread
+_cerebras_clients: Dict[Tuple[str, str], Cerebras] = {}
+_cerebras_lock = threading.Lock()
+
+
+def get_cerebras_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> Cerebras:
+    """
+    Return the process-wide Cerebras client for the given credentials.
+
+    The client is built once with a keep-alive connection pool and reused by
+    every caller, so only the first request pays client setup and TLS handshake.
+    The SDK's httpx transport is thread-safe, so the same instance can be used
+    from the research thread pool.
+    """
+    api_key = api_key if api_key is not None else CEREBRAS_API_KEY
+    base_url = base_url or CEREBRAS_BASE_URL or None
+    key = (api_key, base_url or "")
+
+    client = _cerebras_clients.get(key)
+    if client is not None:
+        return client
+
+    with _cerebras_lock:
+        # Another thread may have built it while we were waiting for the lock
+        client = _cerebras_clients.get(key)
+        if client is None:
+            http_client = DefaultHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=CEREBRAS_MAX_CONNECTIONS,
+                    max_keepalive_connections=CEREBRAS_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=CEREBRAS_KEEPALIVE_EXPIRY,
+                )
+            )
+            # The SDK's TCP warming is a blocking request on the calling thread; the
+            # pool warms up on the first real call instead
+            client = Cerebras(api_key=api_key, base_url=base_url, http_client=http_client, warm_tcp_connection=False)
+            _cerebras_clients[key] = client
+            logger.info(f"Created pooled Cerebras client for {base_url or 'default endpoint'}")
+        return client
+
+
+def close_cerebras_clients():
+    """
+    Close and forget every pooled Cerebras client
+    """
+    with _cerebras_lock:
+        for client in _cerebras_clients.values():
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close Cerebras client: {e}")
+        _cerebras_clients.clear()
+
+
+# requests.Session is not guaranteed thread-safe, so each thread gets its own
+# session, but all of them mount the same adapter and therefore share one
+# urllib3 connection pool (and its keep-alive connections)
+_perplexity_adapter: Optional[HTTPAdapter] = None
+_perplexity_local = threading.local()
+_perplexity_lock = threading.Lock()
+
+
+def _build_perplexity_adapter() -> HTTPAdapter:
+    """
+    Build the pooled adapter with transport-level retries for Perplexity
+    """
+    retry = Retry(
+        total=PERPLEXITY_MAX_RETRIES,
+        backoff_factor=PERPLEXITY_RETRY_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        # Chat completions are safe to replay, so POST is retried as well
+        allowed_methods=frozenset(["GET", "POST"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    return HTTPAdapter(
+        pool_connections=PERPLEXITY_POOL_SIZE,
+        pool_maxsize=PERPLEXITY_POOL_SIZE,
+        max_retries=retry,
+    )
+
+
+def get_perplexity_session() -> requests.Session:
+    """
+    Return this thread's pooled session for Perplexity API calls.
+
+    Every session mounts the same HTTPAdapter, so TCP+TLS connections to the
+    API are reused across research phases, companies and threads.
+    """
+    global _perplexity_adapter
+
+    with _perplexity_lock:
+        if _perplexity_adapter is None:
+            _perplexity_adapter = _build_perplexity_adapter()
+        adapter = _perplexity_adapter
+
+    session = getattr(_perplexity_local, "session", None)
+    if session is not None and session.get_adapter("https://") is adapter:
+        return session
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    _perplexity_local.session = session
+    return session
+
+
+def close_perplexity_sessions():
+    """
+    Close the shared Perplexity connection pool; sessions are rebuilt lazily
+    """
+    global _perplexity_adapter
+
+    with _perplexity_lock:
+        if _perplexity_adapter is not None:
+            _perplexity_adapter.close()
+            _perplexity_adapter = None
+
+
+def build_async_cerebras_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> AsyncCerebras:
+    """
+    Build an AsyncCerebras client with the same pool limits as the sync one.
+
+    Async clients are bound to the event loop they are used on, so they are
+    not registered globally: the caller owns the client and should close it
+    (``async with``) when its batch is done.
+    """
+    api_key = api_key if api_key is not None else CEREBRAS_API_KEY
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=CEREBRAS_MAX_CONNECTIONS,
+            max_keepalive_connections=CEREBRAS_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=CEREBRAS_KEEPALIVE_EXPIRY,
+        )
+    )
+    # TCP warming in the SDK is a blocking call, which must not run on the event loop
+    return AsyncCerebras(
+        api_key=api_key,
+        base_url=base_url or CEREBRAS_BASE_URL or None,
+        http_client=http_client,
+        warm_tcp_connection=False,
+    )
+
+
+def build_async_perplexity_client() -> httpx.AsyncClient:
+    """
+    Build an httpx.AsyncClient configured like the pooled Perplexity session.
+
+    Status-code retries are handled by ask_perplexity_async; the transport
+    only retries failed connection attempts.
+    """
+    # Pool limits belong to the transport once a custom transport is supplied
+    transport = httpx.AsyncHTTPTransport(
+        retries=PERPLEXITY_MAX_RETRIES,
+        limits=httpx.Limits(
+            max_connections=PERPLEXITY_POOL_SIZE,
+            max_keepalive_connections=PERPLEXITY_POOL_SIZE,
+        ),
+    )
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(PERPLEXITY_READ_TIMEOUT, connect=PERPLEXITY_CONNECT_TIMEOUT),
+        transport=transport,
+    )
@@ -1,4 +1,81 @@
+import os
+
 from decouple import config as env_config
 
 PERPLEXITY_API_KEY = env_config("PERPLEXITY_API_KEY", default="")
 CEREBRAS_API_KEY = env_config("CEREBRAS_API_KEY", default="")
+
+# Cerebras client pool
+CEREBRAS_BASE_URL = env_config("CEREBRAS_BASE_URL", default="")
+CEREBRAS_MAX_CONNECTIONS = env_config("CEREBRAS_MAX_CONNECTIONS", default=100, cast=int)
+CEREBRAS_MAX_KEEPALIVE_CONNECTIONS = env_config("CEREBRAS_MAX_KEEPALIVE_CONNECTIONS", default=20, cast=int)
+CEREBRAS_KEEPALIVE_EXPIRY = env_config("CEREBRAS_KEEPALIVE_EXPIRY", default=60.0, cast=float)
+
+# Perplexity session pool
+PERPLEXITY_BASE_URL = env_config("PERPLEXITY_BASE_URL", default="https://api.perplexity.ai")
+PERPLEXITY_POOL_SIZE = env_config("PERPLEXITY_POOL_SIZE", default=20, cast=int)
+PERPLEXITY_CONNECT_TIMEOUT = env_config("PERPLEXITY_CONNECT_TIMEOUT", default=5.0, cast=float)
+PERPLEXITY_READ_TIMEOUT = env_config("PERPLEXITY_READ_TIMEOUT", default=120.0, cast=float)
+PERPLEXITY_MAX_RETRIES = env_config("PERPLEXITY_MAX_RETRIES", default=3, cast=int)
+PERPLEXITY_RETRY_BACKOFF = env_config("PERPLEXITY_RETRY_BACKOFF", default=1.0, cast=float)
+
+# Async research engine
+RESEARCH_MAX_IN_FLIGHT = env_config("RESEARCH_MAX_IN_FLIGHT", default=200, cast=int)
+CEREBRAS_ASYNC_CONCURRENCY = env_config("CEREBRAS_ASYNC_CONCURRENCY", default=32, cast=int)
+PERPLEXITY_ASYNC_CONCURRENCY = env_config("PERPLEXITY_ASYNC_CONCURRENCY", default=32, cast=int)
+# Batched parsing: up to this many companies share one Cerebras parse request (1 disables batching)
+CEREBRAS_PARSE_BATCH_SIZE = env_config("CEREBRAS_PARSE_BATCH_SIZE", default=1, cast=int)
+CEREBRAS_PARSE_BATCH_TOKENS = env_config("CEREBRAS_PARSE_BATCH_TOKENS", default=24000, cast=int)  # Estimated research tokens per batch
+CEREBRAS_PARSE_BATCH_WAIT = env_config("CEREBRAS_PARSE_BATCH_WAIT", default=0.05, cast=float)  # Seconds a partial batch waits
+# Structured output: parse tasks request schema-constrained JSON (response_format) from their model
+CEREBRAS_STRUCTURED_OUTPUT = env_config("CEREBRAS_STRUCTURED_OUTPUT", default=False, cast=bool)
+
+# Model routing (see common.model_routing): per-task overrides as
+# "task=model/temperature/max_tokens" pairs, comma separated; empty parts keep the default
+MODEL_ROUTE_OVERRIDES = env_config("MODEL_ROUTE_OVERRIDES", default="")
+# USD per million tokens as "model=prompt/completion" pairs, comma separated, for per-task cost
+MODEL_PRICES = env_config("MODEL_PRICES", default="")
+
+# LLM response cache
+LLM_CACHE_ENABLED = env_config("LLM_CACHE_ENABLED", default=True, cast=bool)
+LLM_CACHE_PATH = env_config(
+    "LLM_CACHE_PATH",
+    default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "llm_cache.sqlite3"),
+)
+LLM_CACHE_MAX_BYTES = env_config("LLM_CACHE_MAX_BYTES", default=256 * 1024 * 1024, cast=int)
+# Perplexity answers come from live web search and go stale quickly;
+# low-temperature Cerebras parses of the same text are effectively deterministic
+LLM_CACHE_TTL_PERPLEXITY = env_config("LLM_CACHE_TTL_PERPLEXITY", default=24 * 60 * 60, cast=int)
+LLM_CACHE_TTL_CEREBRAS = env_config("LLM_CACHE_TTL_CEREBRAS", default=30 * 24 * 60 * 60, cast=int)
+
+# Report prompt budget (estimated tokens for the data part of the prompt)
+REPORT_PROMPT_TOKEN_BUDGET = env_config("REPORT_PROMPT_TOKEN_BUDGET", default=12000, cast=int)
+
+# Client-side rate limits (token buckets shared by every thread and worker process).
+# Off by default: set RATE_LIMIT_ENABLED together with the per-minute limits of your
+# account's quota, or the limiter caps throughput below what the account allows
+RATE_LIMIT_ENABLED = env_config("RATE_LIMIT_ENABLED", default=False, cast=bool)
+RATE_LIMIT_PATH = env_config(
+    "RATE_LIMIT_PATH",
+    default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rate_limits.sqlite3"),
+)
+# Requests and tokens per minute for each provider; 0 disables that bucket
+CEREBRAS_RPM = env_config("CEREBRAS_RPM", default=30, cast=int)
+CEREBRAS_TPM = env_config("CEREBRAS_TPM", default=60000, cast=int)
+PERPLEXITY_RPM = env_config("PERPLEXITY_RPM", default=50, cast=int)
+PERPLEXITY_TPM = env_config("PERPLEXITY_TPM", default=0, cast=int)
+# Per-model overrides as "provider:model=rpm/tpm" pairs, comma separated
+RATE_LIMIT_MODEL_OVERRIDES = env_config("RATE_LIMIT_MODEL_OVERRIDES", default="")
+# Completion tokens reserved up front; the difference is settled from reported usage
+RATE_LIMIT_COMPLETION_TOKENS = env_config("RATE_LIMIT_COMPLETION_TOKENS", default=1500, cast=int)
+
+# Per-provider circuit breakers
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = env_config("CIRCUIT_BREAKER_FAILURE_THRESHOLD", default=5, cast=int)
+CIRCUIT_BREAKER_RECOVERY_TIMEOUT = env_config("CIRCUIT_BREAKER_RECOVERY_TIMEOUT", default=30.0, cast=float)
+CIRCUIT_BREAKER_HALF_OPEN_PROBES = env_config("CIRCUIT_BREAKER_HALF_OPEN_PROBES", default=1, cast=int)
+
+# Research freshness: how long each Perplexity phase's raw text stays fresh (seconds)
+RESEARCH_TTL_BASIC = env_config("RESEARCH_TTL_BASIC", default=30 * 24 * 60 * 60, cast=int)
+RESEARCH_TTL_CONTACTS = env_config("RESEARCH_TTL_CONTACTS", default=14 * 24 * 60 * 60, cast=int)
+RESEARCH_TTL_COMPETITORS = env_config("RESEARCH_TTL_COMPETITORS", default=14 * 24 * 60 * 60, cast=int)
+RESEARCH_TTL_NEWS = env_config("RESEARCH_TTL_NEWS", default=24 * 60 * 60, cast=int)
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from common.config import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_PATH,
+    LLM_CACHE_MAX_BYTES,
+    LLM_CACHE_TTL_PERPLEXITY,
+    LLM_CACHE_TTL_CEREBRAS,
+)
+
+logger = logging.getLogger("django")
+
+PROVIDER_TTLS = {
+    "perplexity": LLM_CACHE_TTL_PERPLEXITY,
+    "cerebras": LLM_CACHE_TTL_CEREBRAS,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_responses_last_access ON llm_responses (last_access);
+CREATE INDEX IF NOT EXISTS llm_responses_expires_at ON llm_responses (expires_at);
+"""
+
+
+def make_cache_key(provider: str, model: str, temperature: float, seed: Optional[int], prompt: str) -> str:
+    """
+    Content-addressed key: provider, model, temperature, seed and a hash of the prompt
+    """
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    material = json.dumps([provider, model, float(temperature), seed, prompt_hash])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed LLM response cache with per-provider TTLs and LRU eviction.
+
+    Entries are JSON-serialised responses. Reads bump ``last_access``; once the
+    stored payload exceeds ``max_bytes`` the least recently used entries are
+    evicted (expired entries first). SQLite in WAL mode makes the file safe to
+    share between threads (one connection each) and worker processes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = LLM_CACHE_MAX_BYTES, ttls: Dict[str, int] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(PROVIDER_TTLS if ttls is None else ttls)
+        self.hits = Counter()
+        self.misses = Counter()
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, counter: Counter, provider: str):
+        with self._counter_lock:
+            counter[provider] += 1
+
+    def get(self, provider: str, key: str) -> Optional[Any]:
+        """Return the cached response, or None on a miss or expired entry"""
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT response, expires_at FROM llm_responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            self._count(self.misses, provider)
+            return None
+        with conn:
+            conn.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key))
+        self._count(self.hits, provider)
+        return json.loads(row[0])
+
+    def set(self, provider: str, key: str, model: str, response: Any, ttl: Optional[int] = None):
+        """Store a response; ``ttl`` defaults to the provider's configured TTL"""
+        ttl = self.ttls.get(provider, 0) if ttl is None else ttl
+        if ttl <= 0:
+            return
+        payload = json.dumps(response)
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses "
+                "(key, provider, model, response, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, payload, len(payload), now, now + ttl, now),
+            )
+        self._evict()
+
+    def _evict(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (time.time(),))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = conn.execute("SELECT key, size FROM llm_responses ORDER BY last_access ASC")
+            evict = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                evict.append((key,))
+                total -= size
+            conn.executemany("DELETE FROM llm_responses WHERE key = ?", evict)
+            logger.info(f"LLM cache evicted {len(evict)} least recently used entries")
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM llm_responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus current entry count and size"""
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+        ).fetchone()
+        with self._counter_lock:
+            hits, misses = dict(self.hits), dict(self.misses)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Return the process-wide response cache, or None when caching is disabled
+    """
+    global _response_cache
+
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                try:
+                    _response_cache = ResponseCache(LLM_CACHE_PATH)
+                except Exception as e:
+                    logger.error(f"LLM response cache unavailable: {e}")
+                    return None
+    return _response_cache
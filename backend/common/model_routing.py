@@ -0,0 +1,198 @@
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from common.config import MODEL_ROUTE_OVERRIDES, MODEL_PRICES
+
+logger = logging.getLogger("django")
+
+CEREBRAS_DEFAULT_MODEL = "deepseek-r1-distill-llama-70b"
+PERPLEXITY_DEFAULT_MODEL = "sonar-pro"
+
+
+class ModelRoute:
+    """Provider, model, sampling temperature and completion cap for one LLM task"""
+
+    def __init__(self, provider: str, model: str, temperature: float, max_tokens: Optional[int] = None):
+        self.provider = provider
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens  # None leaves the provider default
+
+    def __repr__(self):
+        return f"ModelRoute({self.provider}:{self.model}, temperature={self.temperature}, max_tokens={self.max_tokens})"
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+
+
+# One route per task; the provider is fixed by the call site, everything
+# else can be changed per environment with MODEL_ROUTE_OVERRIDES
+DEFAULT_ROUTES = {
+    "company_parse": ModelRoute("cerebras", CEREBRAS_DEFAULT_MODEL, 0.1),
+    "contact_parse": ModelRoute("cerebras", CEREBRAS_DEFAULT_MODEL, 0.1),
+    "email": ModelRoute("cerebras", CEREBRAS_DEFAULT_MODEL, 0.3),
+    "single_report": ModelRoute("cerebras", CEREBRAS_DEFAULT_MODEL, 0.3),
+    "portfolio_report": ModelRoute("cerebras", CEREBRAS_DEFAULT_MODEL, 0.3),
+    "discovery": ModelRoute("perplexity", PERPLEXITY_DEFAULT_MODEL, 0.3),
+    "research": ModelRoute("perplexity", PERPLEXITY_DEFAULT_MODEL, 0.1),
+    # Untagged generate_text/stream_text calls (e.g. scripts written before routing)
+    "default": ModelRoute("cerebras", CEREBRAS_DEFAULT_MODEL, 0.3),
+}
+
+
+def parse_route_overrides(spec: str) -> Dict[str, Tuple[Optional[str], Optional[float], Optional[int]]]:
+    """
+    Parse "task=model/temperature/max_tokens,..." into {task: (model, temperature, max_tokens)}
+
+    Trailing parts may be omitted and empty parts keep the default, e.g.
+    "email=llama3.1-8b,single_report=//4000".
+    """
+    overrides = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            task, settings = entry.split("=", 1)
+            parts = [part.strip() for part in settings.split("/")]
+            if len(parts) > 3:
+                raise ValueError(entry)
+            parts += [""] * (3 - len(parts))
+            model, temperature, max_tokens = parts
+            overrides[task.strip()] = (
+                model or None,
+                float(temperature) if temperature else None,
+                int(max_tokens) if max_tokens else None,
+            )
+        except ValueError:
+            logger.warning(f"Ignoring malformed model route override: {entry!r}")
+    return overrides
+
+
+def parse_model_prices(spec: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Parse "model=input/output,..." (USD per million prompt / completion tokens) into {model: (input, output)}
+    """
+    prices = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            model, rates = entry.split("=", 1)
+            prompt_rate, completion_rate = rates.split("/", 1)
+            prices[model.strip()] = (float(prompt_rate), float(completion_rate))
+        except ValueError:
+            logger.warning(f"Ignoring malformed model price: {entry!r}")
+    return prices
+
+
+def build_routes(overrides: Dict[str, Tuple[Optional[str], Optional[float], Optional[int]]]) -> Dict[str, ModelRoute]:
+    """Default routes with the per-environment overrides applied"""
+    routes = {}
+    for task, route in DEFAULT_ROUTES.items():
+        model, temperature, max_tokens = overrides.get(task, (None, None, None))
+        routes[task] = ModelRoute(
+            route.provider,
+            model or route.model,
+            route.temperature if temperature is None else temperature,
+            route.max_tokens if max_tokens is None else max_tokens,
+        )
+    for task in set(overrides) - set(DEFAULT_ROUTES):
+        logger.warning(f"Ignoring model route override for unknown task {task!r}")
+    return routes
+
+
+ROUTES = build_routes(parse_route_overrides(MODEL_ROUTE_OVERRIDES))
+
+
+def get_route(task: str) -> ModelRoute:
+    return ROUTES[task]
+
+
+def route_kwargs(task: str, model: Optional[str] = None, temp: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Keyword arguments routing an ask_*/stream_* call in common.utils to the task's model
+
+    A model or temp passed by the caller overrides the route's.
+    """
+    route = ROUTES[task]
+    return {
+        "model": model or route.model,
+        "temp": route.temperature if temp is None else temp,
+        "max_tokens": route.max_tokens,
+        "task": task,
+    }
+
+
+class TaskUsage:
+    """
+    Per-task LLM call counts, tokens, cost and latency for this process
+
+    Calls answered from the response cache are counted separately and add
+    no tokens, cost or latency. Cost is only reported for models listed in
+    MODEL_PRICES. Guarded by a lock; safe to share across threads.
+    """
+
+    def __init__(self, prices: Dict[str, Tuple[float, float]] = None):
+        self.prices = dict(parse_model_prices(MODEL_PRICES) if prices is None else prices)
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, task: str, model: str, latency: float, prompt_tokens: Optional[int] = None,
+               completion_tokens: Optional[int] = None, cached: bool = False, error: bool = False):
+        with self._lock:
+            usage = self._tasks.setdefault(task, {
+                "calls": 0, "cached_calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "cost_usd": 0.0, "priced": False, "latency_total": 0.0, "latency_max": 0.0, "models": set(),
+            })
+            usage["models"].add(model)
+            if cached:
+                usage["cached_calls"] += 1
+                return
+            usage["calls"] += 1
+            usage["errors"] += int(error)
+            usage["latency_total"] += latency
+            usage["latency_max"] = max(usage["latency_max"], latency)
+            usage["prompt_tokens"] += prompt_tokens or 0
+            usage["completion_tokens"] += completion_tokens or 0
+            price = self.prices.get(model)
+            if price is not None:
+                usage["priced"] = True
+                usage["cost_usd"] += ((prompt_tokens or 0) * price[0] + (completion_tokens or 0) * price[1]) / 1_000_000
+
+    def reset(self):
+        with self._lock:
+            self._tasks.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """JSON-friendly per-task totals for status endpoints"""
+        with self._lock:
+            return {
+                task: {
+                    "calls": usage["calls"],
+                    "cached_calls": usage["cached_calls"],
+                    "errors": usage["errors"],
+                    "prompt_tokens": usage["prompt_tokens"],
+                    "completion_tokens": usage["completion_tokens"],
+                    "cost_usd": round(usage["cost_usd"], 6) if usage["priced"] else None,
+                    "avg_latency_ms": round(usage["latency_total"] * 1000 / usage["calls"]) if usage["calls"] else 0,
+                    "max_latency_ms": round(usage["latency_max"] * 1000),
+                    "models": sorted(usage["models"]),
+                }
+                for task, usage in self._tasks.items()
+            }
+
+
+_task_usage = TaskUsage()
+
+
+def get_task_usage() -> TaskUsage:
+    """Return the process-wide task usage tracker"""
+    return _task_usage
+
+
+def model_routing_status() -> Dict[str, Dict[str, Any]]:
+    """Each task's route together with its usage so far"""
+    usage = _task_usage.snapshot()
+    return {task: {**route.snapshot(), "usage": usage.get(task)} for task, route in ROUTES.items()}
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from common.config import (
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_PATH,
+    CEREBRAS_RPM,
+    CEREBRAS_TPM,
+    PERPLEXITY_RPM,
+    PERPLEXITY_TPM,
+    RATE_LIMIT_MODEL_OVERRIDES,
+    RATE_LIMIT_COMPLETION_TOKENS,
+)
+
+logger = logging.getLogger("django")
+
+# (requests per minute, tokens per minute); 0 means unlimited
+PROVIDER_LIMITS = {
+    "cerebras": (CEREBRAS_RPM, CEREBRAS_TPM),
+    "perplexity": (PERPLEXITY_RPM, PERPLEXITY_TPM),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    name TEXT PRIMARY KEY,
+    level REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def parse_model_overrides(spec: str) -> Dict[Tuple[str, str], Tuple[int, int]]:
+    """
+    Parse "provider:model=rpm/tpm,..." into {(provider, model): (rpm, tpm)}
+    """
+    overrides = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            target, limits = entry.split("=", 1)
+            provider, model = target.split(":", 1)
+            rpm, tpm = limits.split("/", 1)
+            overrides[(provider.strip(), model.strip())] = (int(rpm), int(tpm))
+        except ValueError:
+            logger.warning(f"Ignoring malformed rate limit override: {entry!r}")
+    return overrides
+
+
+def estimate_request_tokens(*texts: str, completion_tokens: int = RATE_LIMIT_COMPLETION_TOKENS) -> int:
+    """Prompt tokens (about 4 characters each) plus the completion allowance"""
+    return sum(math.ceil(len(text) / 4) for text in texts if text) + completion_tokens
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests and tokens per minute, per provider and model.
+
+    Each (provider, model) pair has a request bucket and a token bucket that
+    refill continuously at limit/60 per second up to one minute of quota.
+    Callers reserve capacity before sending; a reservation may take a bucket
+    negative, and the caller then sleeps until it has refilled, so concurrent
+    callers queue behind each other instead of all firing and backing off.
+    Bucket levels live in SQLite (WAL, BEGIN IMMEDIATE), which makes the
+    quota shared by every thread and worker process on the host.
+    """
+
+    def __init__(self, path: str, limits: Dict[str, Tuple[int, int]] = None,
+                 model_limits: Dict[Tuple[str, str], Tuple[int, int]] = None):
+        self.path = path
+        self.limits = dict(PROVIDER_LIMITS if limits is None else limits)
+        self.model_limits = dict(parse_model_overrides(RATE_LIMIT_MODEL_OVERRIDES) if model_limits is None else model_limits)
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode so reserve() can take the write lock explicitly
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def limits_for(self, provider: str, model: str) -> Tuple[int, int]:
+        """(rpm, tpm) for a model, falling back to the provider defaults"""
+        return self.model_limits.get((provider, model), self.limits.get(provider, (0, 0)))
+
+    def _adjust(self, provider: str, model: str, amounts: Dict[str, float]) -> float:
+        """Refill the named buckets, subtract the amounts and return the wait until none is negative"""
+        rpm, tpm = self.limits_for(provider, model)
+        per_minute = {"requests": rpm, "tokens": tpm}
+        conn = self._connection()
+        now = time.time()
+        wait = 0.0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for kind, amount in amounts.items():
+                limit = per_minute[kind]
+                if limit <= 0:
+                    continue
+                name = f"{provider}:{model}:{kind}"
+                row = conn.execute("SELECT level, updated_at FROM rate_buckets WHERE name = ?", (name,)).fetchone()
+                rate = limit / 60.0
+                level = limit if row is None else row[0] + (now - row[1]) * rate
+                level = min(limit, level) - amount
+                level = min(limit, level)  # Refunds never overfill the bucket
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (name, level, updated_at) VALUES (?, ?, ?)",
+                    (name, level, now),
+                )
+                if level < 0:
+                    wait = max(wait, -level / rate)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def reserve(self, provider: str, model: str, tokens: int) -> float:
+        """Reserve one request and ``tokens`` tokens; returns the seconds to wait before sending"""
+        return self._adjust(provider, model, {"requests": 1, "tokens": tokens})
+
+    async def settle_async(self, provider: str, model: str, reserved: int, used: Optional[int]):
+        """asyncio variant of settle(), run off the event loop"""
+        await asyncio.to_thread(self.settle, provider, model, reserved, used)
+
+    def settle(self, provider: str, model: str, reserved: int, used: Optional[int]):
+        """Return (or charge) the difference between reserved and reported token usage"""
+        if used is None or used == reserved:
+            return
+        self._adjust(provider, model, {"tokens": used - reserved})
+
+    def acquire(self, provider: str, model: str, tokens: int) -> float:
+        """Block until the reservation fits the quota; returns the time waited"""
+        wait = self.reserve(provider, model, tokens)
+        if wait > 0:
+            logger.info(f"Rate limiter: waiting {wait:.2f}s for {provider}/{model} quota")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, provider: str, model: str, tokens: int) -> float:
+        """asyncio variant of acquire(); the blocking SQLite reservation runs off the event loop"""
+        wait = await asyncio.to_thread(self.reserve, provider, model, tokens)
+        if wait > 0:
+            logger.info(f"Rate limiter: waiting {wait:.2f}s for {provider}/{model} quota")
+            await asyncio.sleep(wait)
+        return wait
+
+    def reset(self):
+        self._connection().execute("DELETE FROM rate_buckets")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Current (not yet refilled) bucket levels keyed by bucket name"""
+        rows = self._connection().execute("SELECT name, level, updated_at FROM rate_buckets").fetchall()
+        return {name: {"level": level, "updated_at": updated_at} for name, level, updated_at in rows}
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Return the process-wide rate limiter, or None when rate limiting is disabled
+    """
+    global _rate_limiter
+
+    if not RATE_LIMIT_ENABLED:
+        return None
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                try:
+                    _rate_limiter = RateLimiter(RATE_LIMIT_PATH)
+                except Exception as e:
+                    logger.error(f"Rate limiter unavailable: {e}")
+                    return None
+    return _rate_limiter
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+logger = logging.getLogger("django")
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+
+    The first caller for a key (the leader) runs the work; callers that
+    arrive while it is in flight wait on the leader's future and receive
+    the same result or exception. The key is released as soon as the work
+    finishes, so later calls run afresh. Thread and asyncio callers share
+    the same flights: a coroutine can wait on a flight led by a thread and
+    vice versa.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Future] = {}
+        self.shared = 0
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = Future()
+            self._flights[key] = future
+            return future, True
+
+    def _land(self, key: str, future: Future, result: Any = None, error: BaseException = None):
+        with self._lock:
+            self._flights.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._flights
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn() unless the same key is already in flight; either way return its result"""
+        if not key:
+            return fn()
+        future, leader = self._join(key)
+        if not leader:
+            logger.info(f"{self.name}: joining in-flight call for {key!r}")
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._land(key, future, error=e)
+            raise
+        self._land(key, future, result)
+        return result
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """asyncio variant of do(); fn is a coroutine function"""
+        if not key:
+            return await fn()
+        future, leader = self._join(key)
+        if not leader:
+            logger.info(f"{self.name}: joining in-flight call for {key!r}")
+            return await asyncio.wrap_future(future)
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._land(key, future, error=e)
+            raise
+        self._land(key, future, result)
+        return result
+
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Return the process-wide single-flight group with the given name"""
+    group = _groups.get(name)
+    if group is None:
+        with _groups_lock:
+            group = _groups.setdefault(name, SingleFlight(name))
+    return group
@@ -1,84 +1,455 @@
+import asyncio
+import json
 import logging
 import os
 import sys
 import typing
 import socket
 import random
-from cerebras.cloud.sdk import Cerebras
-import re
 import time
-from common.config import PERPLEXITY_API_KEY, CEREBRAS_API_KEY
+from common.config import (
+    PERPLEXITY_API_KEY,
+    CEREBRAS_API_KEY,
+    PERPLEXITY_BASE_URL,
+    PERPLEXITY_CONNECT_TIMEOUT,
+    PERPLEXITY_READ_TIMEOUT,
+    PERPLEXITY_MAX_RETRIES,
+    PERPLEXITY_RETRY_BACKOFF,
+)
+from common.clients import (
+    get_cerebras_client,
+    get_perplexity_session,
+    build_async_cerebras_client,
+    build_async_perplexity_client,
+)
+from common.llm_cache import get_response_cache, make_cache_key
+from common.rate_limit import get_rate_limiter, estimate_request_tokens
+from common.circuit_breaker import get_circuit_breaker
+from common.model_routing import get_task_usage
 from typing import Tuple
 
 logger = logging.getLogger("django")
 
+CEREBRAS_MAX_RETRIES = 3
+CEREBRAS_BASE_DELAY = 2  # Start with 2 second delay
+CEREBRAS_SEED = 42
 
-def ask_cerebras(question, context, model = "deepseek-r1-distill-llama-70b", temp=1.0):
+
+def _cache_lookup(provider, model, temp, seed, question, context, use_cache, response_format=None, max_tokens=None):
+    """
+    Return (cache, key, cached_response) for a call; cache is None when disabled
+    """
+    cache = get_response_cache() if use_cache else None
+    if cache is None:
+        return None, None, None
+    material = [context, question]
+    # Optional request settings only enter the key when set, so plain calls keep their keys
+    options = {name: value for name, value in (("response_format", response_format), ("max_tokens", max_tokens))
+               if value is not None}
+    if options:
+        material.append(options)
+    key = make_cache_key(provider, model, temp, seed, json.dumps(material, sort_keys=True))
+    return cache, key, cache.get(provider, key)
+
+
+def _cache_store(cache, provider, key, model, result):
+    # Error strings ("Error: ...") and unexpected payloads are never cached
+    if cache is None:
+        return
+    if provider == "perplexity" and not (isinstance(result, dict) and 'content' in result):
+        return
+    if provider == "cerebras" and (not isinstance(result, str) or result.startswith("Error")):
+        return
     try:
-        cerebras_api_key = CEREBRAS_API_KEY
-        os.environ["CEREBRAS_API_KEY"] = cerebras_api_key
-        cerebras_client = Cerebras()
+        cache.set(provider, key, model, result)
+    except Exception as e:
+        logger.warning(f"Failed to write LLM response cache: {e}")
 
-        max_retries = 3
-        base_delay = 2  # Start with 2 second delay
-        
-        for retry_count in range(max_retries + 1):
+
+def _cerebras_request(model, question, context, temp, response_format=None, max_tokens=None, **extra):
+    # Keyword arguments for chat.completions.create; response_format and
+    # max_tokens are only sent when set, so models without structured output
+    # support still work and the provider default cap applies otherwise
+    request = dict(
+        model=model,
+        messages=[
+            {"role": "user", "content": _build_cerebras_message(question, context)}
+        ],
+        temperature=temp,
+        seed=CEREBRAS_SEED,
+        **extra
+    )
+    if response_format is not None:
+        request["response_format"] = response_format
+    if max_tokens is not None:
+        request["max_tokens"] = max_tokens
+    return request
+
+
+def _build_cerebras_message(question, context):
+    random_id = random.randint(1000, 9999)
+
+    # Clearer separation between context, instructions and expected output format
+    return f"Request ID: {random_id}\n\n===== CONTEXT =====\n{context}\n\n===== INSTRUCTIONS =====\n{question}\n\n"
+
+
+def _clean_cerebras_content(content):
+    # Remove any text between <think> and </think> tags (same filter the streaming path uses)
+    think_filter = ThinkBlockFilter()
+    clean_content = think_filter.feed(content.strip()) + think_filter.flush()
+
+    return clean_content.strip()
+
+
+def _is_rate_limit_error(error_message):
+    return "429" in error_message or "request_quota_exceeded" in error_message or "too_many_requests" in error_message
+
+
+def _rate_limit_delay(retry_count):
+    # Calculate exponential backoff delay with jitter
+    return CEREBRAS_BASE_DELAY * (2 ** retry_count) + random.uniform(0, 1)
+
+
+def _reserve_quota(provider, model, question, context):
+    """
+    Wait for client-side rate limit capacity before a request.
+
+    Returns the number of tokens reserved (0 when limiting is off or the
+    limiter failed - a broken limiter must never block the API call).
+    """
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return 0
+    tokens = estimate_request_tokens(question, context)
+    try:
+        limiter.acquire(provider, model, tokens)
+    except Exception as e:
+        logger.warning(f"Rate limiter error, sending without a reservation: {e}")
+        return 0
+    return tokens
+
+
+async def _reserve_quota_async(provider, model, question, context):
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return 0
+    tokens = estimate_request_tokens(question, context)
+    try:
+        await limiter.acquire_async(provider, model, tokens)
+    except Exception as e:
+        logger.warning(f"Rate limiter error, sending without a reservation: {e}")
+        return 0
+    return tokens
+
+
+def _settle_quota(provider, model, reserved, used):
+    # Correct the token bucket with the usage the API reported
+    limiter = get_rate_limiter()
+    if limiter is None or not reserved:
+        return
+    try:
+        limiter.settle(provider, model, reserved, used)
+    except Exception as e:
+        logger.warning(f"Rate limiter error while settling usage: {e}")
+
+
+async def _settle_quota_async(provider, model, reserved, used):
+    limiter = get_rate_limiter()
+    if limiter is None or not reserved:
+        return
+    try:
+        await limiter.settle_async(provider, model, reserved, used)
+    except Exception as e:
+        logger.warning(f"Rate limiter error while settling usage: {e}")
+
+
+def _record_call_outcome(breaker, error=None):
+    # A 4xx answer (rate limits included) proves the provider is up; only
+    # connection errors, timeouts and 5xx responses count against it
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if error is None or _is_rate_limit_error(str(error)) or (isinstance(status, int) and status < 500):
+        breaker.record_success()
+    else:
+        breaker.record_failure(error)
+
+
+def _usage_split(usage):
+    # (prompt, completion) tokens from an SDK usage object or a raw JSON dict
+    if usage is None:
+        return None, None
+    counts = []
+    for name in ("prompt_tokens", "completion_tokens"):
+        count = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+        counts.append(count if isinstance(count, int) else None)
+    return tuple(counts)
+
+
+def _record_task_usage(task, model, started, usage=None, cached=False, error=False):
+    # Per-task tokens, cost and latency (see common.model_routing); untagged calls are not tracked
+    if task is None:
+        return
+    try:
+        prompt_tokens, completion_tokens = _usage_split(usage)
+        get_task_usage().record(task, model, time.monotonic() - started, prompt_tokens, completion_tokens, cached, error)
+    except Exception as e:
+        logger.warning(f"Failed to record usage for task {task}: {e}")
+
+
+def _usage_tokens(usage):
+    # SDK usage objects and raw JSON dicts both carry total_tokens
+    if isinstance(usage, dict):
+        total = usage.get("total_tokens")
+    else:
+        total = getattr(usage, "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
+def ask_cerebras(question, context, model = "deepseek-r1-distill-llama-70b", temp=1.0, client=None, use_cache=True,
+                 response_format=None, max_tokens=None, task=None):
+    """
+    Query Cerebras, answering repeated identical prompts from the response cache
+
+    response_format (e.g. {"type": "json_schema", ...}) asks the model for
+    schema-constrained output on models that support it; max_tokens caps the
+    completion. task names the routed task (common.model_routing.route_kwargs
+    fills model, temp, max_tokens and task) whose usage the call counts toward.
+    """
+    cache, cache_key, cached = _cache_lookup(
+        "cerebras", model, temp, CEREBRAS_SEED, question, context, use_cache, response_format, max_tokens
+    )
+    if cached is not None:
+        _record_task_usage(task, model, time.monotonic(), cached=True)
+        return cached
+
+    result = _request_cerebras(question, context, model, temp, client, response_format, max_tokens, task)
+    _cache_store(cache, "cerebras", cache_key, model, result)
+    return result
+
+
+def _request_cerebras(question, context, model, temp, client, response_format=None, max_tokens=None, task=None):
+    started = time.monotonic()
+    try:
+        # Reuse the pooled client instead of rebuilding one (and its connection) per call
+        cerebras_client = client or get_cerebras_client(CEREBRAS_API_KEY)
+        breaker = get_circuit_breaker("cerebras")
+
+        for retry_count in range(CEREBRAS_MAX_RETRIES + 1):
+            # An open circuit fails here at once, skipping quota waits and retry sleeps
+            breaker.before_call()
+            reserved = _reserve_quota("cerebras", model, question, context)
             try:
-                random_id = random.randint(1000, 9999)
-                
-                # Clearer separation between context, instructions and expected output format
-                combined_message = f"Request ID: {random_id}\n\n===== CONTEXT =====\n{context}\n\n===== INSTRUCTIONS =====\n{question}\n\n"
-                
                 response = cerebras_client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {"role": "user", "content": combined_message}
-                    ],
-                    temperature=temp,
-                    seed=42
+                    **_cerebras_request(model, question, context, temp, response_format, max_tokens)
                 )
-                
-                content = response.choices[0].message.content.strip()
-                
-                # Remove any text between <think> and </think> tags
-                clean_content = re.sub(r'<think>.*?</think>', '', content, flags=re.DOTALL)
-                
-                clean_content = clean_content.strip()
-                
-                return clean_content
-                
+                _settle_quota("cerebras", model, reserved, _usage_tokens(getattr(response, "usage", None)))
+                content = _clean_cerebras_content(response.choices[0].message.content)
             except Exception as e:
-                error_message = str(e)
+                _record_call_outcome(breaker, e)
                 # Check if this is a rate limit error
-                if retry_count < max_retries and ("429" in error_message or "request_quota_exceeded" in error_message or "too_many_requests" in error_message):
-                    # Calculate exponential backoff delay with jitter
-                    delay = base_delay * (2 ** retry_count) + random.uniform(0, 1)
-                    print(f"Rate limit hit, retrying in {delay:.2f} seconds... (Attempt {retry_count + 1}/{max_retries})")
+                if retry_count < CEREBRAS_MAX_RETRIES and _is_rate_limit_error(str(e)):
+                    delay = _rate_limit_delay(retry_count)
+                    logger.warning(f"Rate limit hit, retrying in {delay:.2f} seconds... (Attempt {retry_count + 1}/{CEREBRAS_MAX_RETRIES})")
                     time.sleep(delay)
                     continue
                 else:
                     # If we've exhausted our retries or it's not a rate limit error, raise the exception
                     raise
-                    
+            # Recorded once, after the content proved usable
+            _record_call_outcome(breaker)
+            _record_task_usage(task, model, started, getattr(response, "usage", None))
+            return content
+
     except Exception as e:
+        _record_task_usage(task, model, started, error=True)
         return f"Error: {str(e)}"
 
 
-def ask_perplexity(question, context, model="sonar-pro", temp=1.0):
+class ThinkBlockFilter:
+    """
+    Incrementally drop <think>...</think> blocks from streamed model output.
+
+    Text is passed through as soon as it cannot be the start of a tag, so
+    the filter only ever holds back a few characters of a split tag.
+    """
+
+    OPEN, CLOSE = "<think>", "</think>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._in_think = False
+
+    def feed(self, text):
+        """Return the visible part of ``text`` that is safe to emit now"""
+        self._buffer += text
+        output = []
+        while self._buffer:
+            tag = self.CLOSE if self._in_think else self.OPEN
+            index = self._buffer.find(tag)
+            if index >= 0:
+                if not self._in_think:
+                    output.append(self._buffer[:index])
+                self._buffer = self._buffer[index + len(tag):]
+                self._in_think = not self._in_think
+                continue
+            # Keep a possible partial tag at the end for the next chunk
+            keep = 0
+            for size in range(min(len(tag) - 1, len(self._buffer)), 0, -1):
+                if tag.startswith(self._buffer[-size:]):
+                    keep = size
+                    break
+            if not self._in_think:
+                output.append(self._buffer[:len(self._buffer) - keep])
+            self._buffer = self._buffer[len(self._buffer) - keep:]
+            break
+        return "".join(output)
+
+    def flush(self):
+        """Return any held-back text once the stream has ended"""
+        remainder, self._buffer = ("" if self._in_think else self._buffer), ""
+        return remainder
+
+
+def stream_cerebras(question, context, model="deepseek-r1-distill-llama-70b", temp=1.0, client=None, use_cache=True,
+                    max_tokens=None, task=None):
+    """
+    Stream a Cerebras completion as text deltas, with <think> blocks removed.
+
+    Same prompt, seed and cache key as ask_cerebras: a cached answer is
+    yielded in one piece, and a completed stream is written to the cache.
+    Rate limits are retried only before the first token; any later failure
+    propagates to the consumer.
+    """
+    cache, cache_key, cached = _cache_lookup(
+        "cerebras", model, temp, CEREBRAS_SEED, question, context, use_cache, max_tokens=max_tokens
+    )
+    if cached is not None:
+        _record_task_usage(task, model, time.monotonic(), cached=True)
+        yield cached
+        return
+
+    started = time.monotonic()
+    cerebras_client = client or get_cerebras_client(CEREBRAS_API_KEY)
+    breaker = get_circuit_breaker("cerebras")
+    for retry_count in range(CEREBRAS_MAX_RETRIES + 1):
+        breaker.before_call()
+        reserved = _reserve_quota("cerebras", model, question, context)
+        try:
+            stream = cerebras_client.chat.completions.create(
+                **_cerebras_request(model, question, context, temp, max_tokens=max_tokens, stream=True)
+            )
+            break
+        except Exception as e:
+            _record_call_outcome(breaker, e)
+            if retry_count < CEREBRAS_MAX_RETRIES and _is_rate_limit_error(str(e)):
+                delay = _rate_limit_delay(retry_count)
+                logger.warning(f"Rate limit hit, retrying in {delay:.2f} seconds... (Attempt {retry_count + 1}/{CEREBRAS_MAX_RETRIES})")
+                time.sleep(delay)
+                continue
+            _record_task_usage(task, model, started, error=True)
+            raise
+
+    think_filter = ThinkBlockFilter()
+    parts = []
+    usage = None
+    try:
+        for chunk in stream:
+            # The final chunk carries the usage for the whole completion
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+                _settle_quota("cerebras", model, reserved, _usage_tokens(chunk.usage))
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content if chunk.choices[0].delta else None
+            if not delta:
+                continue
+            text = think_filter.feed(delta)
+            if text:
+                parts.append(text)
+                yield text
+    except GeneratorExit:
+        # The consumer stopped reading; the provider itself was fine
+        _record_call_outcome(breaker)
+        _record_task_usage(task, model, started, usage)
+        raise
+    except Exception as e:
+        _record_call_outcome(breaker, e)
+        _record_task_usage(task, model, started, usage, error=True)
+        raise
+    _record_call_outcome(breaker)
+    _record_task_usage(task, model, started, usage)
+    text = think_filter.flush()
+    if text:
+        parts.append(text)
+        yield text
+
+    _cache_store(cache, "cerebras", cache_key, model, "".join(parts).strip())
+
+
+def ask_perplexity(question, context, model="sonar-pro", temp=1.0, session=None, use_cache=True, max_tokens=None, task=None):
     """
     Generic function to query the Perplexity API.
+
+    Requests go through the pooled session from common.clients (keep-alive
+    connections, adapter-level retries) unless a session is passed in.
+    Successful answers are cached with the (short) Perplexity TTL.
     """
-    import requests
+    cache, cache_key, cached = _cache_lookup(
+        "perplexity", model, temp, None, question, context, use_cache, max_tokens=max_tokens
+    )
+    if cached is not None:
+        _record_task_usage(task, model, time.monotonic(), cached=True)
+        return cached
+
+    result = _request_perplexity(question, context, model, temp, session, max_tokens, task)
+    _cache_store(cache, "perplexity", cache_key, model, result)
+    return result
+
+
+def _request_perplexity(question, context, model, temp, session, max_tokens=None, task=None):
     api_key = PERPLEXITY_API_KEY
     if not api_key:
         return "Error: PERPLEXITY_API_KEY not configured."
 
-    url = "https://api.perplexity.ai/chat/completions"
-    headers = {
+    started = time.monotonic()
+    try:
+        http = session or get_perplexity_session()
+        breaker = get_circuit_breaker("perplexity")
+        breaker.before_call()
+        reserved = _reserve_quota("perplexity", model, question, context)
+        try:
+            response = http.post(
+                _perplexity_url(),
+                headers=_perplexity_headers(api_key),
+                json=_build_perplexity_payload(question, context, model, temp, max_tokens),
+                timeout=(PERPLEXITY_CONNECT_TIMEOUT, PERPLEXITY_READ_TIMEOUT)
+            )
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            _record_call_outcome(breaker, e)
+            raise
+        _record_call_outcome(breaker)
+        usage = data.get("usage") if isinstance(data, dict) else None
+        _settle_quota("perplexity", model, reserved, _usage_tokens(usage))
+        _record_task_usage(task, model, started, usage)
+        return _parse_perplexity_response(data)
+    except Exception as e:
+        _record_task_usage(task, model, started, error=True)
+        return f"Error: {str(e)}"
+
+
+def _perplexity_url():
+    return f"{PERPLEXITY_BASE_URL.rstrip('/')}/chat/completions"
+
+
+def _perplexity_headers(api_key):
+    return {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json"
     }
 
+
+def _build_perplexity_payload(question, context, model, temp, max_tokens=None):
     # Combine context and question for the prompt
     prompt = f"===== CONTEXT =====\n{context}\n\n===== INSTRUCTIONS =====\n{question}\n"
 
@@ -89,25 +460,142 @@ def ask_perplexity(question, context, model="sonar-pro", temp=1.0):
         ],
         "temperature": temp
     }
+    if max_tokens is not None:
+        payload["max_tokens"] = max_tokens
+    return payload
+
 
+def _parse_perplexity_response(data):
+    # Extract just the content and citations
     try:
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        data = response.json()
+        content = data['choices'][0]['message']['content']
+        citations = data.get('citations', [])
         
-        # Extract just the content and citations
-        try:
-            content = data['choices'][0]['message']['content']
-            citations = data.get('citations', [])
-            
-            # Return simplified response with just text and citations
-            return {
-                'content': content,
-                'citations': citations
-            }
-        except (KeyError, IndexError):
-            # If expected structure is not found, return the full data
-            return data
+        # Return simplified response with just text and citations
+        return {
+            'content': content,
+            'citations': citations
+        }
+    except (KeyError, IndexError):
+        # If expected structure is not found, return the full data
+        return data
+
+
+async def ask_cerebras_async(question, context, model="deepseek-r1-distill-llama-70b", temp=1.0, client=None, use_cache=True,
+                             response_format=None, max_tokens=None, task=None):
+    """
+    Asyncio variant of ask_cerebras with the same retry, cache and error contract.
+
+    Pass a long-lived AsyncCerebras client (see common.clients) to share its
+    connection pool; without one a temporary client is opened for the call.
+    """
+    cache, cache_key, cached = _cache_lookup(
+        "cerebras", model, temp, CEREBRAS_SEED, question, context, use_cache, response_format, max_tokens
+    )
+    if cached is not None:
+        _record_task_usage(task, model, time.monotonic(), cached=True)
+        return cached
+
+    if client is None:
+        async with build_async_cerebras_client(CEREBRAS_API_KEY) as temporary_client:
+            result = await _request_cerebras_async(
+                question, context, model, temp, temporary_client, response_format, max_tokens, task
+            )
+    else:
+        result = await _request_cerebras_async(question, context, model, temp, client, response_format, max_tokens, task)
+    _cache_store(cache, "cerebras", cache_key, model, result)
+    return result
+
+
+async def _request_cerebras_async(question, context, model, temp, client, response_format=None, max_tokens=None,
+                                  task=None):
+    started = time.monotonic()
+    try:
+        breaker = get_circuit_breaker("cerebras")
+        for retry_count in range(CEREBRAS_MAX_RETRIES + 1):
+            breaker.before_call()
+            reserved = await _reserve_quota_async("cerebras", model, question, context)
+            try:
+                response = await client.chat.completions.create(
+                    **_cerebras_request(model, question, context, temp, response_format, max_tokens)
+                )
+                await _settle_quota_async("cerebras", model, reserved, _usage_tokens(getattr(response, "usage", None)))
+                content = _clean_cerebras_content(response.choices[0].message.content)
+            except Exception as e:
+                _record_call_outcome(breaker, e)
+                if retry_count < CEREBRAS_MAX_RETRIES and _is_rate_limit_error(str(e)):
+                    delay = _rate_limit_delay(retry_count)
+                    logger.warning(f"Rate limit hit, retrying in {delay:.2f} seconds... (Attempt {retry_count + 1}/{CEREBRAS_MAX_RETRIES})")
+                    await asyncio.sleep(delay)
+                    continue
+                raise
+            _record_call_outcome(breaker)
+            _record_task_usage(task, model, started, getattr(response, "usage", None))
+            return content
     except Exception as e:
+        _record_task_usage(task, model, started, error=True)
         return f"Error: {str(e)}"
 
+
+async def ask_perplexity_async(question, context, model="sonar-pro", temp=1.0, client=None, use_cache=True,
+                               max_tokens=None, task=None):
+    """
+    Asyncio variant of ask_perplexity with the same cache and return contract.
+
+    Retries 429/5xx responses with exponential backoff (honouring Retry-After),
+    mirroring the adapter-level retries of the pooled sync session.
+    """
+    cache, cache_key, cached = _cache_lookup(
+        "perplexity", model, temp, None, question, context, use_cache, max_tokens=max_tokens
+    )
+    if cached is not None:
+        _record_task_usage(task, model, time.monotonic(), cached=True)
+        return cached
+
+    if client is None:
+        async with build_async_perplexity_client() as temporary_client:
+            result = await _request_perplexity_async(question, context, model, temp, temporary_client, max_tokens, task)
+    else:
+        result = await _request_perplexity_async(question, context, model, temp, client, max_tokens, task)
+    _cache_store(cache, "perplexity", cache_key, model, result)
+    return result
+
+
+async def _request_perplexity_async(question, context, model, temp, client, max_tokens=None, task=None):
+    api_key = PERPLEXITY_API_KEY
+    if not api_key:
+        return "Error: PERPLEXITY_API_KEY not configured."
+
+    started = time.monotonic()
+    try:
+        breaker = get_circuit_breaker("perplexity")
+        for retry_count in range(PERPLEXITY_MAX_RETRIES + 1):
+            breaker.before_call()
+            reserved = await _reserve_quota_async("perplexity", model, question, context)
+            try:
+                response = await client.post(
+                    _perplexity_url(),
+                    headers=_perplexity_headers(api_key),
+                    json=_build_perplexity_payload(question, context, model, temp, max_tokens)
+                )
+            except Exception as e:
+                _record_call_outcome(breaker, e)
+                raise
+            if response.status_code >= 500:
+                breaker.record_failure(RuntimeError(f"HTTP {response.status_code}"))
+            else:
+                _record_call_outcome(breaker)
+            if response.status_code in (429, 500, 502, 503, 504) and retry_count < PERPLEXITY_MAX_RETRIES:
+                retry_after = response.headers.get("Retry-After", "")
+                delay = float(retry_after) if retry_after.isdigit() else PERPLEXITY_RETRY_BACKOFF * (2 ** retry_count)
+                await asyncio.sleep(delay)
+                continue
+            response.raise_for_status()
+            data = response.json()
+            usage = data.get("usage") if isinstance(data, dict) else None
+            await _settle_quota_async("perplexity", model, reserved, _usage_tokens(usage))
+            _record_task_usage(task, model, started, usage)
+            return _parse_perplexity_response(data)
+    except Exception as e:
+        _record_task_usage(task, model, started, error=True)
+        return f"Error: {str(e)}"
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Company, Contact, Report
+from .models import Company, Contact, Report, ResearchArtifact, ResearchJob
 
 
 @admin.register(Company)
@@ -143,3 +143,21 @@ class ReportAdmin(admin.ModelAdmin):
             obj.mark_as_edited()
         else:
             super().save_model(request, obj, form, change)
+
+
+@admin.register(ResearchJob)
+class ResearchJobAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'mode', 'status', 'total_companies',
+        'completed_companies', 'failed_companies', 'created_at'
+    ]
+    list_filter = ['mode', 'status', 'created_at']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+
+@admin.register(ResearchArtifact)
+class ResearchArtifactAdmin(admin.ModelAdmin):
+    list_display = ['company_key', 'company', 'phase', 'duration_ms', 'finished_at']
+    list_filter = ['phase', 'finished_at']
+    search_fields = ['company_key', 'prompt_hash']
+    readonly_fields = ['started_at', 'finished_at', 'duration_ms']
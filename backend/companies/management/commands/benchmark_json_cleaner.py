@@ -0,0 +1,57 @@
+import json
+import re
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from companies.services.cerebras_service import clean_json_response
+
+
+def legacy_clean_json_response(content):
+    """The regex-chain cleaner (plus ask_cerebras's <think> strip) that clean_json_response replaced"""
+    content = re.sub(r'<think>.*?</think>', '', content.strip(), flags=re.DOTALL).strip()
+    content = re.sub(r'```json\s*', '', content)
+    content = re.sub(r'```\s*$', '', content, flags=re.MULTILINE)
+    content = re.sub(r'```', '', content)
+    content = re.sub(r'(?<!:)//.*?(?=\n|$)', '', content, flags=re.MULTILINE)
+    content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
+    json_match = re.search(r'(\{.*\}|\[.*\])', content, re.DOTALL)
+    if json_match:
+        cleaned = json_match.group().strip()
+        cleaned = re.sub(r',\s*//.*?(?=\n|$)', ',', cleaned, flags=re.MULTILINE)
+        cleaned = re.sub(r'"\s*//.*?(?=\n)', '"', cleaned, flags=re.MULTILINE)
+        return cleaned
+    return content.strip()
+
+
+def build_samples(contacts):
+    """Representative model outputs: a long reasoning preamble, fenced JSON with comments, and an unclosed response"""
+    contact = {
+        "basic_info": {"full_name": "Ada Lovelace", "title": "VP Engineering", "seniority_level": "vp"},
+        "contact_info": {"email": "ada@example.com", "linkedin_url": "https://linkedin.com/in/ada"},
+        "ai_ml_profile": {"ai_ml_interests": ["LLMs", "inference", "training"]},
+    }
+    body = ",  // source: company site\n".join(json.dumps(contact, indent=2) for _ in range(contacts))
+    reasoning = "<think>" + "Let me consider {the} [candidates] carefully. " * (contacts * 20) + "</think>"
+    fenced = f"{reasoning}\nHere is the data:\n```json\n[\n{body}\n]\n```\nHope this helps."
+    unclosed = "Partial output: " + "{ \"key\": [1, 2, " * (contacts * 20)
+    return {"fenced_with_reasoning": fenced, "unclosed_braces": unclosed}
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark clean_json_response against the previous regex implementation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help='Calls per timing run')
+        parser.add_argument('--contacts', type=int, default=25, help='Contacts per synthetic response')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        for name, sample in build_samples(options['contacts']).items():
+            self.stdout.write(f'{name} ({len(sample):,} chars)')
+            timings = {}
+            for label, cleaner in [('legacy', legacy_clean_json_response), ('scanner', clean_json_response)]:
+                seconds = min(timeit.repeat(lambda: cleaner(sample), number=iterations, repeat=3))
+                timings[label] = seconds / iterations * 1e6
+                self.stdout.write(f'  {label:<8} {timings[label]:>10.1f} us/call')
+            self.stdout.write(self.style.SUCCESS(f'  speedup  {timings["legacy"] / timings["scanner"]:>10.2f}x'))
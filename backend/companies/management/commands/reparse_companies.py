@@ -0,0 +1,87 @@
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from common.config import CEREBRAS_ASYNC_CONCURRENCY, CEREBRAS_PARSE_BATCH_SIZE
+from companies.models import Company
+from companies.models.company import normalize_company_name
+from companies.services.async_research_service import AsyncResearchEngine
+from companies.services.research_service import CompanyResearchService
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-parse the stored raw research of existing companies with the current parse '
+        'prompts and bulk-update the parsed fields. No web research is repeated. The '
+        'command can be stopped and restarted: parses already stored under the current '
+        'prompt are served from their checkpoints, so only unfinished companies pay for inference.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=CEREBRAS_ASYNC_CONCURRENCY,
+                            help='Concurrent Cerebras parse requests')
+        parser.add_argument('--parse-batch-size', type=int, default=CEREBRAS_PARSE_BATCH_SIZE,
+                            help='Companies packed into one parse request (1 parses each company alone)')
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Companies per bulk_update and progress line')
+        parser.add_argument('--company', action='append', default=[],
+                            help='Only re-parse this company (repeatable)')
+        parser.add_argument('--limit', type=int, help='Re-parse at most this many companies')
+        parser.add_argument('--skip-contacts', action='store_true', help='Re-parse company data only')
+
+    def handle(self, *args, **options):
+        queryset = Company.objects.exclude(research_phases={}).order_by('id')
+        if options['company']:
+            queryset = queryset.filter(normalized_name__in=[normalize_company_name(name) for name in options['company']])
+        company_ids = list(queryset.values_list('id', flat=True)[:options['limit']])
+        if not company_ids:
+            self.stdout.write('No companies with stored research to re-parse')
+            return
+        self.stdout.write(f'Re-parsing {len(company_ids)} companies with concurrency {options["concurrency"]}')
+        async_to_sync(self._reparse)(company_ids, options)
+
+    async def _reparse(self, company_ids, options):
+        service = CompanyResearchService()
+        engine = AsyncResearchEngine(
+            service, cerebras_concurrency=options['concurrency'], parse_batch_size=options['parse_batch_size']
+        )
+        # Keys of the parsed-field mapping are the same for every company
+        parsed_fields = list(service.build_company_fields({}, '')) + ['updated_at']
+        total, done, failed = len(company_ids), 0, 0
+        pending = []
+        started = time.monotonic()
+
+        def flush():
+            if pending:
+                Company.objects.bulk_update(pending, parsed_fields)
+                pending.clear()
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'  {done}/{total} re-parsed, {failed} failed ({done / elapsed:.1f} companies/s)')
+
+        results = engine.reparse_companies(company_ids, parse_contacts=not options['skip_contacts'])
+        async for company, parsed, error in results:
+            done += 1
+            parsed_company = parsed.get('parsed_company')
+            if error is not None or (parsed_company is not None and 'error' in parsed_company):
+                failed += 1
+                name = company.name if company is not None else 'Deleted company'
+                self.stderr.write(f'  {name}: {error or parsed_company["error"]}')
+            else:
+                if parsed_company is not None:
+                    company_fields = service.build_company_fields(parsed_company, parsed['combined_research'])
+                    for field, value in company_fields.items():
+                        setattr(company, field, value)
+                    company.updated_at = timezone.now()
+                    pending.append(company)
+                if parsed.get('parsed_contacts'):
+                    await sync_to_async(service._save_contact_data)(
+                        company, parsed['parsed_contacts'], parsed['contact_research']
+                    )
+            if done % options['batch_size'] == 0 or done == total:
+                await sync_to_async(flush)()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Re-parsed {done - failed} companies ({failed} failed) in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:53
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResearchJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('mode', models.CharField(choices=[('single', 'Single Company'), ('batch', 'Batch'), ('discovery', 'Auto-Discovery')], default='batch', max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('discovering', 'Discovering Companies'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('company_names', models.JSONField(blank=True, default=list)),
+                ('max_customers', models.IntegerField(blank=True, null=True)),
+                ('total_companies', models.IntegerField(default=0)),
+                ('completed_companies', models.IntegerField(default=0)),
+                ('failed_companies', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('companies', models.ManyToManyField(blank=True, related_name='research_jobs', to='companies.company')),
+            ],
+            options={
+                'db_table': 'research_jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:55
+
+from django.db import migrations, models
+
+from companies.models.company import normalize_company_name
+
+
+def merge_duplicate_company(apps, duplicate, canonical):
+    """Move a duplicate company's contacts, reports and job memberships onto canonical, then delete it"""
+    Contact = apps.get_model('companies', 'Contact')
+    Report = apps.get_model('companies', 'Report')
+    ResearchJob = apps.get_model('companies', 'ResearchJob')
+
+    taken_emails = set(
+        Contact.objects.filter(company=canonical).exclude(email__isnull=True).values_list('email', flat=True)
+    )
+    Contact.objects.filter(company=duplicate, email__in=taken_emails).delete()
+    Contact.objects.filter(company=duplicate).update(company=canonical)
+
+    # Only one active company report is allowed per company
+    if Report.objects.filter(company=canonical, report_type='company', is_archived=False).exists():
+        Report.objects.filter(company=duplicate, report_type='company').update(is_archived=True)
+    Report.objects.filter(company=duplicate).update(company=canonical)
+
+    for job in ResearchJob.objects.filter(companies=duplicate):
+        job.companies.add(canonical)
+    duplicate.delete()
+
+
+def backfill_normalized_names(apps, schema_editor):
+    """
+    Populate normalized_name for existing companies.
+
+    Rows whose normalized name collides with an older company are merged
+    into it, so every remaining row can own its normalized name under the
+    unique constraint.
+    """
+    Company = apps.get_model('companies', 'Company')
+    canonical_ids = {}
+    duplicates = []
+    batch = []
+    for company in Company.objects.order_by('id').only('id', 'name').iterator(chunk_size=2000):
+        normalized = normalize_company_name(company.name) or None
+        if normalized in canonical_ids:
+            duplicates.append((company.id, canonical_ids[normalized]))
+            continue
+        if normalized:
+            canonical_ids[normalized] = company.id
+        company.normalized_name = normalized
+        batch.append(company)
+        if len(batch) >= 2000:
+            Company.objects.bulk_update(batch, ['normalized_name'])
+            batch = []
+    if batch:
+        Company.objects.bulk_update(batch, ['normalized_name'])
+
+    for duplicate_id, canonical_id in duplicates:
+        merge_duplicate_company(
+            apps, Company.objects.get(id=duplicate_id), Company.objects.get(id=canonical_id)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0002_research_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='normalized_name',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.RunPython(backfill_normalized_names, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='company',
+            name='normalized_name',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, unique=True),
+        ),
+    ]
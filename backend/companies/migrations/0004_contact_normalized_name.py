@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:56
+
+from django.db import migrations, models
+
+from companies.models.contact import normalize_contact_name
+
+
+def backfill_normalized_names(apps, schema_editor):
+    """Populate the contact identity key for existing rows"""
+    Contact = apps.get_model('companies', 'Contact')
+    batch = []
+    for contact in Contact.objects.order_by('id').only('id', 'first_name', 'last_name').iterator(chunk_size=2000):
+        contact.normalized_name = normalize_contact_name(contact.first_name, contact.last_name)
+        batch.append(contact)
+        if len(batch) >= 2000:
+            Contact.objects.bulk_update(batch, ['normalized_name'])
+            batch = []
+    if batch:
+        Contact.objects.bulk_update(batch, ['normalized_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_company_normalized_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='normalized_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=201),
+        ),
+        migrations.RunPython(backfill_normalized_names, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['company', 'normalized_name'], name='contacts_company_name_idx'),
+        ),
+    ]
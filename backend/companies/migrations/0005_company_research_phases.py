@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0004_contact_normalized_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='research_phases',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
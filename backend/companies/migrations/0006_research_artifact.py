@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0005_company_research_phases'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResearchArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('company_key', models.CharField(max_length=255)),
+                ('phase', models.CharField(choices=[('basic_research', 'Basic Research'), ('contact_research', 'Contact Research'), ('competitor_analysis', 'Competitor Analysis'), ('recent_news', 'Recent News'), ('parsed_company', 'Parsed Company'), ('parsed_contacts', 'Parsed Contacts')], max_length=30)),
+                ('prompt_hash', models.CharField(max_length=64)),
+                ('output', models.JSONField()),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('duration_ms', models.IntegerField(default=0)),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='research_artifacts', to='companies.company')),
+            ],
+            options={
+                'db_table': 'research_artifacts',
+                'ordering': ['-finished_at'],
+                'indexes': [models.Index(fields=['company_key', 'finished_at'], name='research_art_key_finished_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0006_research_artifact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResearchJobResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.IntegerField()),
+                ('company_name', models.CharField(max_length=255)),
+                ('succeeded', models.BooleanField()),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='companies.company')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='companies.researchjob')),
+            ],
+            options={
+                'db_table': 'research_job_results',
+                'ordering': ['job', 'position'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='researchjobresult',
+            constraint=models.UniqueConstraint(fields=('job', 'position'), name='unique_research_job_position'),
+        ),
+    ]
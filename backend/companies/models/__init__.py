@@ -2,5 +2,7 @@
 from .company import Company
 from .contact import Contact
 from .report import Report
+from .research_job import ResearchJob, ResearchJobResult
+from .research_artifact import ResearchArtifact
 
-__all__ = ['Company', 'Contact', 'Report']
+__all__ = ['Company', 'Contact', 'Report', 'ResearchJob', 'ResearchJobResult', 'ResearchArtifact']
@@ -2,6 +2,36 @@ from django.db import models
 from django.core.validators import URLValidator
 import json
 
+# Legal-entity suffixes ignored when matching company names
+COMPANY_NAME_SUFFIXES = [
+    ', l.p.', ', lp', ', l.l.c.', ', llc', ', inc.', ', inc',
+    ', corp.', ', corp', ', corporation', ', co.', ', co',
+    ', ltd.', ', ltd', ', limited', ', plc', ', s.a.', ', sa',
+    ', gmbh', ', ag', ', bv', ', nv', ', pvt. ltd.', ', pvt ltd',
+    ', private limited', ', pte. ltd.', ', pte ltd'
+]
+
+
+def normalize_company_name(name: str) -> str:
+    """
+    Normalize company name for duplicate detection
+    Removes common suffixes and normalizes casing/spacing
+    """
+    if not name:
+        return ""
+
+    # Convert to lowercase and strip whitespace
+    normalized = name.lower().strip()
+
+    # Remove common company suffixes
+    for suffix in COMPANY_NAME_SUFFIXES:
+        if normalized.endswith(suffix):
+            normalized = normalized[:-len(suffix)].strip()
+            break
+
+    # Remove extra whitespace and normalize
+    return ' '.join(normalized.split())
+
 
 class Company(models.Model):
     """
@@ -9,6 +39,7 @@ class Company(models.Model):
     """
     # Basic Information
     name = models.CharField(max_length=255, unique=True)
+    normalized_name = models.CharField(max_length=255, unique=True, blank=True, null=True, editable=False)  # Kept in sync with name on save
     website = models.URLField(validators=[URLValidator()], blank=True, null=True)
     description = models.TextField(blank=True, null=True)
     industry = models.CharField(max_length=255, blank=True, null=True)
@@ -60,6 +91,7 @@ class Company(models.Model):
     research_quality_score = models.IntegerField(default=0)  # 1-10 scale
     research_sources = models.JSONField(default=list, blank=True)
     research_notes = models.TextField(blank=True, null=True)
+    research_phases = models.JSONField(default=dict, blank=True)  # Raw text per research phase: {phase: {"text", "fetched_at"}}
     
     # Outreach Status
     outreach_priority = models.CharField(
@@ -80,6 +112,18 @@ class Company(models.Model):
         
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        normalized_name = normalize_company_name(self.name) or None
+        if (normalized_name is not None and normalized_name != self.normalized_name and not self._state.adding
+                and Company.objects.filter(normalized_name=normalized_name).exclude(pk=self.pk).exists()):
+            # Another company already owns this name; keep ours rather than break the unique index
+            normalized_name = self.normalized_name
+        self.normalized_name = normalized_name
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'normalized_name'}
+        super().save(*args, **kwargs)
         
     def get_product_match(self):
         """Return the most suitable product based on company profile"""
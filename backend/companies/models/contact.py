@@ -3,6 +3,20 @@ from django.core.validators import EmailValidator
 from companies.models import Company
 
 
+def normalize_contact_name(first_name: str, last_name: str) -> str:
+    """
+    Normalize contact name for duplicate detection
+    """
+    if not first_name and not last_name:
+        return ""
+
+    # Clean and normalize names
+    first_clean = (first_name or "").strip().lower()
+    last_clean = (last_name or "").strip().lower()
+
+    return f"{first_clean}|{last_clean}"
+
+
 class Contact(models.Model):
     """
     Model to store key contact information for companies
@@ -13,6 +27,7 @@ class Contact(models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     full_name = models.CharField(max_length=255, blank=True, null=True)
+    normalized_name = models.CharField(max_length=201, blank=True, default='', editable=False)  # Identity key, kept in sync on save
     
     # Professional Information
     title = models.CharField(max_length=255, blank=True, null=True)
@@ -112,9 +127,20 @@ class Contact(models.Model):
         db_table = 'contacts'
         ordering = ['contact_priority', '-influence_level', 'last_name', 'first_name']
         unique_together = ['company', 'email']  # Prevent duplicate emails per company
+        indexes = [
+            models.Index(fields=['company', 'normalized_name'], name='contacts_company_name_idx'),
+        ]
         
     def __str__(self):
         return f"{self.get_full_name()} - {self.company.name}"
+
+    def save(self, *args, **kwargs):
+        # bulk_create/bulk_update skip this, so callers set normalized_name themselves
+        self.normalized_name = normalize_contact_name(self.first_name, self.last_name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'first_name', 'last_name'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'normalized_name'}
+        super().save(*args, **kwargs)
         
     def get_full_name(self):
         """Return the full name of the contact"""
@@ -0,0 +1,42 @@
+from django.db import models
+
+from .company import Company
+
+
+class ResearchArtifact(models.Model):
+    """
+    Checkpointed output of one research pipeline phase
+
+    Written as soon as a phase finishes, so a retried or resumed run can
+    reuse it instead of paying for the same Perplexity or Cerebras call again.
+    """
+    PHASE_CHOICES = [
+        ('basic_research', 'Basic Research'),
+        ('contact_research', 'Contact Research'),
+        ('competitor_analysis', 'Competitor Analysis'),
+        ('recent_news', 'Recent News'),
+        ('parsed_company', 'Parsed Company'),
+        ('parsed_contacts', 'Parsed Contacts'),
+    ]
+
+    # Normalized company name; the Company row may not exist yet while its first run is in flight
+    company_key = models.CharField(max_length=255)
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, blank=True, null=True, related_name='research_artifacts')
+    phase = models.CharField(max_length=30, choices=PHASE_CHOICES)
+    prompt_hash = models.CharField(max_length=64)  # sha256 of the prompt that produced the output
+    output = models.JSONField()  # Raw research text, or the parsed company dict / contact list
+
+    # Timings
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    duration_ms = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'research_artifacts'
+        ordering = ['-finished_at']
+        indexes = [
+            models.Index(fields=['company_key', 'finished_at'], name='research_art_key_finished_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.phase} for {self.company_key} ({self.finished_at:%Y-%m-%d %H:%M})"
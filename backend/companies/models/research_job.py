@@ -0,0 +1,108 @@
+import uuid
+
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .company import Company
+
+
+class ResearchJob(models.Model):
+    """
+    Model to track background company research submitted through Celery
+    """
+    MODE_CHOICES = [
+        ('single', 'Single Company'),
+        ('batch', 'Batch'),
+        ('discovery', 'Auto-Discovery'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('discovering', 'Discovering Companies'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES, default='batch')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+
+    # Input
+    company_names = models.JSONField(default=list, blank=True)
+    max_customers = models.IntegerField(blank=True, null=True)  # Auto-discovery only
+
+    # Progress
+    total_companies = models.IntegerField(default=0)
+    completed_companies = models.IntegerField(default=0)
+    failed_companies = models.IntegerField(default=0)
+    companies = models.ManyToManyField(Company, blank=True, related_name='research_jobs')
+    error = models.TextField(blank=True, null=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'research_jobs'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Research job {self.id} ({self.status})"
+
+    def get_progress(self):
+        """Percentage of companies processed (succeeded or failed)"""
+        if not self.total_companies:
+            return 100 if self.status == 'completed' else 0
+        processed = self.completed_companies + self.failed_companies
+        return min(int(processed * 100 / self.total_companies), 100)
+
+    @classmethod
+    def record_result(cls, job_id, position: int, company_name: str, company: Company, succeeded: bool):
+        """
+        Count one finished company and close the job when it was the last one.
+
+        Each company of the job (by its position in company_names) is counted
+        once: a redelivered task finds its ResearchJobResult row already there
+        and changes nothing. Uses single-statement F() updates so concurrent
+        workers never lose an increment, even on SQLite.
+        """
+        with transaction.atomic():
+            _, created = ResearchJobResult.objects.get_or_create(
+                job_id=job_id, position=position,
+                defaults={'company_name': company_name, 'company': company, 'succeeded': succeeded},
+            )
+            if not created:
+                return
+            counter = 'completed_companies' if succeeded else 'failed_companies'
+            cls.objects.filter(id=job_id).update(**{counter: F(counter) + 1})
+            if company is not None:
+                cls.companies.through.objects.get_or_create(researchjob_id=job_id, company_id=company.id)
+            cls.objects.filter(
+                id=job_id,
+                status='running',
+                total_companies__lte=F('completed_companies') + F('failed_companies'),
+            ).update(status='completed', finished_at=timezone.now())
+
+
+class ResearchJobResult(models.Model):
+    """
+    Outcome of one company of a research job, recorded once per company
+    """
+    job = models.ForeignKey(ResearchJob, on_delete=models.CASCADE, related_name='results')
+    position = models.IntegerField()  # Index into the job's company_names
+    company_name = models.CharField(max_length=255)
+    company = models.ForeignKey(Company, on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+    succeeded = models.BooleanField()
+    recorded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'research_job_results'
+        ordering = ['job', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'position'], name='unique_research_job_position'),
+        ]
+
+    def __str__(self):
+        return f"{self.company_name} in job {self.job_id} ({'succeeded' if self.succeeded else 'failed'})"
@@ -0,0 +1,24 @@
+from urllib.parse import parse_qs, urlparse
+
+from rest_framework.pagination import CursorPagination
+
+
+class CompanyCursorPagination(CursorPagination):
+    """
+    Cursor pagination for the company list.
+
+    Pages are keyed on the primary key, so a page costs one indexed range
+    query however deep the client has scrolled, and rows inserted during
+    paging are never skipped or repeated.
+    """
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 500
+
+    def get_next_cursor(self):
+        """The cursor query parameter for the next page, or None on the last page"""
+        link = self.get_next_link()
+        if link is None:
+            return None
+        return parse_qs(urlparse(link).query).get(self.cursor_query_param, [None])[0]
@@ -0,0 +1,392 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+
+from common.circuit_breaker import raise_if_open
+from common.clients import build_async_cerebras_client, build_async_perplexity_client
+from common.config import (
+    RESEARCH_MAX_IN_FLIGHT,
+    CEREBRAS_ASYNC_CONCURRENCY,
+    PERPLEXITY_ASYNC_CONCURRENCY,
+    CEREBRAS_PARSE_BATCH_SIZE,
+    CEREBRAS_PARSE_BATCH_TOKENS,
+    CEREBRAS_PARSE_BATCH_WAIT,
+)
+from common.model_routing import route_kwargs
+from common.single_flight import get_single_flight
+from common.utils import ask_cerebras_async, ask_perplexity_async
+from companies.models import Company
+from companies.models.company import normalize_company_name
+from .cerebras_service import (
+    COMPANY_PARSE_QUESTION,
+    CONTACT_PARSE_QUESTION,
+    COMPANY_BATCH_PARSE_QUESTION,
+    CONTACT_BATCH_PARSE_QUESTION,
+)
+from .checkpoints import ResearchCheckpoints, prompt_hash
+from .parse_batcher import ParseBatcher
+from .prompt_budget import estimate_tokens
+from .freshness import COMPANY_PHASES, RESEARCH_PHASES, record_phases, stale_phases, stored_phase_text
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncResearchEngine:
+    """
+    Asyncio implementation of the company research pipeline.
+
+    Runs the same phases as CompanyResearchService.research_and_save_company
+    (same prompts, same parsing, same persistence), but every network call is
+    a coroutine. Each provider gets its own semaphore, so hundreds of companies
+    can be in flight while request concurrency stays bounded per API.
+    With parse_batch_size > 1, batch runs pack the parses of several
+    companies into one Cerebras request (see ParseBatcher).
+    Database writes go through sync_to_async and stay on one thread; phase
+    outputs are checkpointed exactly as in the sync pipeline.
+    """
+
+    def __init__(self, research_service,
+                 max_in_flight: Optional[int] = None,
+                 cerebras_concurrency: Optional[int] = None,
+                 perplexity_concurrency: Optional[int] = None,
+                 force_refresh: bool = False,
+                 parse_batch_size: Optional[int] = None):
+        self.research_service = research_service
+        self.perplexity = research_service.perplexity
+        self.ai_service = research_service.ai_service
+        self.max_in_flight = max_in_flight or RESEARCH_MAX_IN_FLIGHT
+        self.cerebras_concurrency = cerebras_concurrency or CEREBRAS_ASYNC_CONCURRENCY
+        self.perplexity_concurrency = perplexity_concurrency or PERPLEXITY_ASYNC_CONCURRENCY
+        self.force_refresh = force_refresh  # Ignore stored phase text and cached responses, refetch everything
+        self.parse_batch_size = parse_batch_size or CEREBRAS_PARSE_BATCH_SIZE  # Companies per parse request
+        self._cerebras_client = None
+        self._perplexity_client = None
+        self._cerebras_semaphore = None
+        self._perplexity_semaphore = None
+        self._company_batcher = None
+        self._contact_batcher = None
+
+    async def _ask_perplexity(self, question: str, context: str):
+        async with self._perplexity_semaphore:
+            return await ask_perplexity_async(
+                question=question,
+                context=context,
+                client=self._perplexity_client,
+                use_cache=not self.force_refresh,
+                **route_kwargs('research')
+            )
+
+    async def _ask_cerebras(self, question: str, context: str, task: str,
+                            response_format: Optional[Dict[str, Any]] = None) -> str:
+        async with self._cerebras_semaphore:
+            return await ask_cerebras_async(
+                question=question,
+                context=context,
+                client=self._cerebras_client,
+                response_format=response_format,
+                **route_kwargs(task)
+            )
+
+    def _selling_profile(self) -> Tuple[str, str, Dict[str, Any]]:
+        return (
+            self.research_service.get_selling_company_name(),
+            self.research_service._get_selling_context(),
+            self.research_service.get_selling_company_info(),
+        )
+
+    async def _parse_company(self, checkpoints: ResearchCheckpoints, combined_research: str, company_name: str,
+                             selling_company: str, selling_company_info: Dict[str, Any]) -> Dict[str, Any]:
+        prompt = self.ai_service.build_company_parse_prompt(combined_research, company_name, selling_company, selling_company_info)
+
+        async def parse():
+            if self._company_batcher is not None:
+                return await self._company_batcher.submit(
+                    (company_name, combined_research, prompt), tokens=estimate_tokens(combined_research)
+                )
+            return await self._parse_company_alone(company_name, prompt)
+        return await checkpoints.run_async('parsed_company', prompt_hash(COMPANY_PARSE_QUESTION, prompt), parse)
+
+    async def _parse_contacts(self, checkpoints: ResearchCheckpoints, contact_research: str,
+                              company_name: str) -> List[Dict[str, Any]]:
+        prompt = self.ai_service.build_contact_parse_prompt(contact_research, company_name)
+
+        async def parse():
+            if self._contact_batcher is not None:
+                return await self._contact_batcher.submit(
+                    (company_name, contact_research, prompt), tokens=estimate_tokens(contact_research)
+                )
+            return await self._parse_contacts_alone(prompt)
+        return await checkpoints.run_async('parsed_contacts', prompt_hash(CONTACT_PARSE_QUESTION, prompt), parse)
+
+    async def _parse_company_alone(self, company_name: str, prompt: str) -> Dict[str, Any]:
+        if self.ai_service.structured_output:
+            parsed = await self.ai_service.structured_parse_async('company_parse', prompt, self._ask_cerebras)
+            if parsed is not None:
+                return parsed
+        content = await self._ask_cerebras(COMPANY_PARSE_QUESTION, prompt, 'company_parse')
+        return self.ai_service.handle_company_parse_response(content, company_name)
+
+    async def _parse_contacts_alone(self, prompt: str) -> List[Dict[str, Any]]:
+        if self.ai_service.structured_output:
+            contacts = await self.ai_service.structured_parse_async('contact_parse', prompt, self._ask_cerebras)
+            if isinstance(contacts, list):
+                return [contact for contact in contacts if isinstance(contact, dict)]
+        content = await self._ask_cerebras(CONTACT_PARSE_QUESTION, prompt, 'contact_parse')
+        return self.ai_service.handle_contact_parse_response(content)
+
+    async def _run_parse_batch(self, items: List[Tuple[str, str, str]], task: str, question: str, build_prompt,
+                               split_response, parse_alone) -> List[Any]:
+        """
+        Parse several companies in one Cerebras request, falling back per company
+
+        items are (company name, research text, single-company prompt).
+        Companies whose entry in the batched answer fails validation (or all
+        of them, if the request itself fails) are re-parsed alone.
+        """
+        names = [name for name, _, _ in items]
+        parsed = [None] * len(items)
+        if len(items) > 1:
+            try:
+                content = await self._ask_cerebras(question, build_prompt([(name, text) for name, text, _ in items]), task)
+                parsed = split_response(content, names)
+            except Exception as e:
+                logger.warning(f"Batched parse of {len(items)} companies failed: {e}")
+        retry = [index for index, result in enumerate(parsed) if result is None]
+        if retry and len(items) > 1:
+            logger.warning(f"Re-parsing {len(retry)} of {len(items)} batched companies one by one: "
+                           f"{', '.join(names[index] for index in retry)}")
+        singles = await asyncio.gather(
+            *(parse_alone(names[index], items[index][2]) for index in retry), return_exceptions=True
+        )
+        for index, result in zip(retry, singles):
+            parsed[index] = result
+        return parsed
+
+    def _start_batchers(self, selling_profile: Tuple[str, str, Dict[str, Any]]):
+        """Route parses through shared batched requests for the duration of a batch run"""
+        if self.parse_batch_size <= 1:
+            return
+        selling_company, _, selling_company_info = selling_profile
+        self._company_batcher = ParseBatcher(
+            lambda items: self._run_parse_batch(
+                items, 'company_parse', COMPANY_BATCH_PARSE_QUESTION,
+                lambda research: self.ai_service.build_company_batch_parse_prompt(
+                    research, selling_company, selling_company_info
+                ),
+                self.ai_service.handle_company_batch_parse_response,
+                self._parse_company_alone
+            ),
+            self.parse_batch_size, CEREBRAS_PARSE_BATCH_TOKENS, CEREBRAS_PARSE_BATCH_WAIT
+        )
+        self._contact_batcher = ParseBatcher(
+            lambda items: self._run_parse_batch(
+                items, 'contact_parse', CONTACT_BATCH_PARSE_QUESTION,
+                self.ai_service.build_contact_batch_parse_prompt,
+                self.ai_service.handle_contact_batch_parse_response,
+                lambda company_name, prompt: self._parse_contacts_alone(prompt)
+            ),
+            self.parse_batch_size, CEREBRAS_PARSE_BATCH_TOKENS, CEREBRAS_PARSE_BATCH_WAIT
+        )
+
+    async def research_company(self, company_name: str, selling_profile: Tuple[str, str, Dict[str, Any]] = None) -> Company:
+        """
+        Research, parse and save one company; the async twin of research_and_save_company
+
+        Shares the same single-flight group as the sync pipeline, so duplicate
+        names in a batch (or a concurrent sync request) run the pipeline once.
+        """
+        return await get_single_flight("company_research").do_async(
+            normalize_company_name(company_name),
+            lambda: self._research_company(company_name, selling_profile)
+        )
+
+    async def _research_company(self, company_name: str, selling_profile: Tuple[str, str, Dict[str, Any]] = None) -> Company:
+        selling_company, selling_context, selling_company_info = selling_profile or self._selling_profile()
+        perplexity = self.perplexity
+        logger.info(f"Starting async research for {company_name}")
+        existing_company = None
+        if not self.force_refresh:
+            existing_company = await sync_to_async(self.research_service._find_existing_company)(company_name)
+        stale = stale_phases(existing_company)
+        if not stale:
+            logger.info(f"Research for {company_name} is fresh, nothing to refresh")
+            return existing_company
+        raise_if_open("perplexity", "cerebras")
+        checkpoints = await sync_to_async(ResearchCheckpoints)(
+            company_name, company=existing_company, reuse=not self.force_refresh
+        )
+
+        async def run_phase(phase, to_text, build_prompt, *args):
+            if phase not in stale:
+                return stored_phase_text(existing_company, phase)
+            question, prompt = build_prompt(*args)
+
+            async def fetch():
+                return to_text(await self._ask_perplexity(question, prompt))
+            return await checkpoints.run_async(phase, prompt_hash(question, prompt), fetch)
+
+        def basic_text(response):
+            return perplexity.handle_company_research_response(response, company_name, selling_company, selling_context)
+
+        # Phases 1-4: independent Perplexity research (fresh phases reuse stored text)
+        tasks = {
+            'basic_research': asyncio.ensure_future(run_phase(
+                'basic_research', basic_text, perplexity.build_company_research_prompt,
+                company_name, selling_company, selling_context, selling_company_info
+            )),
+            'contact_research': asyncio.ensure_future(run_phase(
+                'contact_research', perplexity.response_text, perplexity.build_contact_research_prompt, company_name
+            )),
+            'competitor_analysis': asyncio.ensure_future(run_phase(
+                'competitor_analysis', perplexity.response_text, perplexity.build_competitor_analysis_prompt,
+                company_name, selling_company
+            )),
+            'recent_news': asyncio.ensure_future(run_phase(
+                'recent_news', perplexity.response_text, perplexity.build_recent_news_prompt, company_name
+            )),
+        }
+
+        async def company_branch():
+            if not stale.intersection(COMPANY_PHASES):
+                await asyncio.gather(*(tasks[phase] for phase in COMPANY_PHASES))
+                return None, None
+            combined_research = self.research_service.combine_research(
+                *await asyncio.gather(*(tasks[phase] for phase in COMPANY_PHASES))
+            )
+            return combined_research, await self._parse_company(
+                checkpoints, combined_research, company_name, selling_company, selling_company_info
+            )
+
+        async def contact_branch():
+            contact_research = await tasks['contact_research']
+            if 'contact_research' not in stale:
+                return contact_research, None
+            return contact_research, await self._parse_contacts(checkpoints, contact_research, company_name)
+
+        try:
+            (combined_research, parsed_company), (contact_research, parsed_contacts) = await asyncio.gather(
+                company_branch(), contact_branch()
+            )
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        company = existing_company
+        if parsed_company is not None:
+            company = await sync_to_async(self.research_service._save_company_data)(parsed_company, combined_research)
+        await sync_to_async(checkpoints.attach)(company)
+        if parsed_contacts is not None:
+            await sync_to_async(self.research_service._save_contact_data)(company, parsed_contacts, contact_research)
+        await sync_to_async(record_phases)(company, {phase: tasks[phase].result() for phase in stale})
+        logger.info(f"Async research completed for {company_name}")
+        return company
+
+    async def research_companies(self, company_names: List[str]) -> List[Company]:
+        """
+        Research many companies concurrently; results follow the input order.
+
+        Failed companies get the same minimal "Research failed" record as the
+        sync batch path instead of aborting the batch.
+        """
+        if not company_names:
+            return []
+
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._cerebras_semaphore = asyncio.Semaphore(self.cerebras_concurrency)
+        self._perplexity_semaphore = asyncio.Semaphore(self.perplexity_concurrency)
+        selling_profile = self._selling_profile()
+        self._start_batchers(selling_profile)
+
+        async def research_one(company_name: str) -> Company:
+            async with in_flight:
+                try:
+                    return await self.research_company(company_name, selling_profile)
+                except Exception as e:
+                    logger.error(f"Failed to process {company_name}: {e}")
+                    return await sync_to_async(self.research_service._record_failed_research)(company_name, e)
+
+        async with build_async_cerebras_client() as cerebras_client, build_async_perplexity_client() as perplexity_client:
+            self._cerebras_client = cerebras_client
+            self._perplexity_client = perplexity_client
+            try:
+                return list(await asyncio.gather(*(research_one(name) for name in company_names)))
+            finally:
+                self._cerebras_client = None
+                self._perplexity_client = None
+                self._company_batcher = self._contact_batcher = None
+
+    async def reparse_company(self, company: Company, selling_profile: Tuple[str, str, Dict[str, Any]] = None,
+                              parse_contacts: bool = True) -> Dict[str, Any]:
+        """
+        Re-run the Cerebras parses over a company's stored raw research, without saving
+
+        Returns combined_research/parsed_company and contact_research/parsed_contacts
+        for whichever inputs are stored. No Perplexity calls are made, and a
+        parse whose prompt is unchanged is served from its checkpoint.
+        """
+        selling_company, _, selling_company_info = selling_profile or self._selling_profile()
+        checkpoints = await sync_to_async(ResearchCheckpoints)(company.name, company=company)
+        research = {phase: stored_phase_text(company, phase) for phase in RESEARCH_PHASES}
+        results = {}
+
+        async def company_branch():
+            if not all(research[phase] for phase in COMPANY_PHASES):
+                return
+            results['combined_research'] = self.research_service.combine_research(
+                *(research[phase] for phase in COMPANY_PHASES)
+            )
+            results['parsed_company'] = await self._parse_company(
+                checkpoints, results['combined_research'], company.name, selling_company, selling_company_info
+            )
+
+        async def contact_branch():
+            if not parse_contacts or not research['contact_research']:
+                return
+            results['contact_research'] = research['contact_research']
+            results['parsed_contacts'] = await self._parse_contacts(
+                checkpoints, research['contact_research'], company.name
+            )
+
+        await asyncio.gather(company_branch(), contact_branch())
+        return results
+
+    async def reparse_companies(self, company_ids: Iterable[int],
+                                parse_contacts: bool = True) -> AsyncIterator[Tuple[Company, Dict[str, Any], Optional[Exception]]]:
+        """
+        Re-parse many companies concurrently, yielding (company, results, error) as each finishes
+
+        Companies are loaded one at a time inside the in-flight limit, so
+        memory stays bounded however many ids are passed. A company deleted
+        since its id was listed is yielded as (None, {}, Company.DoesNotExist).
+        """
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._cerebras_semaphore = asyncio.Semaphore(self.cerebras_concurrency)
+        selling_profile = self._selling_profile()
+        self._start_batchers(selling_profile)
+
+        async def reparse_one(company_id: int):
+            async with in_flight:
+                company = await sync_to_async(Company.objects.filter(id=company_id).first)()
+                if company is None:
+                    logger.warning(f"Company {company_id} was deleted before it could be re-parsed")
+                    return None, {}, Company.DoesNotExist(f"Company {company_id} no longer exists")
+                try:
+                    return company, await self.reparse_company(company, selling_profile, parse_contacts), None
+                except Exception as e:
+                    logger.error(f"Failed to re-parse {company.name}: {e}")
+                    return company, {}, e
+
+        async with build_async_cerebras_client() as cerebras_client:
+            self._cerebras_client = cerebras_client
+            tasks = [asyncio.ensure_future(reparse_one(company_id)) for company_id in company_ids]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    yield await finished
+            finally:
+                for task in tasks:
+                    task.cancel()
+                self._cerebras_client = None
+                self._company_batcher = self._contact_batcher = None
@@ -1,92 +1,43 @@
 import json
 import logging
-import re
-from typing import Dict, List, Optional, Any
-from common.utils import ask_cerebras
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+from common.clients import get_cerebras_client
+from common.config import CEREBRAS_STRUCTURED_OUTPUT
+from common.model_routing import route_kwargs
+from common.utils import ask_cerebras, stream_cerebras
+from companies.models.company import normalize_company_name
+from .json_stream import StreamingJSONExtractor, extract_json_text
+from .parse_schemas import (
+    COMPANY_PARSE_JSON_SCHEMA,
+    CONTACT_PARSE_JSON_SCHEMA,
+    is_nullable,
+    json_schema_response_format,
+    repair_schema,
+    schema_at,
+    schema_errors,
+    set_path,
+)
+from .prompt_fragments import selling_company_context
 
 logger = logging.getLogger(__name__)
 
+COMPANY_PARSE_QUESTION = "Extract and structure the research data according to the JSON schema provided."
+CONTACT_PARSE_QUESTION = "Extract and structure the contact research data according to the JSON schema provided."
+COMPANY_BATCH_PARSE_QUESTION = "Extract and structure the research data for each company according to the JSON schema provided."
+CONTACT_BATCH_PARSE_QUESTION = "Extract and structure the contact research data for each company according to the JSON schema provided."
+CONTACT_STRUCTURED_PARSE_QUESTION = "Extract and structure the contact research data according to the JSON schema provided, listing the contacts under \"contacts\"."
+STRUCTURED_REPAIR_QUESTION = "Correct the listed fields of the structured data according to the JSON schema provided."
 
-def clean_json_response(content: str) -> str:
-    """
-    Clean JSON response by removing markdown code blocks, comments, and extra text
-    """
-    # Remove markdown code blocks
-    content = re.sub(r'```json\s*', '', content)
-    content = re.sub(r'```\s*$', '', content, flags=re.MULTILINE)
-    content = re.sub(r'```', '', content)
-    
-    # Remove JSON comments more thoroughly
-    # Remove // comments (but not URLs like https://)
-    content = re.sub(r'(?<!:)//.*?(?=\n|$)', '', content, flags=re.MULTILINE)
-    # Remove /* */ comments
-    content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
-    
-    # Find JSON object or array by looking for opening and closing braces/brackets
-    # This handles cases where there might be extra text before/after JSON
-    json_match = re.search(r'(\{.*\}|\[.*\])', content, re.DOTALL)
-    if json_match:
-        cleaned = json_match.group().strip()
-        # Additional cleanup: remove any remaining inline comments
-        cleaned = re.sub(r',\s*//.*?(?=\n|$)', ',', cleaned, flags=re.MULTILINE)
-        cleaned = re.sub(r'"\s*//.*?(?=\n)', '"', cleaned, flags=re.MULTILINE)
-        return cleaned
-    
-    # If no clear JSON object/array found, return cleaned content
-    return content.strip()
-
+# Structured-output parse tasks: (question, JSON schema, key holding the result or None for the whole object)
+STRUCTURED_TASKS = {
+    'company_parse': (COMPANY_PARSE_QUESTION, COMPANY_PARSE_JSON_SCHEMA, None),
+    'contact_parse': (CONTACT_STRUCTURED_PARSE_QUESTION, CONTACT_PARSE_JSON_SCHEMA, 'contacts'),
+}
 
-class AIResearchService:
-    """
-    Service to interact with AI API for parsing and structuring research data
-    """
-    
-    def __init__(self):
-        pass
-    
-    def generate_text(self, question: str, context: str, model: str = "deepseek-r1-distill-llama-70b", temp: float = 0.3) -> str:
-        """
-        Generate text using AI API - generic text generation method
-        """
-        try:
-            content = ask_cerebras(
-                question=question,
-                context=context,
-                model=model,
-                temp=temp
-            )
-            return content
-        except Exception as e:
-            logger.error(f"Failed to generate text with AI service: {e}")
-            return f"Error generating text: {str(e)}"
-        
-    def parse_company_research(self, research_text: str, company_name: str, selling_company: str = "Cerebras", selling_company_info: Dict[str, Any] = None) -> Dict[str, Any]:
-        """
-        Parse unstructured company research into structured JSON format
-        """
-        # Format selling company context
-        selling_context = ""
-        if selling_company_info:
-            company_details = selling_company_info.get('company', {})
-            products = selling_company_info.get('products', {})
-            
-            selling_context = f"""
-            
-            SELLING COMPANY CONTEXT:
-            Company: {company_details.get('name', selling_company)}
-            Industry: {company_details.get('industry', 'Technology')}
-            Description: {company_details.get('description', '')}
-            
-            Our Products/Services:
-            {json.dumps(products, indent=2) if products else 'No specific products listed'}
-            """
-        
-        prompt = f"""
-        Parse the following research about "{company_name}" into a structured JSON format. 
-        Extract all available information and organize it according to this schema:
-        {selling_context}
 
-        {{
+def company_parse_schema(selling_company: str) -> str:
+    """JSON schema for one parsed company, shared by the single and batched parse prompts"""
+    return f"""{{
             "basic_info": {{
                 "name": "string",
                 "website": "string",
@@ -136,7 +87,156 @@ class AIResearchService:
                 "sources": ["array of information sources mentioned"],
                 "notes": "string with additional context"
             }}
-        }}
+        }}"""
+
+
+CONTACT_PARSE_SCHEMA = """[
+            {
+                "basic_info": {
+                    "first_name": "string",
+                    "last_name": "string", 
+                    "full_name": "string",
+                    "title": "string",
+                    "department": "string or null",
+                    "seniority_level": "string (c_level/vp/director/manager/senior/mid/junior/other)"
+                },
+                "contact_info": {
+                    "email": "string or null",
+                    "phone": "string or null",
+                    "linkedin_url": "string or null",
+                    "twitter_handle": "string or null"
+                },
+                "professional_background": {
+                    "tenure_at_company": "string or null",
+                    "previous_companies": ["array of company names"],
+                    "education": ["array of education details"],
+                    "certifications": ["array of certifications"]
+                },
+                "decision_making": {
+                    "decision_maker": "boolean",
+                    "influence_level": "string (high/medium/low/unknown)",
+                    "budget_authority": "boolean",
+                    "technical_background": "boolean"
+                },
+                "ai_ml_profile": {
+                    "ai_ml_experience": "string describing their AI/ML background",
+                    "ai_ml_interests": ["array of AI/ML interests"],
+                    "published_papers": ["array of paper titles"],
+                    "conference_speaking": ["array of speaking engagements"]
+                },
+                "personalization": {
+                    "communication_style": "string (technical/business/mixed/unknown)",
+                    "interests": ["array of professional interests"],
+                    "pain_points": ["array of challenges they face"],
+                    "recent_achievements": ["array of recent accomplishments"]
+                },
+                "outreach_profile": {
+                    "contact_priority": "string (primary/secondary/tertiary)",
+                    "preferred_contact_method": "string (email/linkedin/phone/unknown)"
+                },
+                "research_quality": {
+                    "quality_score": "integer (1-10 scale)",
+                    "data_sources": ["array of sources"]
+                }
+            }
+        ]"""
+
+
+def _batch_sections(research: List[Tuple[str, str]]) -> str:
+    return "\n".join(
+        f"""
+        === COMPANY {index}: "{company_name}" ===
+        Research Text:
+        {research_text}
+        """
+        for index, (company_name, research_text) in enumerate(research, 1)
+    )
+
+
+def _same_company(name: Any, company_name: str) -> bool:
+    """True if a name echoed back by the model refers to the requested company"""
+    if not isinstance(name, str) or not name.strip():
+        return False
+    return (normalize_company_name(name) == normalize_company_name(company_name)
+            or company_name.lower() in name.lower())
+
+
+def clean_json_response(content: str) -> str:
+    """
+    Clean JSON response by removing markdown code blocks, comments, and extra text
+
+    One linear scan (see json_stream.StreamingJSONExtractor) instead of a
+    chain of regex passes over the whole response.
+    """
+    return extract_json_text(content)
+
+
+class AIResearchService:
+    """
+    Service to interact with AI API for parsing and structuring research data
+    """
+    
+    def __init__(self):
+        # Schema-constrained parsing via response_format, with free-text parsing as the fallback
+        self.structured_output = CEREBRAS_STRUCTURED_OUTPUT
+
+    @property
+    def client(self):
+        """Shared, pooled Cerebras client (one per process, not per service instance)"""
+        return get_cerebras_client()
+    
+    def _ask(self, question: str, context: str, task: str, response_format: Dict[str, Any] = None,
+             model: str = None, temp: float = None) -> str:
+        # One Cerebras call on the model, temperature and token cap routed for the task
+        return ask_cerebras(
+            question=question,
+            context=context,
+            client=self.client,
+            response_format=response_format,
+            **route_kwargs(task, model, temp)
+        )
+
+    def generate_text(self, question: str, context: str, model: str = None, temp: float = None,
+                      task: str = 'default') -> str:
+        """
+        Generate text using AI API - generic text generation on the model routed for task
+
+        model and temp, when given, override the task's route.
+        """
+        try:
+            content = self._ask(question, context, task, model=model, temp=temp)
+            return content
+        except Exception as e:
+            logger.error(f"Failed to generate text with AI service: {e}")
+            return f"Error generating text: {str(e)}"
+        
+    def stream_text(self, question: str, context: str, model: str = None, temp: float = None,
+                    task: str = 'default'):
+        """
+        Stream generated text as it is produced - the incremental twin of generate_text
+        """
+        return stream_cerebras(
+            question=question,
+            context=context,
+            client=self.client,
+            **route_kwargs(task, model, temp)
+        )
+        
+    def build_company_parse_prompt(self, research_text: str, company_name: str, selling_company: str = "Cerebras", selling_company_info: Dict[str, Any] = None) -> str:
+        """
+        Build the schema prompt used to parse company research
+        """
+        # Selling company context, rendered once per offerings version
+        selling_context = ""
+        if selling_company_info:
+            selling_context = selling_company_context(selling_company, selling_company_info)
+        
+        prompt = f"""
+        Parse the following research about "{company_name}" into a structured JSON format. 
+        Extract all available information and organize it according to this schema:
+        {selling_context}
+
+        {company_parse_schema(selling_company)}
 
         Research Text:
         {research_text}
@@ -148,14 +248,13 @@ class AIResearchService:
 
         Return only valid JSON, no additional text.
         """
+        return prompt
+
+    def handle_company_parse_response(self, content: str, company_name: str) -> Dict[str, Any]:
+        """
+        Turn the model's company parse output into structured data
+        """
         try:
-            content = ask_cerebras(
-                question="Extract and structure the research data according to the JSON schema provided.",
-                context=prompt,
-                model="deepseek-r1-distill-llama-70b",
-                temp=0.1
-            )
-            
             # Clean and parse as JSON
             cleaned_content = clean_json_response(content)
             return json.loads(cleaned_content)
@@ -174,65 +273,206 @@ class AIResearchService:
                 "basic_info": {"name": company_name},
                 "error": str(e)
             }
+
+    def parse_company_research(self, research_text: str, company_name: str, selling_company: str = "Cerebras", selling_company_info: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Parse unstructured company research into structured JSON format
+        """
+        prompt = self.build_company_parse_prompt(research_text, company_name, selling_company, selling_company_info)
+        if self.structured_output:
+            parsed = self.structured_parse('company_parse', prompt)
+            if parsed is not None:
+                return parsed
+        try:
+            content = self._ask(COMPANY_PARSE_QUESTION, prompt, 'company_parse')
+        except Exception as e:
+            logger.error(f"Failed to parse company research with AI service: {e}")
+            return {
+                "basic_info": {"name": company_name},
+                "error": str(e)
+            }
+        return self.handle_company_parse_response(content, company_name)
+
+    def check_structured_response(self, content: str, schema: Dict[str, Any]) -> Optional[Tuple[Any, Dict[str, str]]]:
+        """
+        Decode a structured-output answer and validate it against schema
+
+        Returns (data, {dotted path: problem}), or None when the call failed
+        or the answer is not a JSON object at all.
+        """
+        if not content or content.startswith("Error"):
+            logger.warning(f"Structured parse call failed: {content}")
+            return None
+        try:
+            data = json.loads(clean_json_response(content))
+        except json.JSONDecodeError as e:
+            logger.warning(f"Structured parse answer is not valid JSON: {e}")
+            return None
+        if not isinstance(data, dict):
+            return None
+        return data, schema_errors(data, schema)
+
+    def build_repair_prompt(self, prompt: str, data: Dict[str, Any], errors: Dict[str, str]) -> str:
+        """
+        Build the follow-up prompt that asks again for only the invalid fields
+        """
+        problems = "\n".join(f"        - {path}: {problem}" for path, problem in errors.items())
+        repair_prompt = f"""
+        The structured data below was extracted from the source prompt that follows, but these fields are invalid:
+{problems}
+
+        Return a JSON object with a corrected value for each listed field, keyed by its dotted path.
+        Use null for missing information where the schema allows it.
+
+        Structured data:
+        {json.dumps(data)}
+
+        Source prompt:
+        {prompt}
+        """
+        return repair_prompt
+
+    def apply_repairs(self, data: Dict[str, Any], errors: Dict[str, str], repair_content: str,
+                      schema: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merge the repaired fields into data
+
+        A fix is only taken if it validates; fields still invalid afterwards
+        are set to null where the schema allows it.
+        """
+        repaired = self.check_structured_response(repair_content, repair_schema(schema, errors))
+        fixes = repaired[0] if repaired is not None else {}
+        for path in errors:
+            field_schema = schema_at(schema, path)
+            if path in fixes and not schema_errors(fixes[path], field_schema):
+                set_path(data, path, fixes[path])
+            elif is_nullable(field_schema):
+                set_path(data, path, None)
+        remaining = schema_errors(data, schema)
+        if remaining:
+            logger.warning(f"Structured parse still has {len(remaining)} invalid fields after repair: {', '.join(remaining)}")
+        return data
+
+    def _structured_requests(self, task: str, prompt: str):
+        # Shared by the sync and async variants: yields request kwargs and receives answers
+        question, schema, result_key = STRUCTURED_TASKS[task]
+        content = yield dict(
+            question=question, context=prompt, task=task,
+            response_format=json_schema_response_format(task, schema)
+        )
+        checked = self.check_structured_response(content, schema)
+        if checked is None:
+            return None
+        data, errors = checked
+        if errors:
+            logger.info(f"Repairing {len(errors)} invalid fields of the {task} output")
+            repair_content = yield dict(
+                question=STRUCTURED_REPAIR_QUESTION, context=self.build_repair_prompt(prompt, data, errors),
+                task=task, response_format=json_schema_response_format(f"{task}_repair", repair_schema(schema, errors))
+            )
+            data = self.apply_repairs(data, errors, repair_content, schema)
+        return data if result_key is None else data.get(result_key)
+
+    def structured_parse(self, task: str, prompt: str) -> Any:
+        """
+        Run a parse task with schema-constrained output, or return None to fall back to free text
+
+        One structured call, then at most one repair call that asks only for
+        the fields that failed validation.
+        """
+        requests = self._structured_requests(task, prompt)
+        try:
+            request = next(requests)
+            while True:
+                content = self._ask(**request)
+                request = requests.send(content)
+        except StopIteration as done:
+            return done.value
+        except Exception as e:
+            logger.warning(f"Structured {task} failed, falling back to free-text parsing: {e}")
+            return None
+
+    async def structured_parse_async(self, task: str, prompt: str, ask) -> Any:
+        """
+        Async variant of structured_parse; ask is a coroutine taking question, context, task and response_format
+        """
+        requests = self._structured_requests(task, prompt)
+        try:
+            request = next(requests)
+            while True:
+                content = await ask(**request)
+                request = requests.send(content)
+        except StopIteration as done:
+            return done.value
+        except Exception as e:
+            logger.warning(f"Structured {task} failed, falling back to free-text parsing: {e}")
+            return None
+
+    def build_company_batch_parse_prompt(self, research: List[Tuple[str, str]], selling_company: str = "Cerebras",
+                                         selling_company_info: Dict[str, Any] = None) -> str:
+        """
+        Build one parse prompt for several companies' (name, research text) pairs
+
+        The selling company context and the schema are sent once for the
+        whole batch instead of once per company.
+        """
+        selling_context = ""
+        if selling_company_info:
+            selling_context = selling_company_context(selling_company, selling_company_info)
+        
+        prompt = f"""
+        Parse the research about each of the {len(research)} companies below into a structured JSON format.
+        Extract all available information and organize each company according to this schema:
+        {selling_context}
+
+        {company_parse_schema(selling_company)}
+        {_batch_sections(research)}
+        Return a JSON array with exactly {len(research)} objects, one per company, in the order given.
+        Set basic_info.name to the company name shown in each section header.
+        Use null for missing information. Be precise with data types.
+        For the product analysis, match each company's needs to the most appropriate {selling_company} offering from our product lineup above.
+
+        Return only valid JSON array, no additional text.
+        """
+        return prompt
+
+    def handle_company_batch_parse_response(self, content: str, company_names: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Split a batched company parse into one result per company, in request order
+
+        Entries that are missing, malformed or name a different company come
+        back as None so the caller can re-parse just those companies alone.
+        """
+        results = []
+        for company_name, item in zip(company_names, self._batch_items(content, company_names)):
+            basic_info = item.get('basic_info') if isinstance(item, dict) else None
+            if isinstance(basic_info, dict) and _same_company(basic_info.get('name'), company_name):
+                results.append(item)
+            else:
+                results.append(None)
+        return results
+
+    def _batch_items(self, content: str, company_names: List[str]) -> List[Any]:
+        try:
+            items = json.loads(clean_json_response(content))
+        except json.JSONDecodeError as e:
+            logger.warning(f"Batched parse output is not valid JSON: {e}")
+            return [None] * len(company_names)
+        if not isinstance(items, list) or len(items) != len(company_names):
+            logger.warning(f"Batched parse returned {len(items) if isinstance(items, list) else 'no'} "
+                           f"entries for {len(company_names)} companies")
+            return [None] * len(company_names)
+        return items
             
-    def parse_contact_research(self, research_text: str, company_name: str) -> List[Dict[str, Any]]:
+    def build_contact_parse_prompt(self, research_text: str, company_name: str) -> str:
         """
-        Parse contact research into structured format
+        Build the schema prompt used to parse contact research
         """
         prompt = f"""
         Parse the following contact research for "{company_name}" into a structured JSON array format.
         Extract information about each contact person found:
 
-        [
-            {{
-                "basic_info": {{
-                    "first_name": "string",
-                    "last_name": "string", 
-                    "full_name": "string",
-                    "title": "string",
-                    "department": "string or null",
-                    "seniority_level": "string (c_level/vp/director/manager/senior/mid/junior/other)"
-                }},
-                "contact_info": {{
-                    "email": "string or null",
-                    "phone": "string or null",
-                    "linkedin_url": "string or null",
-                    "twitter_handle": "string or null"
-                }},
-                "professional_background": {{
-                    "tenure_at_company": "string or null",
-                    "previous_companies": ["array of company names"],
-                    "education": ["array of education details"],
-                    "certifications": ["array of certifications"]
-                }},
-                "decision_making": {{
-                    "decision_maker": "boolean",
-                    "influence_level": "string (high/medium/low/unknown)",
-                    "budget_authority": "boolean",
-                    "technical_background": "boolean"
-                }},
-                "ai_ml_profile": {{
-                    "ai_ml_experience": "string describing their AI/ML background",
-                    "ai_ml_interests": ["array of AI/ML interests"],
-                    "published_papers": ["array of paper titles"],
-                    "conference_speaking": ["array of speaking engagements"]
-                }},
-                "personalization": {{
-                    "communication_style": "string (technical/business/mixed/unknown)",
-                    "interests": ["array of professional interests"],
-                    "pain_points": ["array of challenges they face"],
-                    "recent_achievements": ["array of recent accomplishments"]
-                }},
-                "outreach_profile": {{
-                    "contact_priority": "string (primary/secondary/tertiary)",
-                    "preferred_contact_method": "string (email/linkedin/phone/unknown)"
-                }},
-                "research_quality": {{
-                    "quality_score": "integer (1-10 scale)",
-                    "data_sources": ["array of sources"]
-                }}
-            }}
-        ]
+        {CONTACT_PARSE_SCHEMA}
 
         Research Text:
         {research_text}
@@ -241,35 +481,100 @@ class AIResearchService:
         Set contact_priority to "primary" for C-level and VP roles, "secondary" for directors, "tertiary" for others.
         Return only valid JSON array, no additional text.
         """
-        
+        return prompt
+
+    def build_contact_batch_parse_prompt(self, research: List[Tuple[str, str]]) -> str:
+        """
+        Build one contact parse prompt for several companies' (name, contact research) pairs
+        """
+        prompt = f"""
+        Parse the following contact research for each of the {len(research)} companies below.
+        Extract information about each contact person found, as an array following this schema:
+
+        {CONTACT_PARSE_SCHEMA}
+        {_batch_sections(research)}
+        Return a JSON array with exactly {len(research)} objects, one per company, in the order given:
+        {{"company": "company name from the section header", "contacts": [contacts following the schema above]}}
+        Use boolean true/false appropriately.
+        Set contact_priority to "primary" for C-level and VP roles, "secondary" for directors, "tertiary" for others.
+        Return only valid JSON array, no additional text.
+        """
+        return prompt
+
+    def handle_contact_batch_parse_response(self, content: str, company_names: List[str]) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        Split a batched contact parse into one contact list per company, in request order
+
+        Entries that are missing, malformed or name a different company come
+        back as None so the caller can re-parse just those companies alone.
+        """
+        results = []
+        for company_name, item in zip(company_names, self._batch_items(content, company_names)):
+            if (isinstance(item, dict) and _same_company(item.get('company'), company_name)
+                    and isinstance(item.get('contacts'), list)):
+                results.append([contact for contact in item['contacts'] if isinstance(contact, dict)])
+            else:
+                results.append(None)
+        return results
+
+    def handle_contact_parse_response(self, content: str) -> List[Dict[str, Any]]:
+        """
+        Turn the model's contact parse output into a list of contact dicts
+        """
         try:
-            content = ask_cerebras(
-                question="Extract and structure the contact research data according to the JSON schema provided.",
-                context=prompt,
-                model="deepseek-r1-distill-llama-70b",
-                temp=0.1
-            )
+            extractor = StreamingJSONExtractor()
+            contacts = extractor.feed(content) + extractor.close()
+            if not extractor.done:
+                # Truncated or missing JSON - keep whatever contacts did close
+                logger.error(f"Contact parse output ended before the JSON closed: {content[:500]}...")
             
-            cleaned_content = clean_json_response(content)
-            parsed_data = json.loads(cleaned_content)
+            # A single contact object comes back as a one-item list
+            return [contact for contact in contacts if isinstance(contact, dict)]
             
-            # Ensure we return a list
-            if isinstance(parsed_data, list):
-                return parsed_data
-            elif isinstance(parsed_data, dict):
-                # If we got a single contact as dict, wrap it in a list
-                return [parsed_data]
-            else:
-                logger.error(f"Unexpected parsed data type: {type(parsed_data)}")
-                return []
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse AI service contact response as JSON: {e}")
-            logger.error(f"Content that failed to parse: {content[:500]}...")
-            return []
         except Exception as e:
             logger.error(f"Failed to parse contact research with AI service: {e}")
             return []
+
+    def stream_contact_research(self, research_text: str, company_name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Yield parsed contacts one by one, each as soon as the model closes its JSON object
+        """
+        prompt = self.build_contact_parse_prompt(research_text, company_name)
+        extractor = StreamingJSONExtractor()
+        stream = stream_cerebras(
+            question=CONTACT_PARSE_QUESTION,
+            context=prompt,
+            client=self.client,
+            **route_kwargs('contact_parse')
+        )
+        for text in stream:
+            for contact in extractor.feed(text):
+                if isinstance(contact, dict):
+                    yield contact
+        for contact in extractor.close():
+            if isinstance(contact, dict):
+                yield contact
+        if not extractor.done:
+            logger.error(f"Contact parse output for {company_name} ended before the JSON closed")
+
+    def parse_contact_research(self, research_text: str, company_name: str) -> List[Dict[str, Any]]:
+        """
+        Parse contact research into structured format
+
+        Contacts are collected from the streamed completion, so those that
+        closed before a mid-stream failure are kept.
+        """
+        if self.structured_output:
+            contacts = self.structured_parse('contact_parse', self.build_contact_parse_prompt(research_text, company_name))
+            if isinstance(contacts, list):
+                return [contact for contact in contacts if isinstance(contact, dict)]
+        contacts = []
+        try:
+            for contact in self.stream_contact_research(research_text, company_name):
+                contacts.append(contact)
+        except Exception as e:
+            logger.error(f"Failed to parse contact research with AI service: {e}")
+        return contacts
             
     def generate_personalized_email_content(self, company_data: Dict[str, Any], contact_data: Dict[str, Any], company_offerings: Dict[str, Any], selling_company: str = "Cerebras") -> str:
         """
@@ -313,11 +618,10 @@ class AIResearchService:
         {selling_company}
         """
         try:
-            content = ask_cerebras(
-                question="Generate a personalized cold outreach email according to the requirements provided.",
-                context=prompt,
-                model="deepseek-r1-distill-llama-70b",
-                temp=0.3
+            content = self._ask(
+                "Generate a personalized cold outreach email according to the requirements provided.",
+                prompt,
+                'email'
             )
 
             return content
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import logging
+import threading
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from companies.models import Company, ResearchArtifact
+from companies.models.company import normalize_company_name
+from .freshness import PHASE_TTLS, is_usable_research
+
+logger = logging.getLogger(__name__)
+
+# Outputs worth checkpointing; errors and empty results are recomputed on the next run
+_USABLE_OUTPUT = {
+    'parsed_company': lambda output: isinstance(output, dict) and 'error' not in output,
+    'parsed_contacts': lambda output: isinstance(output, list) and bool(output),
+}
+_USABLE_OUTPUT.update({phase: is_usable_research for phase in PHASE_TTLS})
+
+
+def prompt_hash(*parts: str) -> str:
+    """Stable key for the prompt (question, context, ...) that produced a phase output"""
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+class ResearchCheckpoints:
+    """
+    Per-phase checkpoints for one company's research run
+
+    Artifacts from earlier runs are loaded once, up front: a research phase
+    is reused while it is younger than its TTL, and a parse phase whenever
+    its prompt (which embeds the research text and the schema) is unchanged,
+    so a new schema re-parses without refetching research. Lookups during
+    the run are in memory; save() writes one ResearchArtifact per freshly
+    computed phase and must be called on the thread that owns the DB
+    connection (TaskGraph.run on_result, or sync_to_async).
+    """
+
+    def __init__(self, company_name: str, company: Optional[Company] = None, reuse: bool = True):
+        self.company_key = normalize_company_name(company_name)
+        self.company = company
+        self.reused = set()
+        self._computed: Dict[str, Tuple[str, Any]] = {}  # phase -> (prompt hash, start time)
+        self._lock = threading.Lock()
+        self._reusable = self._load() if reuse and self.company_key else {}
+
+    def _load(self) -> Dict[Tuple[str, str], Any]:
+        now = timezone.now()
+        window = now - timedelta(seconds=max(PHASE_TTLS.values()))
+        reusable = {}
+        artifacts = ResearchArtifact.objects.filter(
+            company_key=self.company_key, finished_at__gte=window
+        ).order_by('finished_at').values_list('phase', 'prompt_hash', 'output', 'finished_at')
+        for phase, key, output, finished_at in artifacts:
+            ttl = PHASE_TTLS.get(phase)
+            if ttl is not None and now - finished_at >= timedelta(seconds=ttl):
+                continue
+            reusable[(phase, key)] = output  # Newest artifact wins
+        return reusable
+
+    def _checkpointed(self, phase: str, key: str) -> Any:
+        output = self._reusable.get((phase, key))
+        if output is not None:
+            logger.info(f"Resuming {phase} for {self.company_key} from checkpoint")
+            with self._lock:
+                self.reused.add(phase)
+            return output
+        with self._lock:
+            self._computed[phase] = (key, timezone.now())
+        return None
+
+    def run(self, phase: str, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the checkpointed output for this phase and prompt, or compute it"""
+        output = self._checkpointed(phase, key)
+        return compute() if output is None else output
+
+    async def run_async(self, phase: str, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Async twin of run(); the new artifact is saved before returning"""
+        output = self._checkpointed(phase, key)
+        if output is not None:
+            return output
+        output = await compute()
+        await sync_to_async(self.save)(phase, output)
+        return output
+
+    def save(self, phase: str, output: Any) -> Optional[ResearchArtifact]:
+        """Store a phase output computed by run(); reused or unusable outputs are skipped"""
+        with self._lock:
+            key, started_at = self._computed.pop(phase, (None, None))
+        if key is None or not _USABLE_OUTPUT[phase](output):
+            return None
+        finished_at = timezone.now()
+        return ResearchArtifact.objects.create(
+            company_key=self.company_key,
+            company=self.company,
+            phase=phase,
+            prompt_hash=key,
+            output=output,
+            started_at=started_at,
+            finished_at=finished_at,
+            duration_ms=int((finished_at - started_at).total_seconds() * 1000),
+        )
+
+    def attach(self, company: Company):
+        """Link artifacts written before the Company row existed to it"""
+        self.company = company
+        ResearchArtifact.objects.filter(company_key=self.company_key, company__isnull=True).update(company=company)
@@ -0,0 +1,80 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+
+from django.utils import timezone
+
+from common.config import (
+    RESEARCH_TTL_BASIC,
+    RESEARCH_TTL_CONTACTS,
+    RESEARCH_TTL_COMPETITORS,
+    RESEARCH_TTL_NEWS,
+)
+from companies.models import Company
+from .perplexity_service import FALLBACK_RESEARCH_MARKER
+
+logger = logging.getLogger(__name__)
+
+# Perplexity phases of the research pipeline and how long their raw text stays fresh
+PHASE_TTLS = {
+    'basic_research': RESEARCH_TTL_BASIC,
+    'contact_research': RESEARCH_TTL_CONTACTS,
+    'competitor_analysis': RESEARCH_TTL_COMPETITORS,
+    'recent_news': RESEARCH_TTL_NEWS,
+}
+RESEARCH_PHASES = tuple(PHASE_TTLS)
+# Phases combined into the text the company parser reads
+COMPANY_PHASES = ('basic_research', 'competitor_analysis', 'recent_news')
+
+
+def is_usable_research(text: str) -> bool:
+    """Error strings and offline fallback text are never stored as fresh research"""
+    return bool(text) and not text.startswith("Error") and FALLBACK_RESEARCH_MARKER not in text
+
+
+def stale_phases(company: Optional[Company], now: Optional[datetime] = None) -> Set[str]:
+    """
+    Phases whose stored raw text is missing or older than the phase TTL
+
+    A company without stored phases (new, or researched before phases were
+    kept) is stale in every phase.
+    """
+    if company is None:
+        return set(RESEARCH_PHASES)
+    now = now or timezone.now()
+    phases = company.research_phases or {}
+    stale = set()
+    for phase, ttl in PHASE_TTLS.items():
+        entry = phases.get(phase)
+        try:
+            fetched_at = datetime.fromisoformat(entry['fetched_at'])
+        except (TypeError, KeyError, ValueError):
+            stale.add(phase)
+            continue
+        if now - fetched_at >= timedelta(seconds=ttl):
+            stale.add(phase)
+    return stale
+
+
+def stored_phase_text(company: Company, phase: str) -> str:
+    return ((company.research_phases or {}).get(phase) or {}).get('text', '')
+
+
+def record_phases(company: Company, texts: Dict[str, str], now: Optional[datetime] = None) -> Company:
+    """
+    Store freshly fetched raw phase text and bump research_last_updated
+
+    Only usable text is stored, so a failed phase stays stale and is retried
+    on the next run.
+    """
+    now = now or timezone.now()
+    phases = dict(company.research_phases or {})
+    for phase, text in texts.items():
+        if is_usable_research(text):
+            phases[phase] = {'text': text, 'fetched_at': now.isoformat()}
+        else:
+            logger.info(f"Not storing {phase} for {company.name}: research unavailable")
+    company.research_phases = phases
+    company.research_last_updated = now
+    company.save(update_fields=['research_phases', 'research_last_updated'])
+    return company
@@ -0,0 +1,188 @@
+import json
+import logging
+import re
+from typing import Any, List
+
+from common.utils import ThinkBlockFilter
+
+logger = logging.getLogger(__name__)
+
+_VALUE_START = re.compile(r'[{\[]')
+# A run of plain value text and complete strings, then the structural character that ends it
+_VALUE_TOKEN = re.compile(r'((?:[^"/{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*)(.?)', re.DOTALL)
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+# Scanner modes
+_SEEK, _VALUE, _STRING, _ESCAPE, _SLASH, _LINE_COMMENT, _BLOCK_COMMENT, _BLOCK_STAR, _DONE = range(9)
+
+
+class StreamingJSONExtractor:
+    """
+    Incrementally extract JSON from model output as it is streamed.
+
+    A single linear pass over the text that skips <think> blocks, markdown
+    fences and any prose before the first '{' or '[', drops // and /* */
+    comments outside strings, removes trailing commas and ignores everything
+    after the top-level value closes. feed() returns each element of a
+    top-level array as soon as its closing brace arrives (or the top-level
+    object itself once it closes), so callers can act on items
+    mid-generation. With emit_items=False it only builds the cleaned text.
+    """
+
+    def __init__(self, emit_items: bool = True):
+        self.emit_items = emit_items
+        self._think_filter = ThinkBlockFilter()
+        self._out = []            # Cleaned JSON pieces of the top-level value
+        self._mode = _SEEK
+        self._depth = 0
+        self._top_level_array = False
+        self._item_start = None   # Index in _out where the current array element began
+
+    @property
+    def started(self) -> bool:
+        """True once the opening brace or bracket of the top-level value was seen"""
+        return self._mode != _SEEK
+
+    @property
+    def done(self) -> bool:
+        """True once the top-level value has closed"""
+        return self._mode == _DONE
+
+    @property
+    def text(self) -> str:
+        """Cleaned JSON text seen so far"""
+        return "".join(self._out)
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk of model output and return the items it completed"""
+        return self._scan(self._think_filter.feed(chunk))
+
+    def close(self) -> List[Any]:
+        """Flush held-back text at end of stream and return any final items"""
+        return self._scan(self._think_filter.flush())
+
+    def result(self) -> Any:
+        """Parse the complete top-level value; raises json.JSONDecodeError if invalid"""
+        return json.loads(self.text)
+
+    def _scan(self, text: str) -> List[Any]:
+        items = []
+        out = self._out
+        mode, depth = self._mode, self._depth
+        index, length = 0, len(text)
+        while index < length:
+            if mode == _VALUE:
+                match = _VALUE_TOKEN.match(text, index)
+                run, char = match.groups()
+                if run:
+                    out.append(run)
+                index = match.end()
+                if not char:
+                    break
+                if char == '{' or char == '[':
+                    if depth == 1 and self._top_level_array:
+                        self._item_start = len(out)
+                    depth += 1
+                    out.append(char)
+                elif char == '}' or char == ']':
+                    self._strip_trailing_comma()
+                    out.append(char)
+                    depth -= 1
+                    if depth == 0:
+                        mode = _DONE
+                        if not self._top_level_array:
+                            self._emit(self.text, items)
+                        break
+                    if depth == 1 and self._item_start is not None:
+                        self._emit("".join(out[self._item_start:]), items)
+                        self._item_start = None
+                elif char == '"':
+                    # String continues past the end of this chunk
+                    out.append(char)
+                    mode = _STRING
+                else:
+                    mode = _SLASH
+            elif mode == _STRING:
+                match = _STRING_SPECIAL.search(text, index)
+                if not match:
+                    out.append(text[index:])
+                    break
+                out.append(text[index:match.end()])
+                mode = _ESCAPE if match.group() == '\\' else _VALUE
+                index = match.end()
+            elif mode == _ESCAPE:
+                out.append(text[index])
+                mode = _STRING
+                index += 1
+            elif mode == _SEEK:
+                match = _VALUE_START.search(text, index)
+                if not match:
+                    break
+                self._top_level_array = match.group() == '['
+                depth = 1
+                out.append(match.group())
+                mode = _VALUE
+                index = match.end()
+            elif mode == _SLASH:
+                if text[index] == '/':
+                    mode = _LINE_COMMENT
+                    index += 1
+                elif text[index] == '*':
+                    mode = _BLOCK_COMMENT
+                    index += 1
+                else:
+                    out.append('/')
+                    mode = _VALUE
+            elif mode == _LINE_COMMENT:
+                newline = text.find('\n', index)
+                if newline < 0:
+                    break
+                mode = _VALUE
+                index = newline
+            elif mode == _BLOCK_STAR and text[index] == '/':
+                mode = _VALUE
+                index += 1
+            elif mode == _BLOCK_COMMENT or mode == _BLOCK_STAR:
+                end = text.find('*/', index)
+                if end < 0:
+                    mode = _BLOCK_STAR if text.endswith('*') else _BLOCK_COMMENT
+                    break
+                mode = _VALUE
+                index = end + 2
+            else:
+                break
+        self._mode, self._depth = mode, depth
+        return items
+
+    def _strip_trailing_comma(self):
+        out = self._out
+        while out:
+            piece = out[-1].rstrip()
+            if piece.endswith(','):
+                out[-1] = piece[:-1]
+                return
+            if piece:
+                return
+            out.pop()
+
+    def _emit(self, text: str, items: List[Any]):
+        if not self.emit_items:
+            return
+        try:
+            items.append(json.loads(text))
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed JSON item in streamed output: {e}")
+
+
+def extract_json_text(content: str) -> str:
+    """
+    Return the cleaned JSON value embedded in a complete model response.
+
+    Falls back to the stripped content when no '{' or '[' is present.
+    """
+    extractor = StreamingJSONExtractor(emit_items=False)
+    extractor.feed(content)
+    extractor.close()
+    if not extractor.started:
+        return content.replace('```json', '').replace('```', '').strip()
+    return extractor.text.strip()
@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# backend/companies/company_offerings.json
+OFFERINGS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'company_offerings.json'
+)
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict handed out by the offerings repository.
+
+    Subclassing dict keeps it a drop-in for existing callers (.get(),
+    iteration, json.dumps) while making accidental mutation of the shared
+    cached copy fail loudly.
+    """
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Company offerings are read-only; save changes through the offerings repository")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class OfferingsRepository:
+    """
+    Process-wide, parse-once store for company_offerings.json.
+
+    load() re-parses only when the file's mtime or size changes, or after
+    save() wrote new contents; every caller shares one frozen copy.
+    ``version`` increases with every (re)parse so derived data such as
+    rendered prompt fragments can be cached against it.
+    """
+
+    def __init__(self, path: str = OFFERINGS_PATH):
+        self.path = path
+        self.version = 0
+        self._data: Dict[str, Any] = FrozenDict()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _stat_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> Dict[str, Any]:
+        """Return the parsed offerings (an empty dict when the file is missing or invalid)"""
+        signature = self._stat_signature()
+        if self._loaded and signature == self._signature:
+            return self._data
+
+        with self._lock:
+            signature = self._stat_signature()
+            if self._loaded and signature == self._signature:
+                return self._data
+            data = {}
+            if signature is not None:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                except Exception as e:
+                    logger.error(f"Failed to load company offerings: {e}")
+            else:
+                logger.error(f"Failed to load company offerings: {self.path} not found")
+            self._data = _freeze(data)
+            self._signature = signature
+            self._loaded = True
+            self.version += 1
+            return self._data
+
+    def invalidate(self):
+        """Force the next load() to re-read the file"""
+        with self._lock:
+            self._loaded = False
+
+    def save(self, data: Dict[str, Any]):
+        """Atomically replace the offerings file and invalidate the cached copy"""
+        directory = os.path.dirname(self.path)
+        fd, tmp_path = tempfile.mkstemp(prefix='.company_offerings.', suffix='.json', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.chmod(tmp_path, 0o644)  # mkstemp creates the file owner-only
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        finally:
+            self.invalidate()
+
+
+_offerings_repository: Optional[OfferingsRepository] = None
+_offerings_repository_lock = threading.Lock()
+
+
+def get_offerings_repository() -> OfferingsRepository:
+    """
+    Return the process-wide offerings repository
+    """
+    global _offerings_repository
+
+    if _offerings_repository is None:
+        with _offerings_repository_lock:
+            if _offerings_repository is None:
+                _offerings_repository = OfferingsRepository()
+    return _offerings_repository
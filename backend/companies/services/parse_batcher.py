@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ParseBatcher:
+    """
+    Coalesce concurrent parse requests into batched calls.
+
+    submit() queues one payload and waits for its result. The queued
+    payloads are sent together once max_items are waiting, once adding the
+    next one would exceed max_tokens, or max_wait seconds after the first
+    one arrived, whichever comes first. run_batch receives the payloads and
+    returns one result per payload, in order; an exception in that list is
+    raised to that payload's submitter only.
+    """
+
+    def __init__(self, run_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_items: int, max_tokens: int, max_wait: float):
+        self.run_batch = run_batch
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self.max_wait = max_wait
+        self._queue = []  # (payload, future)
+        self._tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running = set()
+
+    async def submit(self, payload: Any, tokens: int = 0) -> Any:
+        """Queue one payload and return its result once its batch has run"""
+        loop = asyncio.get_running_loop()
+        if self._queue and self._tokens + tokens > self.max_tokens:
+            self.flush()
+        future = loop.create_future()
+        self._queue.append((payload, future))
+        self._tokens += tokens
+        if len(self._queue) >= self.max_items:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self.flush)
+        return await future
+
+    def flush(self):
+        """Send whatever is queued now"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._queue, self._tokens = self._queue, [], 0
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch):
+        try:
+            results = await self.run_batch([payload for payload, _ in batch])
+        except Exception as e:
+            logger.error(f"Parse batch of {len(batch)} failed: {e}")
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue  # Submitter was cancelled
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
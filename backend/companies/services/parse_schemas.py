@@ -0,0 +1,245 @@
+import copy
+from typing import Any, Dict, Iterable
+
+# JSON schemas for the structured-output parse tasks. They mirror the prose
+# schemas in cerebras_service (company_parse_schema, CONTACT_PARSE_SCHEMA)
+# and the choices on the Company and Contact models.
+
+_STRING = {"type": "string"}
+_NULLABLE_STRING = {"type": ["string", "null"]}
+_NULLABLE_INTEGER = {"type": ["integer", "null"]}
+_BOOLEAN = {"type": "boolean"}
+_STRINGS = {"type": "array", "items": _STRING}
+_SCORE = {"type": ["integer", "null"], "minimum": 1, "maximum": 10}
+
+# Keywords checked by schema_errors but not sent with response_format
+_VALIDATION_ONLY = ("minimum", "maximum")
+
+_PYTHON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+    "null": type(None),
+}
+
+
+def _object(properties: Dict[str, Any]) -> Dict[str, Any]:
+    # Strict structured output requires every property and no extras
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def _choice(*values: str, nullable: bool = False) -> Dict[str, Any]:
+    if nullable:
+        return {"type": ["string", "null"], "enum": list(values) + [None]}
+    return {"type": "string", "enum": list(values)}
+
+
+COMPANY_PARSE_JSON_SCHEMA = _object({
+    "basic_info": _object({
+        "name": _STRING,
+        "website": _NULLABLE_STRING,
+        "description": _NULLABLE_STRING,
+        "industry": _NULLABLE_STRING,
+        "sector": _NULLABLE_STRING,
+        "headquarters_location": _NULLABLE_STRING,
+        "founded_year": _NULLABLE_INTEGER,
+        "employee_count": _NULLABLE_STRING,
+        "employee_count_exact": _NULLABLE_INTEGER,
+    }),
+    "financial_info": _object({
+        "ipo_status": _NULLABLE_STRING,
+        "stock_symbol": _NULLABLE_STRING,
+        "market_cap": _NULLABLE_STRING,
+        "last_funding_round": _NULLABLE_STRING,
+        "last_funding_amount": _NULLABLE_STRING,
+        "last_funding_date": _NULLABLE_STRING,
+        "total_funding": _NULLABLE_STRING,
+        "valuation": _NULLABLE_STRING,
+        "revenue": _NULLABLE_STRING,
+        "revenue_growth": _NULLABLE_STRING,
+    }),
+    "business_intelligence": _object({
+        "business_model": _NULLABLE_STRING,
+        "key_products": _STRINGS,
+        "key_technologies": _STRINGS,
+        "competitors": _STRINGS,
+    }),
+    "ai_ml_info": _object({
+        "ai_ml_usage": _NULLABLE_STRING,
+        "current_ai_infrastructure": _NULLABLE_STRING,
+        "ai_initiatives": _STRINGS,
+        "ml_use_cases": _STRINGS,
+        "data_science_team_size": _NULLABLE_STRING,
+    }),
+    "product_analysis": _object({
+        "recommended_product": _NULLABLE_STRING,
+        "fit_score": _SCORE,
+        "value_proposition": _NULLABLE_STRING,
+        "potential_use_cases": _STRINGS,
+        "implementation_timeline": _NULLABLE_STRING,
+        "estimated_budget_range": _NULLABLE_STRING,
+    }),
+    "research_metadata": _object({
+        "quality_score": _SCORE,
+        "sources": _STRINGS,
+        "notes": _NULLABLE_STRING,
+    }),
+})
+
+_CONTACT_JSON_SCHEMA = _object({
+    "basic_info": _object({
+        "first_name": _STRING,
+        "last_name": _STRING,
+        "full_name": _STRING,
+        "title": _NULLABLE_STRING,
+        "department": _NULLABLE_STRING,
+        "seniority_level": _choice(
+            "c_level", "vp", "director", "manager", "senior", "mid", "junior", "other", nullable=True
+        ),
+    }),
+    "contact_info": _object({
+        "email": _NULLABLE_STRING,
+        "phone": _NULLABLE_STRING,
+        "linkedin_url": _NULLABLE_STRING,
+        "twitter_handle": _NULLABLE_STRING,
+    }),
+    "professional_background": _object({
+        "tenure_at_company": _NULLABLE_STRING,
+        "previous_companies": _STRINGS,
+        "education": _STRINGS,
+        "certifications": _STRINGS,
+    }),
+    "decision_making": _object({
+        "decision_maker": _BOOLEAN,
+        "influence_level": _choice("high", "medium", "low", "unknown"),
+        "budget_authority": _BOOLEAN,
+        "technical_background": _BOOLEAN,
+    }),
+    "ai_ml_profile": _object({
+        "ai_ml_experience": _NULLABLE_STRING,
+        "ai_ml_interests": _STRINGS,
+        "published_papers": _STRINGS,
+        "conference_speaking": _STRINGS,
+    }),
+    "personalization": _object({
+        "communication_style": _choice("technical", "business", "mixed", "unknown"),
+        "interests": _STRINGS,
+        "pain_points": _STRINGS,
+        "recent_achievements": _STRINGS,
+    }),
+    "outreach_profile": _object({
+        "contact_priority": _choice("primary", "secondary", "tertiary"),
+        "preferred_contact_method": _choice("email", "linkedin", "phone", "unknown"),
+    }),
+    "research_quality": _object({
+        "quality_score": _SCORE,
+        "data_sources": _STRINGS,
+    }),
+})
+
+# Structured output needs an object at the top level, so contacts are wrapped
+CONTACT_PARSE_JSON_SCHEMA = _object({
+    "contacts": {"type": "array", "items": _CONTACT_JSON_SCHEMA},
+})
+
+
+def _strip_validation_only(schema: Any) -> Any:
+    if isinstance(schema, dict):
+        return {key: _strip_validation_only(value) for key, value in schema.items() if key not in _VALIDATION_ONLY}
+    if isinstance(schema, list):
+        return [_strip_validation_only(value) for value in schema]
+    return schema
+
+
+def json_schema_response_format(name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """response_format asking the model for output that follows schema"""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "strict": True, "schema": _strip_validation_only(schema)},
+    }
+
+
+def _is_type(value: Any, type_name: str) -> bool:
+    if isinstance(value, bool) and type_name in ("integer", "number"):
+        return False
+    return isinstance(value, _PYTHON_TYPES[type_name])
+
+
+def schema_errors(value: Any, schema: Dict[str, Any], path: str = "") -> Dict[str, str]:
+    """
+    Validate value against schema, returning {dotted path: problem}
+
+    Supports the subset of JSON schema used above: type, enum, minimum,
+    maximum, object properties/required and array items. Paths index list
+    items by position (e.g. "contacts.2.basic_info.seniority_level").
+    """
+    types = schema.get("type")
+    if types is not None:
+        types = [types] if isinstance(types, str) else types
+        if not any(_is_type(value, type_name) for type_name in types):
+            return {path: f"expected {' or '.join(types)}, got {type(value).__name__}"}
+    if value is None:
+        return {}
+    if "enum" in schema and value not in schema["enum"]:
+        return {path: f"expected one of {', '.join(str(option) for option in schema['enum'] if option is not None)}"}
+    if "minimum" in schema and value < schema["minimum"]:
+        return {path: f"must be at least {schema['minimum']}"}
+    if "maximum" in schema and value > schema["maximum"]:
+        return {path: f"must be at most {schema['maximum']}"}
+
+    errors = {}
+    prefix = f"{path}." if path else ""
+    if isinstance(value, dict):
+        properties = schema.get("properties", {})
+        for key in schema.get("required", []):
+            if key not in value:
+                errors[f"{prefix}{key}"] = "missing"
+        for key, child in properties.items():
+            if key in value:
+                errors.update(schema_errors(value[key], child, f"{prefix}{key}"))
+    elif isinstance(value, list) and "items" in schema:
+        for index, item in enumerate(value):
+            errors.update(schema_errors(item, schema["items"], f"{prefix}{index}"))
+    return errors
+
+
+def schema_at(schema: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """Sub-schema describing the value at a dotted path"""
+    for part in path.split(".") if path else []:
+        schema = schema["items"] if part.isdigit() else schema["properties"][part]
+    return schema
+
+
+def set_path(data: Any, path: str, value: Any):
+    """Set the value at a dotted path, creating missing intermediate objects"""
+    parts = path.split(".")
+    for part in parts[:-1]:
+        if part.isdigit():
+            data = data[int(part)]
+        else:
+            if not isinstance(data.get(part), (dict, list)):
+                data[part] = {}
+            data = data[part]
+    last = parts[-1]
+    if last.isdigit():
+        data[int(last)] = value
+    else:
+        data[last] = value
+
+
+def is_nullable(schema: Dict[str, Any]) -> bool:
+    types = schema.get("type")
+    return types == "null" or (isinstance(types, list) and "null" in types)
+
+
+def repair_schema(schema: Dict[str, Any], paths: Iterable[str]) -> Dict[str, Any]:
+    """Schema for a repair answer: one property per invalid dotted path, holding only that value"""
+    return _object({path: copy.deepcopy(schema_at(schema, path)) for path in paths})
@@ -1,9 +1,14 @@
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+from common.clients import get_perplexity_session
+from common.model_routing import route_kwargs
 from common.utils import ask_perplexity
+from .prompt_fragments import selling_company_details
 
 logger = logging.getLogger(__name__)
 
+FALLBACK_RESEARCH_MARKER = "This is fallback content generated when external research services are unavailable."
+
 
 class PerplexityService:
     """
@@ -12,33 +17,27 @@ class PerplexityService:
     
     def __init__(self):
         pass
+
+    @property
+    def session(self):
+        """Pooled requests session shared with every other Perplexity caller"""
+        return get_perplexity_session()
         
-    def research_company_comprehensive(self, company_name: str, selling_company: str = "Our Company", selling_context: str = "AI infrastructure", selling_company_info: Dict[str, Any] = None) -> str:
+    def response_text(self, response) -> str:
+        """Extract the text from an ask_perplexity response (dict or string)"""
+        # Handle both dict and string responses
+        if isinstance(response, dict):
+            return response.get('content', str(response))
+        return str(response)
+
+    def build_company_research_prompt(self, company_name: str, selling_company: str = "Our Company", selling_context: str = "AI infrastructure", selling_company_info: Dict[str, Any] = None) -> Tuple[str, str]:
         """
-        Get comprehensive company information for sales targeting
+        Build the (question, context) pair for comprehensive company research
         """
-        # Build selling company context
+        # Selling company context, rendered once per offerings version
         selling_context_details = ""
         if selling_company_info:
-            company_details = selling_company_info.get('company', {})
-            products = selling_company_info.get('products', {})
-            
-            selling_context_details = f"""
-            
-            ABOUT {selling_company.upper()}:
-            Company: {company_details.get('name', selling_company)}
-            Industry: {company_details.get('industry', 'Technology')}
-            Description: {company_details.get('description', '')}
-            
-            Our Products/Services:
-            """
-            for product_name, product_details in products.items():
-                selling_context_details += f"""
-            - {product_name}: {product_details.get('Description', '')}
-              Categories: {product_details.get('Category', '')}
-              Key Features: {', '.join(product_details.get('Key Features', []))}
-              Use Cases: {', '.join(product_details.get('Usecase', []))}
-            """
+            selling_context_details = selling_company_details(selling_company, selling_company_info)
         
         prompt = f"""
         Research the company "{company_name}" and provide comprehensive information for {selling_context} sales targeting. 
@@ -99,23 +98,33 @@ class PerplexityService:
         Consider how our specific products/services could benefit this target company.
         """
         
+        return f"Provide comprehensive company research for {selling_context} sales targeting.", prompt
+
+    def handle_company_research_response(self, response, company_name: str, selling_company: str = "Our Company", selling_context: str = "AI infrastructure") -> str:
+        """
+        Turn a comprehensive research response into text, falling back when the API is unavailable
+        """
+        # Check if response indicates an error (like 401 Unauthorized)
+        if isinstance(response, str) and ("401" in response or "Unauthorized" in response or "Error:" in response):
+            logger.warning(f"Perplexity API unavailable for {company_name}, using fallback research")
+            return self._generate_fallback_research(company_name, selling_company, selling_context)
+        return self.response_text(response)
+
+    def research_company_comprehensive(self, company_name: str, selling_company: str = "Our Company", selling_context: str = "AI infrastructure", selling_company_info: Dict[str, Any] = None, use_cache: bool = True) -> str:
+        """
+        Get comprehensive company information for sales targeting
+        """
+        question, prompt = self.build_company_research_prompt(company_name, selling_company, selling_context, selling_company_info)
+        
         try:
             response = ask_perplexity(
-                question=f"Provide comprehensive company research for {selling_context} sales targeting.",
+                question=question,
                 context=prompt,
-                model="sonar-pro",
-                temp=0.1
+                session=self.session,
+                use_cache=use_cache,
+                **route_kwargs('research')
             )
-            
-            # Check if response indicates an error (like 401 Unauthorized)
-            if isinstance(response, str) and ("401" in response or "Unauthorized" in response or "Error:" in response):
-                logger.warning(f"Perplexity API unavailable for {company_name}, using fallback research")
-                return self._generate_fallback_research(company_name, selling_company, selling_context)
-            
-            # Handle both dict and string responses
-            if isinstance(response, dict):
-                return response.get('content', str(response))
-            return str(response)
+            return self.handle_company_research_response(response, company_name, selling_company, selling_context)
             
         except Exception as e:
             logger.error(f"Failed to research company {company_name}: {e}")
@@ -140,12 +149,12 @@ class PerplexityService:
 - Identify key decision makers
 - Prepare customized pitch based on industry trends
 
-*Note: This is fallback content generated when external research services are unavailable.*
+*Note: {FALLBACK_RESEARCH_MARKER}*
 """
             
-    def research_specific_contacts(self, company_name: str, target_roles: List[str] = None) -> str:
+    def build_contact_research_prompt(self, company_name: str, target_roles: List[str] = None) -> Tuple[str, str]:
         """
-        Research specific contacts at a company
+        Build the (question, context) pair for contact research
         """
         if target_roles is None:
             target_roles = [
@@ -180,26 +189,31 @@ class PerplexityService:
         Include their social media presence and any recent interviews or articles they've written.
         """
         
+        return "Find detailed information about key technology leaders at the company.", prompt
+
+    def research_specific_contacts(self, company_name: str, target_roles: List[str] = None, use_cache: bool = True) -> str:
+        """
+        Research specific contacts at a company
+        """
+        question, prompt = self.build_contact_research_prompt(company_name, target_roles)
+        
         try:
             response = ask_perplexity(
-                question="Find detailed information about key technology leaders at the company.",
+                question=question,
                 context=prompt,
-                model="sonar-pro",
-                temp=0.1
+                session=self.session,
+                use_cache=use_cache,
+                **route_kwargs('research')
             )
-            
-            # Handle both dict and string responses
-            if isinstance(response, dict):
-                return response.get('content', str(response))
-            return str(response)
+            return self.response_text(response)
             
         except Exception as e:
             logger.error(f"Failed to research contacts for {company_name}: {e}")
             return f"Error researching contacts: {str(e)}"
             
-    def analyze_competitor_landscape(self, company_name: str, selling_company: str = "Our Company") -> str:
+    def build_competitor_analysis_prompt(self, company_name: str, selling_company: str = "Our Company") -> Tuple[str, str]:
         """
-        Analyze the competitive landscape to understand positioning
+        Build the (question, context) pair for competitive landscape analysis
         """
         prompt = f"""
         Analyze the competitive landscape for "{company_name}" specifically related to AI infrastructure and compute needs:
@@ -228,26 +242,31 @@ class PerplexityService:
         Focus on actionable insights for positioning {selling_company} solutions.
         """
         
+        return "Analyze the competitive landscape related to AI infrastructure and compute needs.", prompt
+
+    def analyze_competitor_landscape(self, company_name: str, selling_company: str = "Our Company", use_cache: bool = True) -> str:
+        """
+        Analyze the competitive landscape to understand positioning
+        """
+        question, prompt = self.build_competitor_analysis_prompt(company_name, selling_company)
+        
         try:
             response = ask_perplexity(
-                question="Analyze the competitive landscape related to AI infrastructure and compute needs.",
+                question=question,
                 context=prompt,
-                model="sonar-pro",
-                temp=0.1
+                session=self.session,
+                use_cache=use_cache,
+                **route_kwargs('research')
             )
-            
-            # Handle both dict and string responses
-            if isinstance(response, dict):
-                return response.get('content', str(response))
-            return str(response)
+            return self.response_text(response)
             
         except Exception as e:
             logger.error(f"Failed to analyze competitors for {company_name}: {e}")
             return f"Error analyzing competitors: {str(e)}"
             
-    def research_recent_news_and_initiatives(self, company_name: str) -> str:
+    def build_recent_news_prompt(self, company_name: str) -> Tuple[str, str]:
         """
-        Get recent news and AI initiatives
+        Build the (question, context) pair for recent news research
         """
         prompt = f"""
         Find the most recent news and developments about "{company_name}" in the last 6 months, focusing on:
@@ -283,18 +302,23 @@ class PerplexityService:
         Focus on information that could inform outreach timing and messaging.
         """
         
+        return "Find recent news and developments about the company, focusing on AI and technology initiatives.", prompt
+
+    def research_recent_news_and_initiatives(self, company_name: str, use_cache: bool = True) -> str:
+        """
+        Get recent news and AI initiatives
+        """
+        question, prompt = self.build_recent_news_prompt(company_name)
+        
         try:
             response = ask_perplexity(
-                question="Find recent news and developments about the company, focusing on AI and technology initiatives.",
+                question=question,
                 context=prompt,
-                model="sonar-pro",
-                temp=0.1
+                session=self.session,
+                use_cache=use_cache,
+                **route_kwargs('research')
             )
-            
-            # Handle both dict and string responses
-            if isinstance(response, dict):
-                return response.get('content', str(response))
-            return str(response)
+            return self.response_text(response)
             
         except Exception as e:
             logger.error(f"Failed to research recent news for {company_name}: {e}")
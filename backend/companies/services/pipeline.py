@@ -0,0 +1,91 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TaskGraph:
+    """
+    Small dependency-graph executor for the research pipeline.
+
+    Each task is a callable plus the names of the tasks it depends on. Tasks
+    without unmet dependencies run concurrently on a thread pool, and a task
+    is submitted as soon as the last of its inputs has finished, receiving
+    their results as positional arguments in declaration order.
+    """
+
+    def __init__(self, name: str = "pipeline", max_workers: Optional[int] = None):
+        self.name = name
+        self.max_workers = max_workers
+        self._tasks: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...]]] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, func: Callable[..., Any], depends_on: Iterable[str] = ()) -> "TaskGraph":
+        """Register a task; dependencies must be registered before it runs"""
+        if name in self._tasks:
+            raise ValueError(f"Task '{name}' is already registered in {self.name}")
+        self._tasks[name] = (func, tuple(depends_on))
+        return self
+
+    def _timed(self, name: str, func: Callable[..., Any], *args) -> Any:
+        started = time.monotonic()
+        try:
+            return func(*args)
+        finally:
+            self.timings[name] = time.monotonic() - started
+            logger.info(f"[{self.name}] {name} finished in {self.timings[name]:.2f}s")
+
+    def run(self, on_result: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        """
+        Execute every task and return a mapping of task name to result.
+
+        The first task exception is re-raised once the tasks already running
+        have finished; tasks that depend on it are never started. on_result,
+        if given, is called with (name, result) on the calling thread as each
+        task finishes, so it may safely touch the database.
+        """
+        for name, (_, deps) in self._tasks.items():
+            missing = [dep for dep in deps if dep not in self._tasks]
+            if missing:
+                raise ValueError(f"Task '{name}' depends on unknown task(s): {', '.join(missing)}")
+
+        results: Dict[str, Any] = {}
+        pending = dict(self._tasks)
+        max_workers = self.max_workers or max(len(self._tasks), 1)
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=self.name) as executor:
+            running = {}
+
+            def submit_ready():
+                for name, (func, deps) in list(pending.items()):
+                    if all(dep in results for dep in deps):
+                        del pending[name]
+                        args = [results[dep] for dep in deps]
+                        running[executor.submit(self._timed, name, func, *args)] = name
+
+            error = None
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        error = error or e
+                        continue
+                    if on_result is not None:
+                        on_result(name, results[name])
+                # After a failure, drain what is running (so its results still
+                # reach on_result) but start nothing new
+                if error is None:
+                    submit_ready()
+
+        if error is not None:
+            raise error
+        if pending:
+            raise ValueError(f"Circular dependency between tasks: {', '.join(pending)}")
+
+        return results
@@ -0,0 +1,193 @@
+"""
+Database-side pipeline metrics for portfolio reports.
+
+Counts, sums and averages are computed with aggregate()/values().annotate()
+group-bys, so the number of queries stays constant however many companies
+are in the pipeline. The only per-row read is a single values() pass that
+lists the best-fit member companies of each industry/product group; those
+lists are capped, so the metrics payload stays bounded as well.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from django.db.models import Count, F, IntegerField, Q, QuerySet, Sum, Value
+from django.db.models.functions import Coalesce
+
+from companies.models import Contact
+
+HIGH_FIT_SCORE = 8
+MEDIUM_FIT_RANGE = (5, 7)
+READY_FIT_SCORE = 7
+# Member companies listed per industry/product group (the group's count covers the rest)
+GROUP_TOP_COMPANIES = 6
+
+
+def fit_summary(companies: QuerySet) -> Dict[str, int]:
+    """Company totals by fit band and outreach priority, in one aggregate query"""
+    summary = companies.order_by().aggregate(
+        total_companies=Count('id'),
+        high_fit_companies=Count('id', filter=Q(cerebras_fit_score__gte=HIGH_FIT_SCORE)),
+        medium_fit_companies=Count('id', filter=Q(cerebras_fit_score__range=MEDIUM_FIT_RANGE)),
+        low_fit_companies=Count('id', filter=Q(cerebras_fit_score__lt=MEDIUM_FIT_RANGE[0])),
+        high_priority_companies=Count('id', filter=Q(outreach_priority='high')),
+        ready_for_outreach=Count(
+            'id', filter=Q(outreach_priority='high', cerebras_fit_score__gte=READY_FIT_SCORE)
+        ),
+    )
+    return summary
+
+
+def contact_coverage(companies: QuerySet) -> Dict[str, Any]:
+    """Contact totals and coverage for the given companies, in one aggregate query"""
+    coverage = Contact.objects.filter(company__in=companies.order_by().values('id')).aggregate(
+        total_contacts=Count('id'),
+        companies_with_contacts=Count('company', distinct=True),
+    )
+    return coverage
+
+
+def group_breakdowns(companies: QuerySet, companies_per_group: int = GROUP_TOP_COMPANIES) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Industry and recommended-product breakdowns.
+
+    Per-group metrics come from two group-by queries; each group then lists
+    at most companies_per_group of its highest-fit companies (none for 0),
+    filled from one values() pass over the companies.
+    """
+    unordered = companies.order_by()
+
+    industry_breakdown: Dict[str, Any] = {}
+    industry_scores: Dict[str, List[int]] = {}
+    for row in unordered.values('industry').annotate(
+        count=Count('id'),
+        high_fit_count=Count('id', filter=Q(cerebras_fit_score__gte=HIGH_FIT_SCORE)),
+        total_employees=Coalesce(Sum('employee_count_exact'), Value(0), output_field=IntegerField()),
+        scored_count=Count('cerebras_fit_score'),
+        total_fit_score=Coalesce(Sum('cerebras_fit_score'), Value(0), output_field=IntegerField()),
+    ):
+        # NULL and '' industries both fall into 'Unknown'
+        industry = row['industry'] or 'Unknown'
+        group = industry_breakdown.setdefault(industry, {
+            'count': 0,
+            'high_fit_count': 0,
+            'total_employees': 0,
+            'avg_fit_score': 0,
+            'companies': []
+        })
+        group['count'] += row['count']
+        group['high_fit_count'] += row['high_fit_count']
+        group['total_employees'] += row['total_employees']
+        scores = industry_scores.setdefault(industry, [0, 0])
+        scores[0] += row['total_fit_score']
+        scores[1] += row['scored_count']
+
+    product_breakdown: Dict[str, Any] = {}
+    for row in unordered.values('recommended_cerebras_product').annotate(
+        count=Count('id'),
+        total_fit_score=Coalesce(Sum('cerebras_fit_score'), Value(0), output_field=IntegerField()),
+        high_priority_count=Count('id', filter=Q(outreach_priority='high')),
+    ):
+        product = row['recommended_cerebras_product'] or 'No Recommendation'
+        group = product_breakdown.setdefault(product, {
+            'count': 0,
+            'total_fit_score': 0,
+            'high_priority_count': 0,
+            'companies': [],
+        })
+        group['count'] += row['count']
+        group['total_fit_score'] += row['total_fit_score']
+        group['high_priority_count'] += row['high_priority_count']
+
+    for industry, (total_fit_score, scored_count) in industry_scores.items():
+        industry_breakdown[industry]['avg_fit_score'] = total_fit_score / scored_count if scored_count else 0
+    for group in product_breakdown.values():
+        group['avg_fit_score'] = group['total_fit_score'] / group['count'] if group['count'] else 0
+
+    if companies_per_group > 0:
+        for company in unordered.order_by(F('cerebras_fit_score').desc(nulls_last=True), 'name').values(
+            'name', 'industry', 'cerebras_fit_score', 'outreach_priority', 'employee_count',
+            'employee_count_exact', 'recommended_cerebras_product', 'estimated_budget_range'
+        ).iterator(chunk_size=2000):
+            industry_members = industry_breakdown[company['industry'] or 'Unknown']['companies']
+            product_members = product_breakdown[company['recommended_cerebras_product'] or 'No Recommendation']['companies']
+            if len(industry_members) < companies_per_group:
+                industry_members.append({
+                    'name': company['name'],
+                    'fit_score': company['cerebras_fit_score'],
+                    'priority': company['outreach_priority'],
+                    'employee_count': company['employee_count_exact'] or company['employee_count'],
+                    'recommended_product': company['recommended_cerebras_product']
+                })
+            if len(product_members) < companies_per_group:
+                product_members.append({
+                    'name': company['name'],
+                    'industry': company['industry'],
+                    'fit_score': company['cerebras_fit_score'],
+                    'priority': company['outreach_priority'],
+                    'budget_range': company['estimated_budget_range']
+                })
+
+    return industry_breakdown, product_breakdown
+
+
+def top_opportunities(companies: QuerySet, limit: int = 10) -> List[Dict[str, Any]]:
+    """High-priority, high-fit companies with contact counts annotated in the same query"""
+    opportunities = []
+    for company in companies.filter(
+        cerebras_fit_score__gte=READY_FIT_SCORE, outreach_priority='high'
+    ).annotate(
+        contacts_count=Count('contacts'),
+        decision_makers_count=Count('contacts', filter=Q(contacts__decision_maker=True)),
+    )[:limit]:
+        opportunities.append({
+            'id': company.id,
+            'name': company.name,
+            'industry': company.industry,
+            'website': company.website,
+            'employee_count': company.employee_count,
+            'revenue': company.revenue,
+            'cerebras_fit_score': company.cerebras_fit_score,
+            'recommended_cerebras_product': company.recommended_cerebras_product,
+            'estimated_budget_range': company.estimated_budget_range,
+            'implementation_timeline': company.implementation_timeline,
+            'outreach_readiness': company.get_outreach_readiness(),
+            'contacts_count': company.contacts_count,
+            'decision_makers_count': company.decision_makers_count,
+            'ai_ml_usage': company.ai_ml_usage,
+            'current_ai_infrastructure': company.current_ai_infrastructure,
+            'value_proposition': company.cerebras_value_proposition
+        })
+    return opportunities
+
+
+def pipeline_health(companies: QuerySet) -> Dict[str, Any]:
+    """Pipeline health metrics: fit bands, priorities and contact coverage"""
+    health = fit_summary(companies)
+    health.update(contact_coverage(companies))
+    total_companies = health['total_companies']
+    health['contact_coverage_rate'] = (
+        health['companies_with_contacts'] / total_companies * 100 if total_companies > 0 else 0
+    )
+    health['avg_contacts_per_company'] = round(
+        health['total_contacts'] / total_companies if total_companies > 0 else 0, 1
+    )
+    return health
+
+
+def compute_pipeline_metrics(companies: QuerySet, companies_per_group: int = GROUP_TOP_COMPANIES,
+                             top_limit: int = 10) -> Dict[str, Any]:
+    """
+    All portfolio metrics for a company queryset in a fixed number of queries
+    """
+    health = pipeline_health(companies)
+    industry_breakdown, product_breakdown = group_breakdowns(companies, companies_per_group)
+    return {
+        'total_companies': health['total_companies'],
+        'high_fit_companies': health['high_fit_companies'],
+        'medium_fit_companies': health['medium_fit_companies'],
+        'low_fit_companies': health['low_fit_companies'],
+        'industry_breakdown': industry_breakdown,
+        'product_breakdown': product_breakdown,
+        'pipeline_health': health,
+        'top_opportunities': top_opportunities(companies, top_limit),
+    }
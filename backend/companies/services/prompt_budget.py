@@ -0,0 +1,88 @@
+import json
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Rough average for English text and compact JSON with the Llama/DeepSeek tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer dependency), rounded up"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+class BudgetedPromptBuilder:
+    """
+    Assemble a prompt from sections that each get an estimated token budget.
+
+    Fixed sections are always included. Row sections take rows in order of
+    value (highest first) while they fit in the section budget; the rows
+    that do not fit are collapsed into a one-line summary so the model still
+    sees how much was left out. ``stats`` records per-section usage and
+    ``token_count`` the estimate for the whole prompt.
+    """
+
+    def __init__(self, total_budget: int):
+        self.total_budget = total_budget
+        self._parts: List[str] = []
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def add_text(self, name: str, text: str) -> "BudgetedPromptBuilder":
+        """Add a fixed section that is never truncated"""
+        text = text.strip()
+        self._parts.append(text)
+        self.stats[name] = {'tokens': estimate_tokens(text)}
+        return self
+
+    def add_rows(self, name: str, header: str, rows: Iterable[Any], share: float,
+                 render: Callable[[Any], str] = compact_json,
+                 value: Optional[Callable[[Any], Any]] = None,
+                 summarize: Optional[Callable[[List[Any]], str]] = None) -> "BudgetedPromptBuilder":
+        """
+        Add a row section limited to ``share`` of the total budget.
+
+        ``value`` orders rows (highest first); ``summarize`` renders the
+        dropped rows, defaulting to a count.
+        """
+        rows = list(rows)
+        if value is not None:
+            rows.sort(key=value, reverse=True)
+
+        budget = int(self.total_budget * share)
+        used = estimate_tokens(header)
+        lines = [header]
+        included = 0
+        for row in rows:
+            line = render(row)
+            cost = estimate_tokens(line) + 1  # newline
+            if used + cost > budget:
+                break
+            lines.append(line)
+            used += cost
+            included += 1
+
+        dropped = rows[included:]
+        if dropped:
+            summary = summarize(dropped) if summarize else f"... {len(dropped)} more rows omitted"
+            lines.append(summary)
+            used += estimate_tokens(summary) + 1
+
+        self._parts.append("\n".join(lines))
+        self.stats[name] = {
+            'tokens': used,
+            'budget': budget,
+            'rows_included': included,
+            'rows_omitted': len(dropped),
+        }
+        return self
+
+    def build(self) -> str:
+        return "\n\n".join(self._parts)
+
+    @property
+    def token_count(self) -> int:
+        return estimate_tokens(self.build())
@@ -0,0 +1,103 @@
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .offerings import FrozenDict, get_offerings_repository
+
+
+def render_selling_company_details(selling_company: str, selling_company_info: Dict[str, Any]) -> str:
+    """
+    "ABOUT <SELLER>" block for the Perplexity research prompt, one line per product
+    """
+    company_details = selling_company_info.get('company', {})
+    products = selling_company_info.get('products', {})
+
+    lines = [
+        f"ABOUT {selling_company.upper()}:",
+        f"Company: {company_details.get('name', selling_company)}",
+        f"Industry: {company_details.get('industry', 'Technology')}",
+        f"Description: {company_details.get('description', '')}",
+        "Our Products/Services:",
+    ]
+    for product_name, product_details in products.items():
+        lines.append(
+            f"- {product_name}: {product_details.get('Description', '')}"
+            f" | Categories: {product_details.get('Category', '')}"
+            f" | Key Features: {', '.join(product_details.get('Key Features', []))}"
+            f" | Use Cases: {', '.join(product_details.get('Usecase', []))}"
+        )
+    return "\n".join(lines)
+
+
+def render_selling_company_context(selling_company: str, selling_company_info: Dict[str, Any]) -> str:
+    """
+    "SELLING COMPANY CONTEXT" block for the Cerebras parse prompt, products as compact JSON
+    """
+    company_details = selling_company_info.get('company', {})
+    products = selling_company_info.get('products', {})
+
+    return "\n".join([
+        "SELLING COMPANY CONTEXT:",
+        f"Company: {company_details.get('name', selling_company)}",
+        f"Industry: {company_details.get('industry', 'Technology')}",
+        f"Description: {company_details.get('description', '')}",
+        "Our Products/Services:",
+        json.dumps(products, separators=(',', ':'), ensure_ascii=False) if products else 'No specific products listed',
+    ])
+
+
+class PromptFragmentCache:
+    """
+    Rendered prompt fragments keyed by offerings version.
+
+    Fragments built from the offerings repository's frozen data are rendered
+    once per offerings version and reused for every company; the cache is
+    emptied whenever the repository re-parses the file. Data that did not
+    come from the repository (plain dicts) is rendered on every call.
+    """
+
+    def __init__(self, repository=None):
+        self._repository = repository
+        self._version: Optional[int] = None
+        self._fragments: Dict[Tuple[str, str], Tuple[Any, Any, str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def repository(self):
+        return self._repository or get_offerings_repository()
+
+    def get(self, render: Callable[[str, Dict[str, Any]], str], selling_company: str, selling_company_info: Dict[str, Any]) -> str:
+        company_details = selling_company_info.get('company')
+        products = selling_company_info.get('products')
+        if not (isinstance(company_details, FrozenDict) and isinstance(products, FrozenDict)):
+            return render(selling_company, selling_company_info)
+
+        version = self.repository.version
+        key = (render.__name__, selling_company)
+        with self._lock:
+            if self._version != version:
+                self._fragments.clear()
+                self._version = version
+            cached = self._fragments.get(key)
+        # Identity check: the entry must have been rendered from these exact frozen objects
+        if cached and cached[0] is company_details and cached[1] is products:
+            return cached[2]
+
+        fragment = render(selling_company, selling_company_info)
+        with self._lock:
+            if self._version == version:
+                self._fragments[key] = (company_details, products, fragment)
+        return fragment
+
+
+prompt_fragments = PromptFragmentCache()
+
+
+def selling_company_details(selling_company: str, selling_company_info: Dict[str, Any]) -> str:
+    """Cached "ABOUT <SELLER>" block for the Perplexity research prompt"""
+    return prompt_fragments.get(render_selling_company_details, selling_company, selling_company_info)
+
+
+def selling_company_context(selling_company: str, selling_company_info: Dict[str, Any]) -> str:
+    """Cached "SELLING COMPANY CONTEXT" block for the Cerebras parse prompt"""
+    return prompt_fragments.get(render_selling_company_context, selling_company, selling_company_info)
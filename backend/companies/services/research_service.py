@@ -2,10 +2,27 @@ import json
 import logging
 import re
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from common.circuit_breaker import raise_if_open
+from common.config import REPORT_PROMPT_TOKEN_BUDGET
+from common.model_routing import route_kwargs
+from common.single_flight import get_single_flight
 from companies.models import Company, Contact
+from companies.models.company import normalize_company_name
+from companies.models.contact import normalize_contact_name
 from companies.services.perplexity_service import PerplexityService
-from .cerebras_service import AIResearchService
+from .cerebras_service import AIResearchService, COMPANY_PARSE_QUESTION, CONTACT_PARSE_QUESTION
+from .checkpoints import ResearchCheckpoints, prompt_hash
+from .pipeline import TaskGraph
+from .pipeline_metrics import compute_pipeline_metrics
+from .offerings import get_offerings_repository
+from .prompt_budget import BudgetedPromptBuilder, compact_json
+from .async_research_service import AsyncResearchEngine
+from .freshness import COMPANY_PHASES, RESEARCH_PHASES, record_phases, stale_phases, stored_phase_text
 
 logger = logging.getLogger(__name__)
 
@@ -20,29 +37,13 @@ class CompanyResearchService:
         self.ai_service = AIResearchService()
         
     def load_company_offerings(self) -> Dict[str, Any]:
-        """Load company offerings from JSON file"""
-        try:
-            # Try relative path first (for when running from backend directory)
-            try:
-                with open('companies/company_offerings.json', 'r') as f:
-                    data = json.load(f)
-            except FileNotFoundError:
-                # Try absolute path from project root
-                import os
-                # Get the directory containing this file
-                current_dir = os.path.dirname(os.path.abspath(__file__))
-                # Go up to backend/companies/services -> backend/companies -> backend
-                backend_dir = os.path.dirname(os.path.dirname(current_dir))
-                file_path = os.path.join(backend_dir, 'companies', 'company_offerings.json')
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-            
-            # Return the full data including metadata for internal use
-            return data
-            
-        except Exception as e:
-            logger.error(f"Failed to load company offerings: {e}")
-            return {}
+        """
+        Load company offerings from JSON file
+
+        Served from the shared offerings repository, which parses the file
+        once and re-reads it only when it changes. The result is read-only.
+        """
+        return get_offerings_repository().load()
     
     def get_product_offerings_only(self) -> Dict[str, Any]:
         """Get only the product offerings, excluding company metadata"""
@@ -102,39 +103,182 @@ class CompanyResearchService:
         else:
             return "technology solutions"
             
-    def research_and_save_company(self, company_name: str) -> Company:
+    def research_and_save_company(self, company_name: str, force_refresh: bool = False) -> Company:
+        """
+        Research and save one company, sharing any in-flight run for the same company
+
+        Concurrent calls whose names normalize to the same key ("OpenAI" and
+        "OpenAI, Inc.") join a single pipeline run and all get its Company.
+        """
+        return get_single_flight("company_research").do(
+            self._normalize_company_name(company_name),
+            lambda: self._research_and_save_company(company_name, force_refresh)
+        )
+
+    def _research_and_save_company(self, company_name: str, force_refresh: bool = False) -> Company:
         """        Comprehensive company research pipeline:
-        1. Research with Perplexity
-        2. Parse with AI service
+        1. Research with Perplexity (four independent phases, run concurrently)
+        2. Parse with AI service (each parser starts as soon as its inputs arrive)
         3. Save to database
         4. Research contacts
         5. Generate outreach materials
+
+        For a company researched before, only phases older than their TTL
+        (see freshness.PHASE_TTLS) are fetched again; fresh phases reuse the
+        stored raw text, and a parser runs only if one of its inputs changed.
+        Every phase is checkpointed as a ResearchArtifact when it finishes, so
+        a retry after a crash resumes instead of starting over.
         """
         logger.info(f"Starting comprehensive research for {company_name}")
+        existing_company = None if force_refresh else self._find_existing_company(company_name)
+        stale = stale_phases(existing_company)
+        if not stale:
+            logger.info(f"Research for {company_name} is fresh, nothing to refresh")
+            return existing_company
+        # Fail in milliseconds while a provider's circuit is open instead of
+        # running every phase into the same outage
+        raise_if_open("perplexity", "cerebras")
+        if existing_company is not None:
+            logger.info(f"Refreshing stale phases for {company_name}: {sorted(stale)}")
         
-        # Step 1: Comprehensive company research with Perplexity
-        logger.info("Phase 1: Basic company research")
         selling_company = self.get_selling_company_name()
         selling_context = self._get_selling_context()
         selling_company_info = self.get_selling_company_info()
-        basic_research = self.perplexity.research_company_comprehensive(
-            company_name, 
-            selling_company, 
-            selling_context, 
-            selling_company_info
+        
+        checkpoints = ResearchCheckpoints(company_name, company=existing_company, reuse=not force_refresh)
+        graph = TaskGraph(name=f"research:{company_name}")
+        prompts = {
+            'basic_research': self.perplexity.build_company_research_prompt(
+                company_name, selling_company, selling_context, selling_company_info
+            ),
+            'contact_research': self.perplexity.build_contact_research_prompt(company_name),
+            'competitor_analysis': self.perplexity.build_competitor_analysis_prompt(company_name, selling_company),
+            'recent_news': self.perplexity.build_recent_news_prompt(company_name),
+        }
+        # A forced refresh also bypasses the response cache, which could otherwise
+        # hand back an answer up to LLM_CACHE_TTL_PERPLEXITY old
+        use_cache = not force_refresh
+        fetchers = {
+            'basic_research': lambda: self.perplexity.research_company_comprehensive(
+                company_name,
+                selling_company,
+                selling_context,
+                selling_company_info,
+                use_cache=use_cache
+            ),
+            'contact_research': lambda: self.perplexity.research_specific_contacts(company_name, use_cache=use_cache),
+            'competitor_analysis': lambda: self.perplexity.analyze_competitor_landscape(
+                company_name, selling_company, use_cache=use_cache
+            ),
+            'recent_news': lambda: self.perplexity.research_recent_news_and_initiatives(company_name, use_cache=use_cache),
+        }
+        # Phases 1-4: independent Perplexity research, fanned out (fresh phases reuse stored
+        # text, and phases a previous attempt already finished resume from their checkpoint)
+        for phase, fetch in fetchers.items():
+            if phase in stale:
+                graph.add(phase, lambda phase=phase, fetch=fetch: checkpoints.run(
+                    phase, prompt_hash(*prompts[phase]), fetch
+                ))
+            else:
+                graph.add(phase, lambda phase=phase: stored_phase_text(existing_company, phase))
+        refresh_company = bool(stale.intersection(COMPANY_PHASES))
+        refresh_contacts = 'contact_research' in stale
+        self._add_parse_tasks(
+            graph, checkpoints, company_name, selling_company, selling_company_info,
+            parse_company=refresh_company, parse_contacts=refresh_contacts
         )
         
-        logger.info("Phase 2: Contact research")
-        contact_research = self.perplexity.research_specific_contacts(company_name)
+        # Each phase is checkpointed as soon as it finishes
+        results = graph.run(on_result=checkpoints.save)
+        
+        # Step 3: Save company to database
+        if refresh_company:
+            logger.info("Phase 6: Saving company data")
+            company = self._save_company_data(results['parsed_company'], results['combined_research'])
+        else:
+            company = existing_company
+        checkpoints.attach(company)
+        
+        # Step 4: Save contacts
+        if refresh_contacts:
+            logger.info("Phase 7: Saving contacts")
+            self._save_contact_data(company, results['parsed_contacts'], results['contact_research'])
+        record_phases(company, {phase: results[phase] for phase in stale})
+        logger.info(f"Research completed for {company_name}")
+        return company
+        
+    def _add_parse_tasks(self, graph: TaskGraph, checkpoints: ResearchCheckpoints, company_name: str,
+                         selling_company: str, selling_company_info: Dict[str, Any],
+                         parse_company: bool = True, parse_contacts: bool = True):
+        """
+        Register the checkpointed Cerebras parse tasks on a graph holding the research phases
+
+        A parse whose prompt (research text plus schema) matches a stored
+        artifact reuses it instead of calling Cerebras again.
+        """
+        def parsed_company(combined_research):
+            prompt = self.ai_service.build_company_parse_prompt(
+                combined_research, company_name, selling_company, selling_company_info
+            )
+            return checkpoints.run(
+                'parsed_company', prompt_hash(COMPANY_PARSE_QUESTION, prompt),
+                lambda: self.ai_service.parse_company_research(
+                    combined_research,
+                    company_name,
+                    selling_company,
+                    selling_company_info
+                )
+            )
+
+        def parsed_contacts(contact_research):
+            prompt = self.ai_service.build_contact_parse_prompt(contact_research, company_name)
+            return checkpoints.run(
+                'parsed_contacts', prompt_hash(CONTACT_PARSE_QUESTION, prompt),
+                lambda: self.ai_service.parse_contact_research(contact_research, company_name)
+            )
+
+        if parse_company:
+            # Phase 5: parse company research once the three company phases are in
+            graph.add('combined_research', self.combine_research, depends_on=list(COMPANY_PHASES))
+            graph.add('parsed_company', parsed_company, depends_on=['combined_research'])
+        if parse_contacts:
+            # Phase 7 parse: only needs the contact research, so it overlaps the company phases
+            graph.add('parsed_contacts', parsed_contacts, depends_on=['contact_research'])
+
+    def reparse_company(self, company: Company) -> Company:
+        """
+        Re-run only the Cerebras parse steps over the company's stored raw research
+
+        No Perplexity calls are made. Parses whose prompt is unchanged reuse
+        their checkpoint, so this only pays for inference after the parse
+        schema (or the research text) has changed.
+        """
+        research = {phase: stored_phase_text(company, phase) for phase in RESEARCH_PHASES}
+        parse_company = all(research[phase] for phase in COMPANY_PHASES)
+        parse_contacts = bool(research['contact_research'])
+        if not parse_company and not parse_contacts:
+            logger.info(f"No stored research to re-parse for {company.name}")
+            return company
         
-        logger.info("Phase 3: Competitive analysis")
-        competitor_analysis = self.perplexity.analyze_competitor_landscape(company_name, selling_company)
+        checkpoints = ResearchCheckpoints(company.name, company=company)
+        graph = TaskGraph(name=f"reparse:{company.name}")
+        for phase, text in research.items():
+            graph.add(phase, lambda text=text: text)
+        self._add_parse_tasks(
+            graph, checkpoints, company.name, self.get_selling_company_name(), self.get_selling_company_info(),
+            parse_company=parse_company, parse_contacts=parse_contacts
+        )
+        results = graph.run(on_result=checkpoints.save)
         
-        logger.info("Phase 4: Recent news research")
-        recent_news = self.perplexity.research_recent_news_and_initiatives(company_name)
+        if parse_company:
+            company = self._save_company_data(results['parsed_company'], results['combined_research'])
+        if parse_contacts:
+            self._save_contact_data(company, results['parsed_contacts'], results['contact_research'])
+        return company
         
-        # Combine all research
-        combined_research = f"""
+    def combine_research(self, basic_research: str, competitor_analysis: str, recent_news: str) -> str:
+        """Combine the company-level research phases into the text handed to the parser"""
+        return f"""
         BASIC COMPANY RESEARCH:
         {basic_research}
         
@@ -145,219 +289,180 @@ class CompanyResearchService:
         {recent_news}
         """
         
-        # Step 2: Parse with AI service
-        logger.info("Phase 5: Parsing research with AI service")
-        selling_company = self.get_selling_company_name()
-        selling_company_info = self.get_selling_company_info()
-        parsed_data = self.ai_service.parse_company_research(
-            combined_research, 
-            company_name, 
-            selling_company, 
-            selling_company_info
-        )
-        
-        # Step 3: Save company to database
-        logger.info("Phase 6: Saving company data")
-        company = self._save_company_data(parsed_data, combined_research)
-        
-        # Step 4: Parse and save contacts
-        logger.info("Phase 7: Parsing and saving contacts")
-        parsed_contacts = self.ai_service.parse_contact_research(contact_research, company_name)
-        self._save_contact_data(company, parsed_contacts, contact_research)
-        logger.info(f"Research completed for {company_name}")
-        return company
-        
     def _normalize_company_name(self, name: str) -> str:
         """
         Normalize company name for duplicate detection
         Removes common suffixes and normalizes casing/spacing
         """
-        if not name:
-            return ""
-        
-        # Convert to lowercase and strip whitespace
-        normalized = name.lower().strip()
-        
-        # Remove common company suffixes
-        suffixes_to_remove = [
-            ', l.p.', ', lp', ', l.l.c.', ', llc', ', inc.', ', inc',
-            ', corp.', ', corp', ', corporation', ', co.', ', co',
-            ', ltd.', ', ltd', ', limited', ', plc', ', s.a.', ', sa',
-            ', gmbh', ', ag', ', bv', ', nv', ', pvt. ltd.', ', pvt ltd',
-            ', private limited', ', pte. ltd.', ', pte ltd'
-        ]
-        
-        for suffix in suffixes_to_remove:
-            if normalized.endswith(suffix):
-                normalized = normalized[:-len(suffix)].strip()
-                break
-        
-        # Remove extra whitespace and normalize
-        normalized = ' '.join(normalized.split())
-        
-        return normalized
+        return normalize_company_name(name)
     
     def _find_existing_company(self, company_name: str) -> Optional[Company]:
         """
         Find existing company by normalized name matching
+
+        Single lookup on the indexed, unique normalized_name column
         """
-        if not company_name:
+        normalized_name = self._normalize_company_name(company_name)
+        if not normalized_name:
             return None
         
-        normalized_name = self._normalize_company_name(company_name)
+        company = Company.objects.filter(normalized_name=normalized_name).first()
+        if company and company.name != company_name:
+            logger.info(f"Found existing company: '{company.name}' matches '{company_name}'")
+        return company
+
+    def build_company_fields(self, parsed_data: Dict[str, Any], raw_research: str) -> Dict[str, Any]:
+        """Map parsed company JSON onto Company model fields (everything but the name)"""
+        # Extract data from parsed structure
+        basic_info = parsed_data.get('basic_info', {})
+        financial_info = parsed_data.get('financial_info', {})
+        business_info = parsed_data.get('business_intelligence', {})
+        ai_info = parsed_data.get('ai_ml_info', {})
+        cerebras_analysis = parsed_data.get('product_analysis', {})  # Updated to use generic field name
+        research_metadata = parsed_data.get('research_metadata', {})
         
-        # Try exact match first
-        try:
-            return Company.objects.get(name__iexact=company_name)
-        except Company.DoesNotExist:
-            pass
-        
-        # Try normalized name matching
-        all_companies = Company.objects.all()
-        for company in all_companies:
-            if self._normalize_company_name(company.name) == normalized_name:
-                logger.info(f"Found existing company: '{company.name}' matches '{company_name}'")
-                return company
-        
-        return None
+        return {
+            # Basic Information
+            'website': basic_info.get('website'),
+            'description': basic_info.get('description'),
+            'industry': basic_info.get('industry'),
+            'sector': basic_info.get('sector'),
+            'employee_count': basic_info.get('employee_count'),
+            'employee_count_exact': basic_info.get('employee_count_exact'),
+            'headquarters_location': basic_info.get('headquarters_location'),
+            'founded_year': basic_info.get('founded_year'),
+            
+            # Financial Information (simplified)
+            'ipo_status': financial_info.get('ipo_status'),
+            'total_funding': financial_info.get('total_funding'),
+            'valuation': financial_info.get('valuation'),
+            'revenue': financial_info.get('revenue'),
+            'revenue_growth': financial_info.get('revenue_growth'),
+            # Business Intelligence
+            'business_model': business_info.get('business_model'),
+            'key_products': business_info.get('key_products') or [],
+            'key_technologies': business_info.get('key_technologies') or [],
+            'competitors': business_info.get('competitors') or [],                # AI/ML Information
+            'ai_ml_usage': ai_info.get('ai_ml_usage'),
+            'current_ai_infrastructure': ai_info.get('current_ai_infrastructure'),
+            'ai_initiatives': ai_info.get('ai_initiatives') or [],
+            'ml_use_cases': ai_info.get('ml_use_cases') or [],
+            'data_science_team_size': ai_info.get('data_science_team_size'),
+            
+            # AI Inference Specific
+            'ai_inference_workloads': ai_info.get('ai_inference_workloads') or [],
+            'inference_models_used': ai_info.get('inference_models_used') or [],
+            'inference_volume': ai_info.get('inference_volume'),
+            'inference_latency_requirements': ai_info.get('inference_latency_requirements'),
+            'current_inference_hardware': ai_info.get('current_inference_hardware'),
+            'inference_pain_points': ai_info.get('inference_pain_points') or [],
+            'inference_budget': ai_info.get('inference_budget'),
+            
+            # Product Analysis
+            'recommended_cerebras_product': cerebras_analysis.get('recommended_product'),
+            'cerebras_fit_score': cerebras_analysis.get('fit_score'),
+            'cerebras_value_proposition': cerebras_analysis.get('value_proposition'),
+            'potential_use_cases': cerebras_analysis.get('potential_use_cases') or [],
+            'implementation_timeline': cerebras_analysis.get('implementation_timeline'),
+            'estimated_budget_range': cerebras_analysis.get('estimated_budget_range'),
+            
+            # Research Metadata
+            'research_quality_score': research_metadata.get('quality_score', 5),
+            'research_sources': research_metadata.get('sources') or [],
+            'research_notes': research_metadata.get('notes') or raw_research[:1000] + "...",
+            
+            # Set outreach priority based on fit score
+            'outreach_priority': self._calculate_outreach_priority(cerebras_analysis.get('fit_score', 5)),
+        }
 
     def _save_company_data(self, parsed_data: Dict[str, Any], raw_research: str) -> Company:
         """Save parsed company data to database"""
         try:
-            # Extract data from parsed structure
-            basic_info = parsed_data.get('basic_info', {})
-            financial_info = parsed_data.get('financial_info', {})
-            business_info = parsed_data.get('business_intelligence', {})
-            ai_info = parsed_data.get('ai_ml_info', {})
-            cerebras_analysis = parsed_data.get('product_analysis', {})  # Updated to use generic field name
-            research_metadata = parsed_data.get('research_metadata', {})
-            
-            company_name = basic_info.get('name', 'Unknown Company')
+            company_name = parsed_data.get('basic_info', {}).get('name', 'Unknown Company')
             
             # Check for existing company using normalized matching
             existing_company = self._find_existing_company(company_name)
             
             # Prepare company data
-            company_data = {
-                # Basic Information
-                'website': basic_info.get('website'),
-                'description': basic_info.get('description'),
-                'industry': basic_info.get('industry'),
-                'sector': basic_info.get('sector'),
-                'employee_count': basic_info.get('employee_count'),
-                'employee_count_exact': basic_info.get('employee_count_exact'),
-                'headquarters_location': basic_info.get('headquarters_location'),
-                'founded_year': basic_info.get('founded_year'),
-                
-                # Financial Information (simplified)
-                'ipo_status': financial_info.get('ipo_status'),
-                'total_funding': financial_info.get('total_funding'),
-                'valuation': financial_info.get('valuation'),
-                'revenue': financial_info.get('revenue'),
-                'revenue_growth': financial_info.get('revenue_growth'),
-                # Business Intelligence
-                'business_model': business_info.get('business_model'),
-                'key_products': business_info.get('key_products') or [],
-                'key_technologies': business_info.get('key_technologies') or [],
-                'competitors': business_info.get('competitors') or [],                # AI/ML Information
-                'ai_ml_usage': ai_info.get('ai_ml_usage'),
-                'current_ai_infrastructure': ai_info.get('current_ai_infrastructure'),
-                'ai_initiatives': ai_info.get('ai_initiatives') or [],
-                'ml_use_cases': ai_info.get('ml_use_cases') or [],
-                'data_science_team_size': ai_info.get('data_science_team_size'),
-                
-                # AI Inference Specific
-                'ai_inference_workloads': ai_info.get('ai_inference_workloads') or [],
-                'inference_models_used': ai_info.get('inference_models_used') or [],
-                'inference_volume': ai_info.get('inference_volume'),
-                'inference_latency_requirements': ai_info.get('inference_latency_requirements'),
-                'current_inference_hardware': ai_info.get('current_inference_hardware'),
-                'inference_pain_points': ai_info.get('inference_pain_points') or [],
-                'inference_budget': ai_info.get('inference_budget'),
-                
-                # Product Analysis
-                'recommended_cerebras_product': cerebras_analysis.get('recommended_product'),
-                'cerebras_fit_score': cerebras_analysis.get('fit_score'),
-                'cerebras_value_proposition': cerebras_analysis.get('value_proposition'),
-                'potential_use_cases': cerebras_analysis.get('potential_use_cases') or [],
-                'implementation_timeline': cerebras_analysis.get('implementation_timeline'),
-                'estimated_budget_range': cerebras_analysis.get('estimated_budget_range'),
-                
-                # Research Metadata
-                'research_quality_score': research_metadata.get('quality_score', 5),
-                'research_sources': research_metadata.get('sources') or [],
-                'research_notes': research_metadata.get('notes') or raw_research[:1000] + "...",
-                
-                # Set outreach priority based on fit score
-                'outreach_priority': self._calculate_outreach_priority(cerebras_analysis.get('fit_score', 5)),
-            }
+            company_data = self.build_company_fields(parsed_data, raw_research)
             
-            if existing_company:                # Update existing company
-                for field, value in company_data.items():
-                    setattr(existing_company, field, value)
-                # Update the name to the latest/most complete version
-                existing_company.name = company_name
-                existing_company.save()
-                company = existing_company
-                logger.info(f"Updated existing company: {company.name}")
-            else:
-                # Create new company
-                company = Company.objects.create(
-                    name=company_name,
-                    **company_data
-                )
-                logger.info(f"Created new company: {company.name}")
+            # Savepoint, so a failed write leaves the connection usable for the fallback below
+            with transaction.atomic():
+                if existing_company:
+                    # Update existing company
+                    for field, value in company_data.items():
+                        setattr(existing_company, field, value)
+                    # Update the name to the latest/most complete version
+                    existing_company.name = company_name
+                    existing_company.save()
+                    company = existing_company
+                    logger.info(f"Updated existing company: {company.name}")
+                else:
+                    # Create new company
+                    company = Company.objects.create(
+                        name=company_name,
+                        **company_data
+                    )
+                    logger.info(f"Created new company: {company.name}")
             
             return company
             
         except Exception as e:
             logger.error(f"Failed to save company data: {e}")
-            # Create minimal company record
-            company, _ = Company.objects.get_or_create(
-                name=parsed_data.get('basic_info', {}).get('name', 'Unknown Company'),                defaults={'research_notes': f"Error saving data: {str(e)}"}
-            )
+            # Fall back to the row the name already maps to (normalized_name is
+            # unique), or create a minimal company record
+            company_name = parsed_data.get('basic_info', {}).get('name', 'Unknown Company')
+            company = self._find_existing_company(company_name)
+            if company is None:
+                company = Company.objects.create(
+                    name=company_name,
+                    research_notes=f"Error saving data: {str(e)}"
+                )
             return company
 
     def _normalize_contact_name(self, first_name: str, last_name: str) -> str:
         """
         Normalize contact name for duplicate detection
         """
-        if not first_name and not last_name:
-            return ""
-        
-        # Clean and normalize names
-        first_clean = (first_name or "").strip().lower()
-        last_clean = (last_name or "").strip().lower()
-        
-        return f"{first_clean}|{last_clean}"
+        return normalize_contact_name(first_name, last_name)
     
-    def _find_existing_contact(self, company: Company, first_name: str, last_name: str, email: str = None) -> Optional[Contact]:
-        """
-        Find existing contact by normalized name matching within the same company
-        """
-        if not first_name and not last_name:
-            return None
-        normalized_name = self._normalize_contact_name(first_name, last_name)
-        
-        # First try exact email match if provided and not a generated fallback
-        if email and email.strip() and not email.startswith('unknown_') and '@' in email:
-            try:
-                return Contact.objects.get(company=company, email=email)
-            except Contact.DoesNotExist:
-                pass
-        
-        # Try name-based matching within the same company
-        company_contacts = Contact.objects.filter(company=company)
-        for contact in company_contacts:
-            contact_normalized = self._normalize_contact_name(contact.first_name, contact.last_name)
-            if contact_normalized == normalized_name:
-                logger.info(f"Found duplicate contact: '{contact.get_full_name()}' matches '{first_name} {last_name}'")
-                return contact
-        
-        return None
+    def _is_real_email(self, email: str) -> bool:
+        """True for a provided email that is not a generated 'unknown_' placeholder"""
+        return bool(email and email.strip() and not email.startswith('unknown_') and '@' in email)
+    
+    def _merge_contact_fields(self, existing_contact: Contact, contact_data_to_save: Dict[str, Any]):
+        """Update existing contact with new/better information"""
+        for field, value in contact_data_to_save.items():
+            # Only update if new value is more informative
+            current_value = getattr(existing_contact, field)
+            if field == 'email':
+                # Update email if new one is better (not generated/unknown)
+                current_email = current_value or ''
+                new_email = value or ''
+                if (not current_email.startswith('unknown_') and
+                    not new_email.startswith('unknown_') and
+                    '@' in new_email):
+                    setattr(existing_contact, field, value)
+            elif field in ['research_quality_score']:
+                # Take higher quality score
+                if value and current_value and value > current_value:
+                    setattr(existing_contact, field, value)
+            elif not current_value or (isinstance(current_value, list) and len(current_value) == 0):
+                # Update if current value is empty
+                setattr(existing_contact, field, value)
+            elif (value and str(value).strip() and current_value and
+                  len(str(value).strip()) > len(str(current_value).strip())):
+                # Update if new value is more detailed
+                setattr(existing_contact, field, value)
 
     def _save_contact_data(self, company: Company, parsed_contacts: List[Dict[str, Any]], raw_research: str):
-        """Save parsed contact data to database with improved deduplication"""
+        """
+        Save parsed contact data to database with improved deduplication
+
+        All parsed contacts are resolved against the company's existing rows
+        with one query on the indexed (company, normalized_name) key and the
+        (company, email) unique key, then written with bulk_create/bulk_update.
+        """
         try:
             # Validate that parsed_contacts is a list of dictionaries
             if not isinstance(parsed_contacts, list):
@@ -368,6 +473,10 @@ class CompanyResearchService:
                 logger.info(f"No contacts found for {company.name}")
                 return
             
+            # Generate professional fallback emails from the company domain
+            company_domain = self._generate_company_domain(company.name)
+            prepared = []
+            
             for contact_data in parsed_contacts:
                 if not isinstance(contact_data, dict):
                     logger.error(f"Expected contact dict, got {type(contact_data)}: {contact_data}")
@@ -389,13 +498,7 @@ class CompanyResearchService:
                 if not first_name and not last_name:
                     continue
                 
-                # Check for existing contact first
-                existing_contact = self._find_existing_contact(company, first_name, last_name, provided_email)
-                
-                # Generate professional fallback email if none provided or if it's a placeholder
-                company_domain = self._generate_company_domain(company.name)
-                
-                if provided_email and not provided_email.startswith('unknown_') and '@' in provided_email:
+                if self._is_real_email(provided_email):
                     # Use provided email if it looks legitimate
                     final_email = provided_email
                 elif last_name:
@@ -451,41 +554,69 @@ class CompanyResearchService:
                     'research_quality_score': research_quality.get('quality_score', 5),
                     'data_sources': research_quality.get('data_sources', []),
                 }
+                prepared.append((
+                    self._normalize_contact_name(first_name, last_name),
+                    provided_email if self._is_real_email(provided_email) else None,
+                    contact_data_to_save
+                ))
+            
+            if not prepared:
+                return
+            
+            # One IN query resolves every parsed contact against existing rows
+            names = {normalized for normalized, _, _ in prepared}
+            # Generated fallback emails are looked up too: they are never used to
+            # match a contact, but must not collide with the (company, email) key
+            emails = {data['email'] for _, _, data in prepared}
+            by_name, by_email = {}, {}
+            for contact in Contact.objects.filter(company=company).filter(
+                Q(normalized_name__in=names) | Q(email__in=emails)
+            ).order_by('id'):
+                by_name.setdefault(contact.normalized_name, contact)
+                if contact.email:
+                    by_email.setdefault(contact.email, contact)
+            
+            to_create, to_update = [], {}
+            for normalized_name, email, contact_data_to_save in prepared:
+                # Exact email match first, then the name key; contacts created
+                # earlier in this batch are registered in the same maps
+                existing_contact = (by_email.get(email) if email else None) or by_name.get(normalized_name)
                 if existing_contact:
-                    # Update existing contact with new/better information
-                    for field, value in contact_data_to_save.items():
-                        # Only update if new value is more informative
-                        current_value = getattr(existing_contact, field)
-                        if field == 'email':
-                            # Update email if new one is better (not generated/unknown)
-                            current_email = current_value or ''
-                            new_email = value or ''
-                            if (not current_email.startswith('unknown_') and
-                                not new_email.startswith('unknown_') and
-                                '@' in new_email):
-                                setattr(existing_contact, field, value)
-                        elif field in ['research_quality_score']:
-                            # Take higher quality score
-                            if value and current_value and value > current_value:
-                                setattr(existing_contact, field, value)
-                        elif not current_value or (isinstance(current_value, list) and len(current_value) == 0):
-                            # Update if current value is empty
-                            setattr(existing_contact, field, value)
-                        elif (value and str(value).strip() and current_value and
-                              len(str(value).strip()) > len(str(current_value).strip())):
-                            # Update if new value is more detailed
-                            setattr(existing_contact, field, value)
-                    
-                    existing_contact.save()
+                    self._merge_contact_fields(existing_contact, contact_data_to_save)
+                    existing_contact.normalized_name = self._normalize_contact_name(
+                        existing_contact.first_name, existing_contact.last_name
+                    )
+                    if existing_contact.pk:
+                        to_update[existing_contact.pk] = existing_contact
+                        logger.info(f"Updated existing contact: {existing_contact.get_full_name()}")
                     contact = existing_contact
-                    logger.info(f"Updated existing contact: {contact.get_full_name()}")
+                elif contact_data_to_save['email'] in by_email:
+                    # A different person already holds this (generated) email; one
+                    # conflicting row must not roll back the whole batch
+                    logger.warning(f"Skipping contact {contact_data_to_save['full_name']} for {company.name}: "
+                                   f"email {contact_data_to_save['email']} is already in use")
+                    continue
                 else:
-                    # Create new contact
-                    contact = Contact.objects.create(
+                    contact = Contact(
                         company=company,
+                        normalized_name=normalized_name,
                         **contact_data_to_save
                     )
+                    to_create.append(contact)
                     logger.info(f"Created new contact: {contact.get_full_name()}")
+                by_name.setdefault(contact.normalized_name, contact)
+                if contact.email:
+                    by_email.setdefault(contact.email, contact)
+            
+            with transaction.atomic():
+                if to_update:
+                    now = timezone.now()
+                    for contact in to_update.values():
+                        contact.updated_at = now
+                    update_fields = list(prepared[0][2].keys()) + ['normalized_name', 'updated_at']
+                    Contact.objects.bulk_update(list(to_update.values()), update_fields)
+                if to_create:
+                    Contact.objects.bulk_create(to_create)
                 
         except Exception as e:
             logger.error(f"Failed to save contact data for {company.name}: {e}")
@@ -577,6 +708,17 @@ class CompanyResearchService:
             logger.error(f"Failed to generate outreach materials: {e}")
             return f"Error generating outreach materials: {str(e)}"
             
+    def _record_failed_research(self, company_name: str, error: Exception) -> Company:
+        """Create a minimal record for a company whose research failed"""
+        company = self._find_existing_company(company_name)
+        if company is None:
+            company = Company.objects.create(
+                name=company_name,
+                research_notes=f"Research failed: {str(error)}",
+                research_quality_score=1
+            )
+        return company
+
     def batch_research_companies(self, company_names: List[str]) -> List[Company]:
         """Research multiple companies in batch"""
         results = []
@@ -588,62 +730,19 @@ class CompanyResearchService:
                 results.append(company)
             except Exception as e:
                 logger.error(f"Failed to process {company_name}: {e}")
-                # Create a minimal record for failed companies
-                company, _ = Company.objects.get_or_create(
-                    name=company_name,
-                    defaults={
-                        'research_notes': f"Research failed: {str(e)}",
-                        'research_quality_score': 1
-                    }
-                )
-                results.append(company)
+                results.append(self._record_failed_research(company_name, e))
                 
         return results
 
-    def batch_research_companies_parallel(self, company_names: List[str]) -> List[Company]:
-        """Research multiple companies in parallel for better performance"""
-        import concurrent.futures
-        from threading import Lock
-        
-        results = []
-        results_lock = Lock()
-        
-        def research_single_company(company_name):
-            try:
-                logger.info(f"Processing {company_name} in parallel")
-                company = self.research_and_save_company(company_name)
-                with results_lock:
-                    results.append(company)
-                return company
-            except Exception as e:
-                logger.error(f"Failed to process {company_name}: {e}")
-                # Create a minimal record for failed companies
-                company, _ = Company.objects.get_or_create(
-                    name=company_name,
-                    defaults={
-                        'research_notes': f"Research failed: {str(e)}",
-                        'research_quality_score': 1
-                    }
-                )
-                with results_lock:
-                    results.append(company)
-                return company
-        # Use ThreadPoolExecutor for parallel processing
-        max_workers = min(len(company_names), 5)  # Limit to 5 concurrent requests
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_company = {
-                executor.submit(research_single_company, company_name): company_name
-                for company_name in company_names
-            }
-            
-            for future in concurrent.futures.as_completed(future_to_company):
-                company_name = future_to_company[future]
-                try:
-                    future.result()  # This will raise any exception that occurred
-                except Exception as e:
-                    logger.error(f"Parallel processing failed for {company_name}: {e}")
-    
-        return results
+    def batch_research_companies_parallel(self, company_names: List[str], force_refresh: bool = False) -> List[Company]:
+        """
+        Research multiple companies in parallel for better performance
+
+        Thin synchronous wrapper around AsyncResearchEngine, which keeps many
+        companies in flight on one event loop with per-provider concurrency limits.
+        """
+        engine = AsyncResearchEngine(self, force_refresh=force_refresh)
+        return async_to_sync(engine.research_companies)(company_names)
 
     def find_potential_customers(self, max_customers: int) -> List[str]:
         """
@@ -679,7 +778,7 @@ class CompanyResearchService:
         
         try:
             from common.utils import ask_perplexity
-            response = ask_perplexity(question, context, model="sonar-pro", temp=0.3)
+            response = ask_perplexity(question, context, **route_kwargs('discovery'))
             
             # Handle both dict and string responses from Perplexity
             if isinstance(response, dict):
@@ -715,9 +814,9 @@ class CompanyResearchService:
             ]
             return fallback_customers[:max_customers]    
     
-    def generate_customer_report(self, company: Company) -> Dict[str, Any]:
+    def build_customer_report_prompt(self, company: Company) -> Dict[str, Any]:
         """
-        Generate a comprehensive customer report for a single company using AI inference
+        Gather the data for a single-company report and build its (question, context) prompt
         """
         offerings = self.get_product_offerings_only()  # Only get product data for the report
         
@@ -890,31 +989,46 @@ class CompanyResearchService:
         and actionable next steps. Include relevant metrics, contact details, and implementation timelines.
         Use professional business language suitable for C-level presentations.        """
         
+        return {
+            'question': question,
+            'context': context,
+            'company_data': company_data,
+            'contact_data': contact_data,
+            'comprehensive_data': {
+                'company_profile': company_data,
+                'contacts_portfolio': contact_data,
+                'contact_summary': contact_summary,
+                'company_offerings': offerings,
+                'data_completeness_score': self._calculate_data_completeness(company_data, contact_data),
+                'engagement_readiness': company.get_outreach_readiness()
+            },
+            'metadata': {
+                'report_version': '2.0',
+                'data_sources_count': len(company.research_sources) if company.research_sources else 0,
+                'last_research_update': company.updated_at.isoformat(),
+                'quality_metrics': {
+                    'company_research_score': company.research_quality_score,
+                    'contact_research_score': sum([c.research_quality_score for c in contacts]) / len(contacts) if contacts else 0,
+                    'overall_confidence': (company.research_quality_score + (sum([c.research_quality_score for c in contacts]) / len(contacts) if contacts else 0)) / 2
+                }
+            }
+        }
+    
+    def generate_customer_report(self, company: Company) -> Dict[str, Any]:
+        """
+        Generate a comprehensive customer report for a single company using AI inference
+        """
+        prompt = self.build_customer_report_prompt(company)
+        
         try:
-            report = self.ai_service.generate_text(question, context)
+            report = self.ai_service.generate_text(prompt['question'], prompt['context'], task='single_report')
             return {
                 'company_id': company.id,
                 'company_name': company.name,
                 'generated_at': datetime.now().isoformat(),
                 'report_content': report,
-                'comprehensive_data': {
-                    'company_profile': company_data,
-                    'contacts_portfolio': contact_data,
-                    'contact_summary': contact_summary,
-                    'company_offerings': offerings,
-                    'data_completeness_score': self._calculate_data_completeness(company_data, contact_data),
-                    'engagement_readiness': company.get_outreach_readiness()
-                },
-                'metadata': {
-                    'report_version': '2.0',
-                    'data_sources_count': len(company.research_sources) if company.research_sources else 0,
-                    'last_research_update': company.updated_at.isoformat(),
-                    'quality_metrics': {
-                        'company_research_score': company.research_quality_score,
-                        'contact_research_score': sum([c.research_quality_score for c in contacts]) / len(contacts) if contacts else 0,
-                        'overall_confidence': (company.research_quality_score + (sum([c.research_quality_score for c in contacts]) / len(contacts) if contacts else 0)) / 2
-                    }
-                }
+                'comprehensive_data': prompt['comprehensive_data'],
+                'metadata': prompt['metadata']
             }
         except Exception as e:
             logger.error(f"Failed to generate customer report for {company.name}: {e}")
@@ -924,8 +1038,8 @@ class CompanyResearchService:
                 'error': str(e),
                 'generated_at': datetime.now().isoformat(),
                 'partial_data': {
-                    'company_profile': company_data,
-                    'contacts_portfolio': contact_data
+                    'company_profile': prompt['company_data'],
+                    'contacts_portfolio': prompt['contact_data']
                 }
             }
     
@@ -946,152 +1060,21 @@ class CompanyResearchService:
         
         return min(int(base_score + contact_bonus + ai_bonus), 100)
 
-    def generate_comprehensive_customer_report(self, companies) -> Dict[str, Any]:
+    def build_comprehensive_report_prompt(self, companies) -> Dict[str, Any]:
         """
-        Generate a comprehensive report across all companies using Cerebras inference
+        Aggregate pipeline metrics and build the (question, context) prompt for the portfolio report
         """
         offerings = self.get_product_offerings_only()  # Only get product data for the report
         
-        # Aggregate data across all companies
-        total_companies = len(companies)
-        high_fit_companies = companies.filter(cerebras_fit_score__gte=8).count()
-        medium_fit_companies = companies.filter(cerebras_fit_score__range=[5, 7]).count()
-        low_fit_companies = companies.filter(cerebras_fit_score__lt=5).count()
-        
-        # Industry breakdown with detailed metrics
-        industry_breakdown = {}
-        for company in companies:
-            industry = company.industry or 'Unknown'
-            if industry not in industry_breakdown:
-                industry_breakdown[industry] = {
-                    'count': 0,
-                    'high_fit_count': 0,
-                    'total_employees': 0,
-                    'avg_fit_score': 0,
-                    'companies': []
-                }
-            
-            industry_breakdown[industry]['count'] += 1
-            industry_breakdown[industry]['companies'].append({
-                'name': company.name,
-                'fit_score': company.cerebras_fit_score,
-                'priority': company.outreach_priority,
-                'employee_count': company.employee_count_exact or company.employee_count,
-                'recommended_product': company.recommended_cerebras_product
-            })
-            
-            if company.cerebras_fit_score and company.cerebras_fit_score >= 8:
-                industry_breakdown[industry]['high_fit_count'] += 1
-            
-            if company.employee_count_exact:
-                industry_breakdown[industry]['total_employees'] += company.employee_count_exact
-        
-        # Calculate averages for each industry
-        for industry_data in industry_breakdown.values():
-            if industry_data['count'] > 0:
-                company_scores = [c['fit_score'] for c in industry_data['companies'] if c['fit_score']]
-                industry_data['avg_fit_score'] = sum(company_scores) / len(company_scores) if company_scores else 0
-        
-        # Product recommendation breakdown
-        product_breakdown = {}
-        for company in companies:
-            product = company.recommended_cerebras_product or 'No Recommendation'
-            if product not in product_breakdown:
-                product_breakdown[product] = {
-                    'count': 0,
-                    'total_fit_score': 0,
-                    'high_priority_count': 0,
-                    'companies': []
-                }
-            
-            product_breakdown[product]['count'] += 1
-            product_breakdown[product]['companies'].append({
-                'name': company.name,
-                'industry': company.industry,
-                'fit_score': company.cerebras_fit_score,
-                'priority': company.outreach_priority,
-                'budget_range': company.estimated_budget_range
-            })
-            
-            if company.cerebras_fit_score:
-                product_breakdown[product]['total_fit_score'] += company.cerebras_fit_score
-            
-            if company.outreach_priority == 'high':
-                product_breakdown[product]['high_priority_count'] += 1
-        
-        # Calculate average fit scores by product
-        for product_data in product_breakdown.values():
-            if product_data['count'] > 0:
-                product_data['avg_fit_score'] = product_data['total_fit_score'] / product_data['count']
-        
-        # Top opportunities with comprehensive data
-        top_opportunities = []
-        for company in companies.filter(cerebras_fit_score__gte=7, outreach_priority='high')[:10]:
-            contacts_count = company.contacts.count()
-            decision_makers = company.contacts.filter(decision_maker=True).count()
-            
-            top_opportunities.append({
-                'id': company.id,
-                'name': company.name,
-                'industry': company.industry,
-                'website': company.website,
-                'employee_count': company.employee_count,
-                'revenue': company.revenue,
-                'cerebras_fit_score': company.cerebras_fit_score,
-                'recommended_cerebras_product': company.recommended_cerebras_product,
-                'estimated_budget_range': company.estimated_budget_range,
-                'implementation_timeline': company.implementation_timeline,
-                'outreach_readiness': company.get_outreach_readiness(),
-                'contacts_count': contacts_count,
-                'decision_makers_count': decision_makers,
-                'ai_ml_usage': company.ai_ml_usage,
-                'current_ai_infrastructure': company.current_ai_infrastructure,
-                'value_proposition': company.cerebras_value_proposition
-            })
-        
-        # Revenue opportunity analysis
-        total_contacts = sum(company.contacts.count() for company in companies)
-        companies_with_contacts = companies.filter(contacts__isnull=False).distinct().count()
-        avg_contacts_per_company = total_contacts / total_companies if total_companies > 0 else 0
-        
-        # Pipeline health metrics
-        pipeline_health = {
-            'total_companies': total_companies,
-            'companies_with_contacts': companies_with_contacts,
-            'contact_coverage_rate': (companies_with_contacts / total_companies * 100) if total_companies > 0 else 0,
-            'total_contacts': total_contacts,
-            'avg_contacts_per_company': round(avg_contacts_per_company, 1),
-            'high_fit_companies': high_fit_companies,
-            'medium_fit_companies': medium_fit_companies,
-            'low_fit_companies': low_fit_companies,
-            'high_priority_companies': companies.filter(outreach_priority='high').count(),
-            'ready_for_outreach': companies.filter(outreach_priority='high', cerebras_fit_score__gte=7).count()
-        }
+        # Aggregate data across all companies with database-side group-bys
+        metrics = compute_pipeline_metrics(companies)
         
         # Get the selling company name dynamically
         selling_company = self.get_selling_company_name()
         
-        context = f"""
-        You are the VP of Sales at {selling_company} analyzing the entire customer pipeline.
-        
-        {selling_company} Product Offerings:
-        {json.dumps(offerings, indent=2)}
-        
-        Pipeline Overview:
-        - Total Companies: {total_companies}
-        - High Fit (8-10): {high_fit_companies}
-        - Medium Fit (5-7): {medium_fit_companies}
-        - Low Fit (1-4): {low_fit_companies}
-        
-        Industry Breakdown:
-        {json.dumps(industry_breakdown, indent=2)}
-        
-        Product Demand:
-        {json.dumps(product_breakdown, indent=2)}
-        
-        Top Opportunities:
-        {json.dumps(list(top_opportunities), indent=2)}
-        """
+        context, prompt_stats = self._build_comprehensive_report_context(
+            selling_company, offerings, metrics
+        )
         
         question = """
         Create a comprehensive executive sales report that includes:
@@ -1129,21 +1112,41 @@ class CompanyResearchService:
         Format as a comprehensive markdown executive report with actionable insights.
         """
         
+        return {
+            'question': question,
+            'context': context,
+            'metrics': metrics,
+            'prompt_stats': prompt_stats
+        }
+    
+    def comprehensive_report_result(self, prompt: Dict[str, Any], report: str) -> Dict[str, Any]:
+        """Package a generated portfolio report with the metrics its prompt was built from"""
+        metrics = prompt['metrics']
+        return {
+            'generated_at': json.dumps(datetime.now().isoformat()),
+            'pipeline_metrics': {
+                'total_companies': metrics['total_companies'],
+                'high_fit_companies': metrics['high_fit_companies'],
+                'medium_fit_companies': metrics['medium_fit_companies'],
+                'low_fit_companies': metrics['low_fit_companies'],
+                'industry_breakdown': metrics['industry_breakdown'],
+                'product_breakdown': metrics['product_breakdown'],
+                'pipeline_health': metrics['pipeline_health']
+            },
+            'top_opportunities': list(metrics['top_opportunities']),
+            'prompt_tokens': prompt['prompt_stats']['prompt_tokens'],
+            'prompt_sections': prompt['prompt_stats']['sections'],
+            'comprehensive_report': report
+        }
+    
+    def generate_comprehensive_customer_report(self, companies) -> Dict[str, Any]:
+        """
+        Generate a comprehensive report across all companies using Cerebras inference
+        """
         try:
-            report = self.ai_service.generate_text(question, context)
-            return {
-                'generated_at': json.dumps(datetime.now().isoformat()),
-                'pipeline_metrics': {
-                    'total_companies': total_companies,
-                    'high_fit_companies': high_fit_companies,
-                    'medium_fit_companies': medium_fit_companies,
-                    'low_fit_companies': low_fit_companies,
-                    'industry_breakdown': industry_breakdown,
-                    'product_breakdown': product_breakdown
-                },
-                'top_opportunities': list(top_opportunities),
-                'comprehensive_report': report
-            }
+            prompt = self.build_comprehensive_report_prompt(companies)
+            report = self.ai_service.generate_text(prompt['question'], prompt['context'], task='portfolio_report')
+            return self.comprehensive_report_result(prompt, report)
         except Exception as e:
             logger.error(f"Failed to generate comprehensive customer report: {e}")
             return {
@@ -1151,6 +1154,69 @@ class CompanyResearchService:
                 'generated_at': json.dumps(datetime.now().isoformat())
             }
     
+    def _build_comprehensive_report_context(self, selling_company: str, offerings: Dict[str, Any],
+                                            metrics: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build the portfolio report context within REPORT_PROMPT_TOKEN_BUDGET
+
+        Every section gets a share of the budget; the highest-value rows are
+        kept and the rest are summarized, so the prompt stays bounded however
+        large the pipeline grows.
+        """
+        builder = BudgetedPromptBuilder(REPORT_PROMPT_TOKEN_BUDGET)
+        builder.add_text('intro', f"You are the VP of Sales at {selling_company} analyzing the entire customer pipeline.")
+        builder.add_rows(
+            'offerings', f"{selling_company} Product Offerings:",
+            offerings.items(), share=0.2,
+            render=lambda item: compact_json({item[0]: item[1]}),
+            summarize=lambda rest: f"... plus {len(rest)} more products: {', '.join(name for name, _ in rest)}"
+        )
+        builder.add_text('overview', "\n".join([
+            "Pipeline Overview:",
+            f"- Total Companies: {metrics['total_companies']}",
+            f"- High Fit (8-10): {metrics['high_fit_companies']}",
+            f"- Medium Fit (5-7): {metrics['medium_fit_companies']}",
+            f"- Low Fit (1-4): {metrics['low_fit_companies']}",
+        ]))
+        builder.add_rows(
+            'industry_breakdown', "Industry Breakdown (highest-fit segments first):",
+            metrics['industry_breakdown'].items(), share=0.3,
+            render=lambda item: compact_json(self._summarize_breakdown_group('industry', *item)),
+            value=lambda item: (item[1]['high_fit_count'], item[1]['count']),
+            summarize=lambda rest: (
+                f"... {len(rest)} smaller industries with {sum(data['count'] for _, data in rest)} companies omitted"
+            )
+        )
+        builder.add_rows(
+            'product_breakdown', "Product Demand:",
+            metrics['product_breakdown'].items(), share=0.2,
+            render=lambda item: compact_json(self._summarize_breakdown_group('product', *item)),
+            value=lambda item: (item[1]['high_priority_count'], item[1]['count']),
+            summarize=lambda rest: (
+                f"... {len(rest)} more products with {sum(data['count'] for _, data in rest)} companies omitted"
+            )
+        )
+        builder.add_rows(
+            'top_opportunities', "Top Opportunities:",
+            metrics['top_opportunities'], share=0.3,
+            value=lambda company: company.get('cerebras_fit_score') or 0
+        )
+        
+        context = builder.build()
+        return context, {'prompt_tokens': builder.token_count, 'sections': builder.stats}
+    
+    def _summarize_breakdown_group(self, label: str, name: str, data: Dict[str, Any],
+                                   max_companies: int = 5) -> Dict[str, Any]:
+        """Aggregates for one breakdown group plus only its best-fit member companies"""
+        companies = sorted(data.get('companies', []), key=lambda company: company.get('fit_score') or 0, reverse=True)
+        summary = {label: name}
+        summary.update({key: value for key, value in data.items() if key != 'companies'})
+        summary['top_companies'] = companies[:max_companies]
+        # The member list is capped, so the rest is counted from the group total
+        if data['count'] > len(summary['top_companies']):
+            summary['other_companies'] = data['count'] - len(summary['top_companies'])
+        return summary
+    
     def _safe_get_string(self, value: Any) -> str:
         """
         Safely convert a value to a string, handling None values
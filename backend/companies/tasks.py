@@ -1,2 +1,74 @@
+import logging
+
 from celery import shared_task
-# TODO: Implement company background tasks
+from django.utils import timezone
+
+from .models import ResearchJob, ResearchJobResult
+from .services.research_service import CompanyResearchService
+
+logger = logging.getLogger(__name__)
+
+# Background tasks for company research jobs
+
+
+@shared_task
+def start_research_job_task(job_id):
+    """
+    Background task to start a research job.
+
+    Auto-discovery jobs first find their companies; every company is then
+    fanned out as its own research_company_task so workers share the load.
+    """
+    job = ResearchJob.objects.get(id=job_id)
+    try:
+        company_names = list(job.company_names)
+
+        if job.mode == 'discovery':
+            ResearchJob.objects.filter(id=job_id).update(status='discovering', started_at=timezone.now())
+            company_names = CompanyResearchService().find_potential_customers(job.max_customers)
+
+        ResearchJob.objects.filter(id=job_id).update(
+            status='running',
+            company_names=company_names,
+            total_companies=len(company_names),
+            started_at=job.started_at or timezone.now()
+        )
+    except Exception as e:
+        logger.error(f"Research job {job_id} failed to start: {e}")
+        ResearchJob.objects.filter(id=job_id).update(status='failed', error=str(e), finished_at=timezone.now())
+        return
+
+    if not company_names:
+        ResearchJob.objects.filter(id=job_id).update(status='completed', finished_at=timezone.now())
+        return
+
+    for position, company_name in enumerate(company_names):
+        research_company_task.delay(str(job_id), company_name, position)
+
+
+@shared_task
+def research_company_task(job_id, company_name, position):
+    """
+    Background task to research and save one company of a research job
+
+    position is the company's index in the job's company_names; a redelivered
+    task (acks are late) is counted only once for it.
+    """
+    if ResearchJobResult.objects.filter(job_id=job_id, position=position).exists():
+        logger.info(f"Research job {job_id}: {company_name} was already recorded, skipping redelivery")
+        return
+    research_service = CompanyResearchService()
+    company = None
+    succeeded = False
+    try:
+        company = research_service.research_and_save_company(company_name)
+        succeeded = True
+    except Exception as e:
+        logger.error(f"Research job {job_id}: failed to process {company_name}: {e}")
+        try:
+            company = research_service._record_failed_research(company_name, e)
+        except Exception as record_error:
+            logger.error(f"Research job {job_id}: could not record failure for {company_name}: {record_error}")
+    finally:
+        # Always count the company, otherwise the job would never complete
+        ResearchJob.record_result(job_id, position, company_name, company, succeeded)
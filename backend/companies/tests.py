@@ -0,0 +1,1509 @@
+import asyncio
+import importlib
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from common.circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker
+from common.clients import (
+    get_cerebras_client,
+    close_cerebras_clients,
+    get_perplexity_session,
+    close_perplexity_sessions,
+)
+from common.config import CIRCUIT_BREAKER_FAILURE_THRESHOLD
+from common.llm_cache import ResponseCache, make_cache_key
+from common.model_routing import TaskUsage, build_routes, get_route, parse_route_overrides
+from common.rate_limit import RateLimiter, parse_model_overrides
+from common.single_flight import SingleFlight
+from common.utils import ThinkBlockFilter, ask_cerebras, ask_perplexity, ask_perplexity_async
+from companies.models import Company, Contact, Report, ResearchArtifact, ResearchJob
+from companies.pagination import CompanyCursorPagination
+from companies.services.async_research_service import AsyncResearchEngine
+from companies.services.freshness import record_phases, stale_phases
+from companies.services.cerebras_service import (
+    COMPANY_BATCH_PARSE_QUESTION,
+    COMPANY_PARSE_QUESTION,
+    CONTACT_BATCH_PARSE_QUESTION,
+    CONTACT_PARSE_QUESTION,
+    AIResearchService,
+    clean_json_response,
+)
+from companies.services.json_stream import StreamingJSONExtractor
+from companies.services.offerings import OfferingsRepository
+from companies.services.parse_schemas import (
+    COMPANY_PARSE_JSON_SCHEMA,
+    CONTACT_PARSE_JSON_SCHEMA,
+    json_schema_response_format,
+    schema_errors,
+)
+from companies.services.prompt_fragments import PromptFragmentCache, render_selling_company_context
+from companies.services.pipeline import TaskGraph
+from companies.services.pipeline_metrics import GROUP_TOP_COMPANIES, compute_pipeline_metrics
+from companies.services.prompt_budget import BudgetedPromptBuilder, estimate_tokens
+from companies.services.research_service import CompanyResearchService
+from companies.tasks import research_company_task
+from project import celery_app
+
+# Nothing listens here, so a stray request fails fast and offline
+UNREACHABLE_BASE_URL = "http://127.0.0.1:9"
+
+
+class CerebrasClientRegistryTestCase(SimpleTestCase):
+    """
+    Test cases for the pooled Cerebras client registry
+    """
+
+    def setUp(self):
+        # Never build a real SDK client: its construction may open connections
+        patcher = mock.patch("common.clients.Cerebras", side_effect=lambda **kwargs: mock.Mock())
+        self.sdk = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        close_cerebras_clients()
+
+    def test_same_credentials_share_client(self):
+        first = get_cerebras_client("key-a", UNREACHABLE_BASE_URL)
+        second = get_cerebras_client("key-a", UNREACHABLE_BASE_URL)
+        self.assertIs(first, second)
+        self.sdk.assert_called_once()
+        self.assertIs(self.sdk.call_args.kwargs["warm_tcp_connection"], False)
+
+    def test_different_credentials_get_separate_clients(self):
+        first = get_cerebras_client("key-a", UNREACHABLE_BASE_URL)
+        second = get_cerebras_client("key-b", UNREACHABLE_BASE_URL)
+        self.assertIsNot(first, second)
+
+    def test_concurrent_callers_build_one_client(self):
+        clients = []
+        threads = [
+            threading.Thread(target=lambda: clients.append(get_cerebras_client("key-c", UNREACHABLE_BASE_URL)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(client) for client in clients}), 1)
+
+
+class StubPerplexityHandler(BaseHTTPRequestHandler):
+    """Minimal chat-completions endpoint that records client ports and can fail on demand"""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server.client_ports.add(self.client_address[1])
+        if server.failures_left > 0:
+            server.failures_left -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({
+            "choices": [{"message": {"content": "stub research"}}],
+            "citations": ["https://example.com"],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PerplexitySessionPoolTestCase(SimpleTestCase):
+    """
+    Test cases for the pooled Perplexity session against a local stub server
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubPerplexityHandler)
+        self.server.client_ports = set()
+        self.server.failures_left = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.patches = [
+            mock.patch("common.utils.PERPLEXITY_BASE_URL", base_url),
+            mock.patch("common.utils.PERPLEXITY_API_KEY", "test-key"),
+            mock.patch("common.utils.get_response_cache", return_value=None),
+            mock.patch("common.utils.get_rate_limiter", return_value=None),
+        ]
+        for patch in self.patches:
+            patch.start()
+        close_perplexity_sessions()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        close_perplexity_sessions()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_returns_content_and_citations(self):
+        result = ask_perplexity("question", "context")
+        self.assertEqual(result, {"content": "stub research", "citations": ["https://example.com"]})
+
+    def test_connections_are_reused_across_calls(self):
+        for _ in range(4):
+            ask_perplexity("question", "context")
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_session_is_per_thread_but_pool_is_shared(self):
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(get_perplexity_session()))
+        thread.start()
+        thread.join()
+        own = get_perplexity_session()
+        self.assertIsNot(own, sessions[0])
+        self.assertIs(own.get_adapter("https://"), sessions[0].get_adapter("https://"))
+
+    def test_retries_transient_server_errors(self):
+        self.server.failures_left = 2
+        with mock.patch("common.clients.PERPLEXITY_RETRY_BACKOFF", 0):
+            close_perplexity_sessions()
+            result = ask_perplexity("question", "context")
+        self.assertEqual(result["content"], "stub research")
+
+    def test_async_variant_retries_and_parses(self):
+        self.server.failures_left = 1
+        with mock.patch("common.utils.PERPLEXITY_RETRY_BACKOFF", 0):
+            result = async_to_sync(ask_perplexity_async)("question", "context")
+        self.assertEqual(result, {"content": "stub research", "citations": ["https://example.com"]})
+
+
+class TaskGraphTestCase(SimpleTestCase):
+    """
+    Test cases for the research pipeline dependency-graph executor
+    """
+
+    def test_independent_tasks_run_concurrently(self):
+        graph = TaskGraph()
+        for name in ['a', 'b', 'c', 'd']:
+            graph.add(name, lambda name=name: time.sleep(0.2) or name)
+        started = time.monotonic()
+        results = graph.run()
+        self.assertLess(time.monotonic() - started, 0.6)
+        self.assertEqual(results, {'a': 'a', 'b': 'b', 'c': 'c', 'd': 'd'})
+
+    def test_dependents_receive_results_in_declared_order(self):
+        graph = TaskGraph()
+        graph.add('left', lambda: 'L')
+        graph.add('right', lambda: 'R')
+        graph.add('joined', lambda right, left: right + left, depends_on=['right', 'left'])
+        self.assertEqual(graph.run()['joined'], 'RL')
+
+    def test_dependent_starts_before_unrelated_slow_task_finishes(self):
+        finished = {}
+        graph = TaskGraph()
+        graph.add('slow', lambda: time.sleep(0.3) or finished.setdefault('slow', time.monotonic()))
+        graph.add('fast', lambda: 'fast')
+        graph.add('after_fast', lambda fast: finished.setdefault('after_fast', time.monotonic()), depends_on=['fast'])
+        graph.run()
+        self.assertLess(finished['after_fast'], finished['slow'])
+
+    def test_on_result_sees_each_task_on_the_calling_thread(self):
+        seen = []
+        graph = TaskGraph()
+        graph.add('a', lambda: 1)
+        graph.add('b', lambda a: a + 1, depends_on=['a'])
+        graph.run(on_result=lambda name, result: seen.append((name, result, threading.current_thread())))
+        self.assertEqual([(name, result) for name, result, _ in seen], [('a', 1), ('b', 2)])
+        self.assertTrue(all(thread is threading.current_thread() for _, _, thread in seen))
+
+    def test_task_errors_propagate(self):
+        graph = TaskGraph()
+        graph.add('boom', lambda: 1 / 0)
+        graph.add('never', lambda boom: boom, depends_on=['boom'])
+        with self.assertRaises(ZeroDivisionError):
+            graph.run()
+
+    def test_running_siblings_still_report_results_after_a_failure(self):
+        seen = []
+
+        def fail_parse(research):
+            raise RuntimeError("parse failed")
+
+        def slow_news():
+            time.sleep(0.2)
+            return "news"
+
+        graph = TaskGraph()
+        graph.add('research', lambda: "research")
+        graph.add('parse', fail_parse, depends_on=['research'])
+        graph.add('news', slow_news)
+        graph.add('after_parse', lambda parse: parse, depends_on=['parse'])
+        with self.assertRaises(RuntimeError):
+            graph.run(on_result=lambda name, result: seen.append(name))
+        self.assertEqual(seen, ['research', 'news'])
+
+    def test_unknown_and_circular_dependencies_are_rejected(self):
+        with self.assertRaises(ValueError):
+            TaskGraph().add('a', lambda missing: missing, depends_on=['missing']).run()
+        graph = TaskGraph()
+        graph.add('a', lambda b: b, depends_on=['b'])
+        graph.add('b', lambda a: a, depends_on=['a'])
+        with self.assertRaises(ValueError):
+            graph.run()
+
+
+class AsyncResearchEngineTestCase(TestCase):
+    """
+    Test cases for the asyncio research engine with stubbed providers
+    """
+
+    def setUp(self):
+        self.active = {'perplexity': 0, 'cerebras': 0}
+        self.peak = {'perplexity': 0, 'cerebras': 0}
+        patches = [
+            mock.patch('companies.services.async_research_service.ask_perplexity_async', self.fake_perplexity),
+            mock.patch('companies.services.async_research_service.ask_cerebras_async', self.fake_cerebras),
+            mock.patch('companies.services.async_research_service.build_async_cerebras_client', self.fake_client),
+            mock.patch('companies.services.async_research_service.build_async_perplexity_client', self.fake_client),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def fake_client(self, *args, **kwargs):
+        return mock.AsyncMock()
+
+    async def _track(self, provider):
+        self.active[provider] += 1
+        self.peak[provider] = max(self.peak[provider], self.active[provider])
+        await asyncio.sleep(0.05)
+        self.active[provider] -= 1
+
+    async def fake_perplexity(self, question, context, **kwargs):
+        await self._track('perplexity')
+        return {'content': f"research for: {context[:80]}", 'citations': []}
+
+    async def fake_cerebras(self, question, context, **kwargs):
+        await self._track('cerebras')
+        match = re.search(r'research about "([^"]+)"', context)
+        if match:
+            return json.dumps({'basic_info': {'name': match.group(1)}, 'product_analysis': {'fit_score': 8}})
+        return json.dumps([{'basic_info': {'first_name': 'Ada', 'last_name': 'Lovelace'}}])
+
+    def test_batch_wrapper_researches_all_companies_in_order(self):
+        names = [f"Company {i}" for i in range(12)]
+        companies = CompanyResearchService().batch_research_companies_parallel(names)
+        self.assertEqual([company.name for company in companies], names)
+        self.assertEqual(Company.objects.count(), 12)
+        self.assertEqual(companies[0].contacts.count(), 1)
+
+    def test_provider_concurrency_is_bounded(self):
+        engine = AsyncResearchEngine(CompanyResearchService(), cerebras_concurrency=3, perplexity_concurrency=5)
+        async_to_sync(engine.research_companies)([f"Company {i}" for i in range(10)])
+        self.assertEqual(self.peak['perplexity'], 5)
+        self.assertEqual(self.peak['cerebras'], 3)
+
+    def test_failed_company_gets_minimal_record(self):
+        service = CompanyResearchService()
+        with mock.patch.object(service, '_save_company_data', side_effect=RuntimeError("boom")):
+            companies = service.batch_research_companies_parallel(["Broken Co"])
+        self.assertEqual(companies[0].name, "Broken Co")
+        self.assertIn("Research failed: boom", companies[0].research_notes)
+
+    def test_duplicate_names_in_a_batch_share_one_run(self):
+        with mock.patch('companies.services.async_research_service.ask_perplexity_async',
+                        side_effect=self.fake_perplexity) as perplexity:
+            companies = CompanyResearchService().batch_research_companies_parallel(["OpenAI", "OpenAI, Inc."])
+        self.assertIs(companies[0], companies[1])
+        self.assertEqual(Company.objects.count(), 1)
+        self.assertEqual(perplexity.call_count, 4)
+
+    def test_batched_parsing_packs_companies_and_falls_back_per_company(self):
+        questions = []
+
+        async def batching_cerebras(question, context, **kwargs):
+            questions.append(question)
+            names = re.findall(r'=== COMPANY \d+: "([^"]+)" ===', context)
+            if question == COMPANY_BATCH_PARSE_QUESTION:
+                # The last entry names the wrong company, so that company is re-parsed alone
+                return json.dumps([
+                    {'basic_info': {'name': "Someone Else" if name == names[-1] else name},
+                     'product_analysis': {'fit_score': 8}}
+                    for name in names
+                ])
+            if question == CONTACT_BATCH_PARSE_QUESTION:
+                return json.dumps([
+                    {'company': name, 'contacts': [{'basic_info': {'first_name': "Ada", 'last_name': name}}]}
+                    for name in names
+                ])
+            return await self.fake_cerebras(question, context)
+
+        names = [f"Company {i}" for i in range(4)]
+        engine = AsyncResearchEngine(CompanyResearchService(), parse_batch_size=4)
+        with mock.patch('companies.services.async_research_service.ask_cerebras_async', side_effect=batching_cerebras), \
+                mock.patch('companies.services.async_research_service.CEREBRAS_PARSE_BATCH_WAIT', 5.0):
+            companies = async_to_sync(engine.research_companies)(names)
+
+        self.assertEqual([company.name for company in companies], names)
+        self.assertEqual(questions.count(COMPANY_BATCH_PARSE_QUESTION), 1)
+        self.assertEqual(questions.count(CONTACT_BATCH_PARSE_QUESTION), 1)
+        self.assertEqual(questions.count(COMPANY_PARSE_QUESTION), 1)
+        self.assertNotIn(CONTACT_PARSE_QUESTION, questions)
+        self.assertEqual(set(Company.objects.values_list('cerebras_fit_score', flat=True)), {8})
+        self.assertEqual(companies[2].contacts.get().last_name, "Company 2")
+
+    def test_reparse_command_replays_stored_research_and_resumes(self):
+        CompanyResearchService().batch_research_companies_parallel(["Acme", "Globex", "Initech"])
+        original = AIResearchService.build_company_parse_prompt
+
+        def new_schema(service, *args, **kwargs):
+            return original(service, *args, **kwargs) + "\nSchema v2"
+
+        async def low_fit(question, context, **kwargs):
+            name = re.search(r'research about "([^"]+)"', context).group(1)
+            return json.dumps({'basic_info': {'name': name}, 'product_analysis': {'fit_score': 3}})
+
+        out = io.StringIO()
+        with mock.patch.object(AIResearchService, 'build_company_parse_prompt', new_schema), \
+                mock.patch('companies.services.async_research_service.ask_perplexity_async') as perplexity, \
+                mock.patch('companies.services.async_research_service.ask_cerebras_async',
+                           side_effect=low_fit) as cerebras:
+            call_command('reparse_companies', '--batch-size', '2', stdout=out)
+            self.assertEqual(cerebras.call_count, 3)  # Contacts parse prompt is unchanged
+            call_command('reparse_companies', stdout=io.StringIO())
+            self.assertEqual(cerebras.call_count, 3)
+        perplexity.assert_not_called()
+        self.assertIn("3/3 re-parsed, 0 failed", out.getvalue())
+        self.assertEqual(set(Company.objects.values_list('cerebras_fit_score', flat=True)), {3})
+        self.assertEqual(set(Company.objects.values_list('outreach_priority', flat=True)), {'low'})
+
+    def test_reparse_reports_companies_deleted_since_listing(self):
+        CompanyResearchService().batch_research_companies_parallel(["Acme"])
+        acme = Company.objects.get(name="Acme")
+        engine = AsyncResearchEngine(CompanyResearchService())
+
+        async def collect():
+            return [item async for item in engine.reparse_companies([acme.id, acme.id + 1000], parse_contacts=False)]
+
+        results = async_to_sync(collect)()
+        errors = {company.name if company else None: error for company, _, error in results}
+        self.assertIsNone(errors["Acme"])
+        self.assertIsInstance(errors[None], Company.DoesNotExist)
+
+
+class ResponseCacheTestCase(SimpleTestCase):
+    """
+    Test cases for the persistent LLM response cache
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache.sqlite3")
+        self.cache = ResponseCache(self.path, max_bytes=10_000, ttls={"perplexity": 60, "cerebras": 3600})
+
+    def test_key_covers_model_temperature_seed_and_prompt(self):
+        base = make_cache_key("cerebras", "model-a", 0.1, 42, "prompt")
+        self.assertEqual(base, make_cache_key("cerebras", "model-a", 0.1, 42, "prompt"))
+        self.assertNotEqual(base, make_cache_key("cerebras", "model-b", 0.1, 42, "prompt"))
+        self.assertNotEqual(base, make_cache_key("cerebras", "model-a", 0.3, 42, "prompt"))
+        self.assertNotEqual(base, make_cache_key("cerebras", "model-a", 0.1, 7, "prompt"))
+        self.assertNotEqual(base, make_cache_key("cerebras", "model-a", 0.1, 42, "prompt!"))
+
+    def test_round_trip_counts_hits_and_misses(self):
+        self.assertIsNone(self.cache.get("perplexity", "k"))
+        self.cache.set("perplexity", "k", "sonar-pro", {"content": "x", "citations": []})
+        self.assertEqual(self.cache.get("perplexity", "k"), {"content": "x", "citations": []})
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], {"perplexity": 1})
+        self.assertEqual(stats["misses"], {"perplexity": 1})
+        self.assertEqual(stats["entries"], 1)
+
+    def test_entries_expire_after_provider_ttl(self):
+        self.cache.set("perplexity", "k", "sonar-pro", {"content": "x"})
+        with mock.patch("common.llm_cache.time.time", return_value=time.time() + 120):
+            self.assertIsNone(self.cache.get("perplexity", "k"))
+        self.cache.set("cerebras", "c", "model", "parsed")
+        with mock.patch("common.llm_cache.time.time", return_value=time.time() + 120):
+            self.assertEqual(self.cache.get("cerebras", "c"), "parsed")
+
+    def test_least_recently_used_entries_are_evicted_over_size_cap(self):
+        payload = "x" * 3000
+        for key in ["a", "b", "c"]:
+            self.cache.set("cerebras", key, "model", payload)
+            time.sleep(0.01)
+        self.cache.get("cerebras", "a")
+        self.cache.set("cerebras", "d", "model", payload)
+        self.assertIsNotNone(self.cache.get("cerebras", "a"))
+        self.assertIsNone(self.cache.get("cerebras", "b"))
+        self.assertLessEqual(self.cache.stats()["bytes"], 10_000)
+
+    def test_ask_cerebras_serves_repeat_prompts_from_cache(self):
+        with mock.patch("common.utils.get_response_cache", return_value=self.cache), \
+                mock.patch("common.utils._request_cerebras", return_value='{"ok": true}') as request:
+            first = ask_cerebras("question", "context", temp=0.1)
+            second = ask_cerebras("question", "context", temp=0.1)
+        self.assertEqual(first, second)
+        self.assertEqual(request.call_count, 1)
+
+    def test_errors_are_not_cached(self):
+        with mock.patch("common.utils.get_response_cache", return_value=self.cache), \
+                mock.patch("common.utils._request_cerebras", return_value="Error: boom") as request:
+            ask_cerebras("question", "context")
+            ask_cerebras("question", "context")
+        self.assertEqual(request.call_count, 2)
+
+
+class RateLimiterTestCase(SimpleTestCase):
+    """
+    Test cases for the shared token-bucket rate limiter
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "rate_limits.sqlite3")
+        self.limiter = RateLimiter(self.path, limits={"cerebras": (60, 6000)},
+                                   model_limits={("cerebras", "small"): (120, 0)})
+
+    def test_requests_beyond_the_minute_quota_are_paced(self):
+        with mock.patch("common.rate_limit.time.time", return_value=1000.0):
+            waits = [self.limiter.reserve("cerebras", "big", 10) for _ in range(62)]
+        self.assertEqual(waits[:60], [0.0] * 60)
+        self.assertAlmostEqual(waits[60], 1.0)
+        self.assertAlmostEqual(waits[61], 2.0)
+
+    def test_token_bucket_limits_large_prompts_and_refills(self):
+        with mock.patch("common.rate_limit.time.time", return_value=1000.0):
+            self.assertEqual(self.limiter.reserve("cerebras", "big", 6000), 0.0)
+            self.assertAlmostEqual(self.limiter.reserve("cerebras", "big", 300), 3.0)
+        with mock.patch("common.rate_limit.time.time", return_value=1003.0):
+            self.assertEqual(self.limiter.reserve("cerebras", "big", 0), 0.0)
+
+    def test_buckets_are_shared_through_the_database(self):
+        other_worker = RateLimiter(self.path, limits={"cerebras": (60, 0)})
+        with mock.patch("common.rate_limit.time.time", return_value=1000.0):
+            for _ in range(60):
+                self.limiter.reserve("cerebras", "big", 1)
+            self.assertGreater(other_worker.reserve("cerebras", "big", 1), 0)
+
+    def test_model_overrides_and_usage_settlement(self):
+        self.assertEqual(self.limiter.limits_for("cerebras", "small"), (120, 0))
+        self.assertEqual(self.limiter.limits_for("cerebras", "other"), (60, 6000))
+        self.assertEqual(parse_model_overrides("cerebras:llama3.1-8b=90/120000, bad"),
+                         {("cerebras", "llama3.1-8b"): (90, 120000)})
+        with mock.patch("common.rate_limit.time.time", return_value=1000.0):
+            self.limiter.reserve("cerebras", "big", 6000)
+            self.limiter.settle("cerebras", "big", reserved=6000, used=1000)
+            self.assertEqual(self.limiter.reserve("cerebras", "big", 5000), 0.0)
+
+    def test_async_reservations_run_off_the_event_loop(self):
+        threads = []
+        reserve = self.limiter.reserve
+
+        def tracking_reserve(*args):
+            threads.append(threading.current_thread())
+            return reserve(*args)
+
+        async def acquire():
+            loop_thread = threading.current_thread()
+            await self.limiter.acquire_async("cerebras", "big", 10)
+            return loop_thread
+
+        with mock.patch.object(self.limiter, "reserve", side_effect=tracking_reserve):
+            loop_thread = asyncio.run(acquire())
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], loop_thread)
+
+
+class CircuitBreakerTestCase(TestCase):
+    """
+    Test cases for the per-provider circuit breakers
+    """
+
+    def setUp(self):
+        self.breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=30, half_open_probes=1)
+        for provider in ("cerebras", "perplexity"):
+            self.addCleanup(get_circuit_breaker(provider).reset)
+
+    def test_opens_after_consecutive_failures_and_probes_after_timeout(self):
+        with mock.patch("common.circuit_breaker.time.monotonic", return_value=100.0):
+            for _ in range(3):
+                self.breaker.before_call()
+                self.breaker.record_failure(RuntimeError("down"))
+            self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+            with self.assertRaises(CircuitOpenError):
+                self.breaker.before_call()
+        with mock.patch("common.circuit_breaker.time.monotonic", return_value=131.0):
+            self.breaker.before_call()  # The single half-open probe
+            with self.assertRaises(CircuitOpenError):
+                self.breaker.before_call()
+            self.breaker.record_failure(RuntimeError("still down"))
+            self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with mock.patch("common.circuit_breaker.time.monotonic", return_value=162.0):
+            self.breaker.before_call()
+            self.breaker.record_success()
+            self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_open_circuit_skips_retries_and_api_calls(self):
+        client = mock.Mock()
+        client.chat.completions.create.side_effect = ConnectionError("connection refused")
+        with mock.patch("common.utils.get_response_cache", return_value=None), \
+                mock.patch("common.utils.get_rate_limiter", return_value=None):
+            for _ in range(CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+                ask_cerebras("question", "context", client=client)
+            calls = client.chat.completions.create.call_count
+            started = time.perf_counter()
+            result = ask_cerebras("question", "context", client=client)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertIn("circuit open", result)
+        self.assertEqual(client.chat.completions.create.call_count, calls)
+
+        response = self.client.get(reverse("provider_status"))
+        self.assertEqual(response.json()["providers"]["cerebras"]["state"], "open")
+
+    def test_unusable_response_is_recorded_once_as_a_failure(self):
+        client = mock.Mock()
+        client.chat.completions.create.return_value = mock.Mock(choices=[], usage=None)
+        breaker = get_circuit_breaker("cerebras")
+        with mock.patch("common.utils.get_response_cache", return_value=None), \
+                mock.patch("common.utils.get_rate_limiter", return_value=None), \
+                mock.patch.object(breaker, "record_success") as success, \
+                mock.patch.object(breaker, "record_failure") as failure:
+            result = ask_cerebras("question", "context", client=client)
+        self.assertTrue(result.startswith("Error:"))
+        success.assert_not_called()
+        failure.assert_called_once()
+
+    def test_research_fails_fast_while_a_provider_is_open(self):
+        breaker = get_circuit_breaker("perplexity")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure(RuntimeError("down"))
+        service = CompanyResearchService()
+        with mock.patch.object(service.perplexity, "research_company_comprehensive") as research:
+            companies = service.batch_research_companies(["Acme"])
+        research.assert_not_called()
+        self.assertIn("perplexity circuit open", companies[0].research_notes)
+
+
+class ModelRoutingTestCase(SimpleTestCase):
+    """
+    Test cases for per-task model routes and their usage tracking
+    """
+
+    def test_overrides_change_only_the_given_settings(self):
+        overrides = parse_route_overrides("email=llama3.1-8b, single_report=//4000, discovery=sonar/hot, unknown=x")
+        self.assertNotIn("discovery", overrides)
+        routes = build_routes(overrides)
+
+        self.assertEqual(routes["email"].model, "llama3.1-8b")
+        self.assertEqual(routes["email"].temperature, 0.3)
+        self.assertEqual(routes["single_report"].model, get_route("single_report").model)
+        self.assertEqual(routes["single_report"].max_tokens, 4000)
+        self.assertEqual(routes["discovery"].provider, "perplexity")
+        self.assertNotIn("unknown", routes)
+
+    def test_untagged_text_generation_uses_the_default_route(self):
+        with mock.patch.object(AIResearchService, "client", None), \
+                mock.patch("companies.services.cerebras_service.ask_cerebras", return_value="text") as ask:
+            self.assertEqual(AIResearchService().generate_text("question", "context"), "text")
+        self.assertEqual(ask.call_args.kwargs["task"], "default")
+        self.assertEqual(ask.call_args.kwargs["temp"], 0.3)
+
+    def test_explicit_model_and_temperature_override_the_route(self):
+        with mock.patch.object(AIResearchService, "client", None), \
+                mock.patch("companies.services.cerebras_service.ask_cerebras", return_value="text") as ask:
+            AIResearchService().generate_text("question", "context", "llama3.1-8b", 0.9)
+            AIResearchService().generate_text("question", "context", temp=0.0, task="single_report")
+        first, second = (call.kwargs for call in ask.call_args_list)
+        self.assertEqual((first["model"], first["temp"], first["task"]), ("llama3.1-8b", 0.9, "default"))
+        self.assertEqual((second["model"], second["temp"]), (get_route("single_report").model, 0.0))
+
+    def test_calls_use_the_route_of_their_task(self):
+        routes = build_routes({"email": ("llama3.1-8b", 0.5, 800)})
+        with mock.patch.dict("common.model_routing.ROUTES", routes), \
+                mock.patch.object(AIResearchService, "client", None), \
+                mock.patch("companies.services.cerebras_service.ask_cerebras", return_value="Subject: Hi") as ask:
+            AIResearchService().generate_personalized_email_content({}, {}, {})
+
+        kwargs = ask.call_args.kwargs
+        self.assertEqual((kwargs["model"], kwargs["temp"], kwargs["max_tokens"], kwargs["task"]),
+                         ("llama3.1-8b", 0.5, 800, "email"))
+
+    def test_usage_tracks_tokens_cost_and_latency_per_task(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = ResponseCache(os.path.join(directory.name, "cache.sqlite3"))
+        usage = TaskUsage(prices={"fast-model": (0.6, 1.2)})
+        client = mock.Mock()
+        client.chat.completions.create.return_value = mock.Mock(
+            choices=[mock.Mock(message=mock.Mock(content='{"ok": true}'))],
+            usage=mock.Mock(prompt_tokens=1000, completion_tokens=500, total_tokens=1500),
+        )
+        with mock.patch("common.utils.get_response_cache", return_value=cache), \
+                mock.patch("common.utils.get_rate_limiter", return_value=None), \
+                mock.patch("common.utils.get_task_usage", return_value=usage):
+            for _ in range(2):
+                ask_cerebras("question", "context", model="fast-model", temp=0.1, client=client,
+                             max_tokens=64, task="company_parse")
+
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+        self.assertEqual(client.chat.completions.create.call_args.kwargs["max_tokens"], 64)
+        stats = usage.snapshot()["company_parse"]
+        self.assertEqual((stats["calls"], stats["cached_calls"], stats["errors"]), (1, 1, 0))
+        self.assertEqual((stats["prompt_tokens"], stats["completion_tokens"]), (1000, 500))
+        self.assertAlmostEqual(stats["cost_usd"], 0.0012)
+        self.assertEqual(stats["models"], ["fast-model"])
+
+
+class SingleFlightTestCase(SimpleTestCase):
+    """
+    Test cases for collapsing concurrent identical calls
+    """
+
+    def test_concurrent_callers_share_one_execution(self):
+        flights = SingleFlight("test")
+        calls = []
+        release = threading.Event()
+
+        def work():
+            calls.append(1)
+            release.wait(5)
+            return object()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flights.do("acme", work))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while flights.shared < 4:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(result) for result in results}), 1)
+        self.assertFalse(flights.in_flight("acme"))
+
+    def test_errors_reach_every_waiter_and_release_the_key(self):
+        flights = SingleFlight("test")
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError("boom")
+
+        errors = []
+
+        def call():
+            try:
+                flights.do("acme", failing)
+            except RuntimeError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(5)
+        call()
+        leader.join()
+        self.assertEqual(len(errors), 2)
+        self.assertIs(errors[0], errors[1])
+        self.assertEqual(flights.do("acme", lambda: "fresh"), "fresh")
+
+
+class ResearchFreshnessTestCase(TestCase):
+    """
+    Test cases for refreshing only the research phases that have expired
+    """
+
+    def setUp(self):
+        now = timezone.now()
+        fetched = {
+            'basic_research': now - timedelta(days=3),
+            'contact_research': now - timedelta(days=3),
+            'competitor_analysis': now - timedelta(days=3),
+            'recent_news': now - timedelta(days=2),
+        }
+        self.company = Company.objects.create(name="Acme", research_phases={
+            phase: {'text': f"stored {phase}", 'fetched_at': at.isoformat()} for phase, at in fetched.items()
+        })
+        self.service = CompanyResearchService()
+        patches = {
+            'research_company_comprehensive': mock.patch.object(self.service.perplexity, 'research_company_comprehensive'),
+            'research_specific_contacts': mock.patch.object(self.service.perplexity, 'research_specific_contacts'),
+            'analyze_competitor_landscape': mock.patch.object(self.service.perplexity, 'analyze_competitor_landscape'),
+            'research_recent_news_and_initiatives': mock.patch.object(
+                self.service.perplexity, 'research_recent_news_and_initiatives', return_value="fresh news"),
+            'parse_company_research': mock.patch.object(
+                self.service.ai_service, 'parse_company_research',
+                return_value={'basic_info': {'name': "Acme"}, 'product_analysis': {'fit_score': 7}}),
+            'parse_contact_research': mock.patch.object(self.service.ai_service, 'parse_contact_research', return_value=[]),
+        }
+        self.mocks = {name: patch.start() for name, patch in patches.items()}
+        for patch in patches.values():
+            self.addCleanup(patch.stop)
+
+    def test_only_expired_phases_are_refetched_and_reparsed(self):
+        self.assertEqual(stale_phases(self.company), {'recent_news'})
+        company = self.service.research_and_save_company("Acme")
+
+        self.mocks['research_recent_news_and_initiatives'].assert_called_once()
+        for name in ('research_company_comprehensive', 'research_specific_contacts',
+                     'analyze_competitor_landscape', 'parse_contact_research'):
+            self.mocks[name].assert_not_called()
+        combined = self.mocks['parse_company_research'].call_args[0][0]
+        self.assertIn("stored basic_research", combined)
+        self.assertIn("fresh news", combined)
+
+        company.refresh_from_db()
+        self.assertEqual(company.research_phases['recent_news']['text'], "fresh news")
+        self.assertEqual(company.cerebras_fit_score, 7)
+        self.assertEqual(stale_phases(company), set())
+
+    def test_fresh_company_makes_no_calls_and_force_refresh_refetches(self):
+        record_phases(self.company, {'recent_news': "today's news"})
+        self.assertEqual(self.service.research_and_save_company("Acme").id, self.company.id)
+        for mocked in self.mocks.values():
+            mocked.assert_not_called()
+
+        self.service.research_and_save_company("Acme", force_refresh=True)
+        self.mocks['research_company_comprehensive'].assert_called_once()
+        self.mocks['parse_contact_research'].assert_called_once()
+
+    def test_force_refresh_bypasses_the_response_cache(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = ResponseCache(os.path.join(directory.name, "cache.sqlite3"), ttls={"perplexity": 86400})
+        # Let recent_news reach ask_perplexity; the other phases stay mocked
+        self.mocks['research_recent_news_and_initiatives'].side_effect = lambda company_name, **kwargs: \
+            type(self.service.perplexity).research_recent_news_and_initiatives(
+                self.service.perplexity, company_name, **kwargs)
+        answers = [{'content': "yesterday's news", 'citations': []}, {'content': "today's news", 'citations': []}]
+        with mock.patch("common.utils.get_response_cache", return_value=cache), \
+                mock.patch("common.utils._request_perplexity", side_effect=answers) as request:
+            self.service.research_and_save_company("Acme")
+            company = self.service.research_and_save_company("Acme", force_refresh=True)
+        self.assertEqual(request.call_count, 2)
+        company.refresh_from_db()
+        self.assertEqual(company.research_phases['recent_news']['text'], "today's news")
+
+    def test_failed_phase_is_not_stored_as_fresh(self):
+        self.mocks['research_recent_news_and_initiatives'].return_value = "Error researching recent news: timeout"
+        company = self.service.research_and_save_company("Acme")
+        company.refresh_from_db()
+        self.assertEqual(company.research_phases['recent_news']['text'], "stored recent_news")
+        self.assertEqual(stale_phases(company), {'recent_news'})
+
+
+class ResearchCheckpointTestCase(TestCase):
+    """
+    Test cases for resuming research from per-phase artifacts
+    """
+
+    def setUp(self):
+        self.service = CompanyResearchService()
+        patches = {
+            'research_company_comprehensive': mock.patch.object(
+                self.service.perplexity, 'research_company_comprehensive', return_value="basic"),
+            'research_specific_contacts': mock.patch.object(
+                self.service.perplexity, 'research_specific_contacts', return_value="contacts"),
+            'analyze_competitor_landscape': mock.patch.object(
+                self.service.perplexity, 'analyze_competitor_landscape', return_value="competitors"),
+            'research_recent_news_and_initiatives': mock.patch.object(
+                self.service.perplexity, 'research_recent_news_and_initiatives', return_value="news"),
+            'parse_company_research': mock.patch.object(
+                self.service.ai_service, 'parse_company_research',
+                return_value={'basic_info': {'name': "Acme"}, 'product_analysis': {'fit_score': 8}}),
+            'parse_contact_research': mock.patch.object(
+                self.service.ai_service, 'parse_contact_research',
+                return_value=[{'basic_info': {'first_name': "Ada", 'last_name': "Lovelace"}}]),
+        }
+        self.mocks = {name: patch.start() for name, patch in patches.items()}
+        for patch in patches.values():
+            self.addCleanup(patch.stop)
+
+    def test_retry_resumes_from_finished_phases(self):
+        self.mocks['parse_company_research'].side_effect = RuntimeError("worker died")
+        with self.assertRaises(RuntimeError):
+            self.service.research_and_save_company("Acme")
+        self.assertFalse(Company.objects.filter(name="Acme").exists())
+        self.assertTrue(set(ResearchArtifact.objects.values_list('phase', flat=True)).issuperset(
+            {'basic_research', 'contact_research', 'competitor_analysis', 'recent_news'}
+        ))
+
+        self.mocks['parse_company_research'].side_effect = None
+        company = self.service.research_and_save_company("Acme")
+
+        for name in ('research_company_comprehensive', 'research_specific_contacts',
+                     'analyze_competitor_landscape', 'research_recent_news_and_initiatives'):
+            self.assertEqual(self.mocks[name].call_count, 1, name)
+        # The failed parse is the one phase the retry has to run again
+        self.assertEqual(self.mocks['parse_company_research'].call_count, 2)
+        self.assertEqual(company.cerebras_fit_score, 8)
+        self.assertEqual(company.contacts.count(), 1)
+        self.assertEqual(company.research_artifacts.count(), 6)
+        self.assertFalse(ResearchArtifact.objects.filter(company__isnull=True).exists())
+
+    def test_expired_or_forced_phases_are_not_resumed(self):
+        self.service.research_and_save_company("Acme")
+        ResearchArtifact.objects.filter(phase='recent_news').update(
+            finished_at=timezone.now() - timedelta(days=2)
+        )
+        Company.objects.filter(name="Acme").update(research_phases={})
+
+        self.service.research_and_save_company("Acme")
+        self.assertEqual(self.mocks['research_recent_news_and_initiatives'].call_count, 2)
+        self.assertEqual(self.mocks['research_company_comprehensive'].call_count, 1)
+
+        self.service.research_and_save_company("Acme", force_refresh=True)
+        self.assertEqual(self.mocks['research_company_comprehensive'].call_count, 2)
+
+    def test_reparse_uses_stored_research_and_only_reparses_changed_prompts(self):
+        company = self.service.research_and_save_company("Acme")
+        self.service.reparse_company(company)
+        self.assertEqual(self.mocks['parse_company_research'].call_count, 1)
+
+        with mock.patch.object(self.service.ai_service, 'build_company_parse_prompt', return_value="new schema"):
+            self.service.reparse_company(company)
+        self.assertEqual(self.mocks['parse_company_research'].call_count, 2)
+        self.assertEqual(self.mocks['parse_contact_research'].call_count, 1)
+        self.assertEqual(self.mocks['research_company_comprehensive'].call_count, 1)
+        self.assertIn("basic", self.mocks['parse_company_research'].call_args[0][0])
+
+
+class ResearchJobTestCase(TestCase):
+    """
+    Test cases for background research jobs, run eagerly without a broker
+    """
+
+    def setUp(self):
+        # Settings are namespaced, so overrides use the CELERY_ prefixed keys
+        previous = celery_app.conf.task_always_eager
+        celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=True)
+        self.addCleanup(celery_app.conf.update, CELERY_TASK_ALWAYS_EAGER=previous)
+
+    def fake_research(self, company_name):
+        if company_name == "Broken":
+            raise RuntimeError("boom")
+        return Company.objects.create(name=company_name, research_quality_score=8)
+
+    def test_batch_job_is_queued_and_tracks_progress(self):
+        with mock.patch.object(CompanyResearchService, "research_and_save_company",
+                               autospec=True, side_effect=lambda service, name: self.fake_research(name)):
+            response = self.client.post(
+                reverse("companies:company-research"),
+                {"company_names": ["Acme", "Broken", "Globex"], "background": True},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+
+        status = self.client.get(reverse("companies:research-job-status", args=[job_id])).json()
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(status["progress"], 100)
+        self.assertEqual((status["completed_companies"], status["failed_companies"]), (2, 1))
+        self.assertEqual([r["company_name"] for r in status["results"]], ["Acme", "Broken", "Globex"])
+
+    def test_discovery_job_researches_found_customers(self):
+        with mock.patch.object(CompanyResearchService, "find_potential_customers", return_value=["Initech"]), \
+                mock.patch.object(CompanyResearchService, "research_and_save_company",
+                                  autospec=True, side_effect=lambda service, name: self.fake_research(name)):
+            response = self.client.post(
+                reverse("companies:company-research"),
+                {"max_customers": 1, "background": True},
+                content_type="application/json",
+            )
+        job = ResearchJob.objects.get(id=response.json()["job_id"])
+        self.assertEqual(job.mode, "discovery")
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.company_names, ["Initech"])
+        self.assertEqual(list(job.companies.values_list("name", flat=True)), ["Initech"])
+
+    def test_redelivered_company_is_counted_once(self):
+        job = ResearchJob.objects.create(company_names=["Acme", "Globex"], total_companies=2, status="running")
+        acme = Company.objects.create(name="Acme")
+        ResearchJob.record_result(job.id, 0, "Acme", acme, True)
+        ResearchJob.record_result(job.id, 0, "Acme", acme, True)
+        job.refresh_from_db()
+        self.assertEqual((job.completed_companies, job.failed_companies, job.status), (1, 0, "running"))
+
+        ResearchJob.record_result(job.id, 1, "Globex", None, False)
+        with mock.patch.object(CompanyResearchService, "research_and_save_company") as research:
+            research_company_task(str(job.id), "Globex", 1)
+        research.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual((job.completed_companies, job.failed_companies, job.status), (1, 1, "completed"))
+        self.assertEqual(job.results.count(), 2)
+
+
+class CompanyNormalizedNameTestCase(TestCase):
+    """
+    Test cases for the indexed normalized_name duplicate detection
+    """
+
+    def test_normalized_name_is_kept_in_sync_on_save(self):
+        company = Company.objects.create(name="Acme  Robotics, Inc.")
+        self.assertEqual(company.normalized_name, "acme robotics")
+        company.name = "Globex, LLC"
+        company.save(update_fields=["name"])
+        company.refresh_from_db()
+        self.assertEqual(company.normalized_name, "globex")
+
+    def test_find_existing_company_is_a_single_indexed_lookup(self):
+        existing = Company.objects.create(name="Acme Robotics, Inc.")
+        Company.objects.create(name="Globex")
+        service = CompanyResearchService()
+        with self.assertNumQueries(1):
+            self.assertEqual(service._find_existing_company("acme robotics"), existing)
+        self.assertIsNone(service._find_existing_company("Initech"))
+        self.assertEqual(service._record_failed_research("ACME Robotics, Corp", RuntimeError("boom")), existing)
+
+    def test_failed_save_recovers_the_row_with_the_same_normalized_name(self):
+        existing = Company.objects.create(name="Acme Robotics, Inc.")
+        service = CompanyResearchService()
+        with mock.patch.object(service, 'build_company_fields', side_effect=ValueError("bad data")):
+            company = service._save_company_data({'basic_info': {'name': "ACME Robotics"}}, "raw")
+        self.assertEqual(company, existing)
+        self.assertEqual(Company.objects.count(), 1)
+
+    def test_backfill_merges_legacy_duplicates_into_the_oldest_company(self):
+        from django.apps import apps
+        backfill = importlib.import_module('companies.migrations.0003_company_normalized_name').backfill_normalized_names
+        original, duplicate = Company.objects.bulk_create([Company(name="OpenAI"), Company(name="OpenAI, Inc.")])
+        Contact.objects.create(company=original, first_name="Ann", last_name="Lee", email="ann@openai.com")
+        Contact.objects.create(company=duplicate, first_name="Ann", last_name="Lee", email="ann@openai.com")
+        moved = Contact.objects.create(company=duplicate, first_name="Bo", last_name="Chen", email="bo@openai.com")
+        Report.objects.create(company=original, title="Original", content="a")
+        Report.objects.create(company=duplicate, title="Duplicate", content="b")
+        job = ResearchJob.objects.create(company_names=["OpenAI, Inc."], total_companies=1)
+        job.companies.add(duplicate)
+
+        backfill(apps, None)
+
+        self.assertFalse(Company.objects.filter(pk=duplicate.pk).exists())
+        original.refresh_from_db()
+        self.assertEqual(original.normalized_name, "openai")
+        self.assertEqual(original.contacts.count(), 2)
+        self.assertEqual(Contact.objects.get(pk=moved.pk).company, original)
+        self.assertEqual(original.reports.filter(is_archived=False).count(), 1)
+        self.assertEqual(list(job.companies.all()), [original])
+        original.save()
+
+    def test_saving_a_legacy_duplicate_keeps_the_other_rows_normalized_name(self):
+        original = Company.objects.create(name="OpenAI")
+        [duplicate] = Company.objects.bulk_create([Company(name="OpenAI, Inc.")])
+        duplicate = Company.objects.get(pk=duplicate.pk)
+        self.assertIsNone(duplicate.normalized_name)
+        duplicate.research_notes = "edited in the admin"
+        duplicate.save()
+        duplicate.refresh_from_db()
+        self.assertIsNone(duplicate.normalized_name)
+        self.assertEqual(Company.objects.get(normalized_name="openai"), original)
+
+
+class ContactIdentityKeyTestCase(TestCase):
+    """
+    Test cases for batched contact deduplication on the (company, normalized_name) key
+    """
+
+    def contact(self, first_name, last_name, email=None, title=None):
+        return {
+            "basic_info": {"first_name": first_name, "last_name": last_name, "title": title},
+            "contact_info": {"email": email},
+        }
+
+    def test_contacts_are_resolved_in_one_query_and_written_in_bulk(self):
+        company = Company.objects.create(name="Acme")
+        existing = Contact.objects.create(company=company, first_name="Ada", last_name="Lovelace", email="ada@acme.com")
+        self.assertEqual(existing.normalized_name, "ada|lovelace")
+        parsed = [
+            self.contact("ada", "LOVELACE", title="Chief Scientist"),
+            self.contact("Grace", "Hopper", title="VP"),
+            self.contact("Grace", "Hopper", email="grace@acme.com", title="VP Engineering"),
+        ]
+        service = CompanyResearchService()
+        # One lookup query, plus the bulk update and bulk insert inside a transaction
+        with self.assertNumQueries(5):
+            service._save_contact_data(company, parsed, "raw research")
+
+        existing.refresh_from_db()
+        self.assertEqual(existing.title, "Chief Scientist")
+        contacts = Contact.objects.filter(company=company).order_by("id")
+        self.assertEqual(contacts.count(), 2)
+        grace = contacts.last()
+        self.assertEqual((grace.email, grace.title, grace.normalized_name), ("grace@acme.com", "VP Engineering", "grace|hopper"))
+
+    def test_colliding_generated_email_skips_only_that_contact(self):
+        company = Company.objects.create(name="Acme")
+        parsed = [
+            self.contact("Grace", "Hopper"),
+            self.contact("Ann", "Lee"),
+            self.contact("Ann.Lee", ""),  # Different name key, same generated ann.lee@ email
+        ]
+        CompanyResearchService()._save_contact_data(company, parsed, "raw research")
+
+        contacts = Contact.objects.filter(company=company)
+        self.assertEqual(sorted(contacts.values_list("normalized_name", flat=True)), ["ann|lee", "grace|hopper"])
+
+
+class CompanyListTestCase(TestCase):
+    """
+    Test cases for the paginated, projected company list endpoint
+    """
+
+    def setUp(self):
+        for index in range(5):
+            company = Company.objects.create(name=f"Company {index}", industry="AI")
+            for contact_index in range(index):
+                Contact.objects.create(
+                    company=company, first_name=f"First{contact_index}", last_name="Last",
+                    email=f"c{contact_index}@company{index}.com",
+                    contact_priority="primary" if contact_index == 0 else "secondary"
+                )
+
+    def test_query_count_does_not_grow_with_rows(self):
+        # The total count, one annotated page query and one contact prefetch
+        with self.assertNumQueries(3):
+            data = self.client.get(reverse("companies:company-list")).json()
+        self.assertEqual(data["count"], 5)
+        by_name = {company["name"]: company for company in data["companies"]}
+        self.assertEqual(by_name["Company 3"]["contacts_count"], 3)
+        self.assertEqual(by_name["Company 3"]["primary_contacts_count"], 1)
+        self.assertEqual(len(by_name["Company 3"]["contacts"]), 3)
+        has_contacts = self.client.get(reverse("companies:company-list"), {"has_contacts": "true"}).json()
+        self.assertEqual(has_contacts["count"], 4)
+
+    def test_fields_projection_and_cursor_pagination(self):
+        url = reverse("companies:company-list")
+        params = {"fields": "id,name", "include_contacts": "false", "limit": 2}
+        with self.assertNumQueries(2):
+            page = self.client.get(url, params).json()
+        self.assertEqual([set(company) for company in page["companies"]], [{"id", "name"}] * 2)
+        self.assertEqual(page["count"], 5)
+
+        names = [company["name"] for company in page["companies"]]
+        while page["next_cursor"]:
+            page = self.client.get(url, {**params, "cursor": page["next_cursor"]}).json()
+            names += [company["name"] for company in page["companies"]]
+            self.assertEqual(page["count"], 5)
+        self.assertEqual(names, [f"Company {index}" for index in range(5)])
+        self.assertIsNone(page["next"])
+
+        self.assertEqual(self.client.get(url, {"fields": "name,bogus"}).status_code, 400)
+
+    def test_unparameterized_request_returns_the_first_page(self):
+        with mock.patch.object(CompanyCursorPagination, "page_size", 2):
+            data = self.client.get(reverse("companies:company-list")).json()
+        self.assertEqual([company["name"] for company in data["companies"]], ["Company 0", "Company 1"])
+        self.assertEqual(data["count"], 5)
+        self.assertIsNotNone(data["next_cursor"])
+
+
+class PipelineMetricsTestCase(TestCase):
+    """
+    Test cases for database-side pipeline metrics
+    """
+
+    def test_metrics_match_portfolio_and_use_fixed_queries(self):
+        acme = Company.objects.create(name="Acme", industry="AI", cerebras_fit_score=9, outreach_priority="high",
+                                      employee_count_exact=100, recommended_cerebras_product="CS-3")
+        Company.objects.create(name="Globex", industry="AI", cerebras_fit_score=5, employee_count_exact=50,
+                               recommended_cerebras_product="CS-3")
+        Company.objects.create(name="Initech", cerebras_fit_score=2)
+        Contact.objects.create(company=acme, first_name="Ada", last_name="Lovelace", email="ada@acme.com", decision_maker=True)
+        Contact.objects.create(company=acme, first_name="Alan", last_name="Turing", email="alan@acme.com")
+
+        for index in range(20):
+            Company.objects.create(name=f"Filler {index}", industry="Retail", cerebras_fit_score=6)
+        with self.assertNumQueries(6):
+            metrics = compute_pipeline_metrics(Company.objects.all())
+
+        self.assertEqual(
+            (metrics["total_companies"], metrics["high_fit_companies"], metrics["medium_fit_companies"], metrics["low_fit_companies"]),
+            (23, 1, 21, 1)
+        )
+        ai = metrics["industry_breakdown"]["AI"]
+        self.assertEqual((ai["count"], ai["high_fit_count"], ai["total_employees"], ai["avg_fit_score"]), (2, 1, 150, 7))
+        self.assertEqual(len(ai["companies"]), 2)
+        retail = metrics["industry_breakdown"]["Retail"]
+        self.assertEqual(retail["count"], 20)
+        self.assertEqual(len(retail["companies"]), GROUP_TOP_COMPANIES)
+        self.assertEqual(metrics["product_breakdown"]["No Recommendation"]["companies"][0]["name"], "Filler 0")
+        self.assertEqual(metrics["industry_breakdown"]["Unknown"]["count"], 1)
+        self.assertEqual(metrics["product_breakdown"]["CS-3"]["avg_fit_score"], 7)
+        self.assertEqual(metrics["product_breakdown"]["No Recommendation"]["count"], 21)
+        health = metrics["pipeline_health"]
+        self.assertEqual((health["total_contacts"], health["companies_with_contacts"]), (2, 1))
+        self.assertEqual([(o["name"], o["contacts_count"], o["decision_makers_count"]) for o in metrics["top_opportunities"]],
+                         [("Acme", 2, 1)])
+
+
+class OfferingsRepositoryTestCase(SimpleTestCase):
+    """
+    Test cases for the shared, mtime-aware company offerings repository
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "company_offerings.json")
+        with open(self.path, "w") as f:
+            json.dump({"company": {"name": "Acme"}, "products": {"Rocket": {"Key Features": ["fast"]}}}, f)
+        self.repository = OfferingsRepository(self.path)
+
+    def test_parses_once_and_hands_out_read_only_views(self):
+        with mock.patch("companies.services.offerings.json.load", wraps=json.load) as parse:
+            first = self.repository.load()
+            second = self.repository.load()
+        self.assertIs(first, second)
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(json.loads(json.dumps(first))["products"]["Rocket"]["Key Features"], ["fast"])
+        with self.assertRaises(TypeError):
+            first["company"]["name"] = "Globex"
+
+    def test_reloads_on_mtime_change_and_after_save(self):
+        version = self.repository.load() and self.repository.version
+        with open(self.path, "w") as f:
+            json.dump({"company": {"name": "Globex Corporation"}}, f)
+        os.utime(self.path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        self.assertEqual(self.repository.load()["company"]["name"], "Globex Corporation")
+        self.assertGreater(self.repository.version, version)
+
+        self.repository.save({"company": {"name": "Initech"}})
+        self.assertEqual(self.repository.load()["company"]["name"], "Initech")
+
+
+class PromptFragmentCacheTestCase(SimpleTestCase):
+    """
+    Test cases for selling-context prompt fragments cached per offerings version
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "company_offerings.json")
+        self.repository = OfferingsRepository(self.path)
+        self.repository.save({"company": {"name": "Acme"}, "products": {"Rocket": {"Description": "Goes up"}}})
+        self.cache = PromptFragmentCache(self.repository)
+
+    def info(self):
+        offerings = self.repository.load()
+        return {"company": offerings["company"], "products": offerings["products"]}
+
+    def test_fragments_render_once_per_offerings_version(self):
+        render = mock.Mock(side_effect=render_selling_company_context, __name__="render")
+        first = self.cache.get(render, "Acme", self.info())
+        second = self.cache.get(render, "Acme", self.info())
+        self.assertIs(first, second)
+        self.assertEqual(render.call_count, 1)
+        self.assertIn('{"Rocket":{"Description":"Goes up"}}', first)
+
+        self.repository.save({"company": {"name": "Acme"}, "products": {"Drill": {"Description": "Goes down"}}})
+        self.assertIn("Drill", self.cache.get(render, "Acme", self.info()))
+        self.assertEqual(render.call_count, 2)
+
+    def test_plain_dicts_are_rendered_uncached(self):
+        render = mock.Mock(side_effect=render_selling_company_context, __name__="render")
+        info = {"company": {"name": "Acme"}, "products": {}}
+        self.cache.get(render, "Acme", info)
+        self.cache.get(render, "Acme", info)
+        self.assertEqual(render.call_count, 2)
+
+
+class BudgetedPromptBuilderTestCase(TestCase):
+    """
+    Test cases for the token-budgeted report prompt
+    """
+
+    def test_rows_are_kept_by_value_until_the_section_budget(self):
+        builder = BudgetedPromptBuilder(total_budget=100)
+        rows = [{"name": f"Company {index}", "score": index} for index in range(50)]
+        builder.add_rows("rows", "Rows:", rows, share=0.5, value=lambda row: row["score"])
+        prompt = builder.build()
+        self.assertIn('"Company 49"', prompt)
+        self.assertNotIn('"Company 0"', prompt)
+        stats = builder.stats["rows"]
+        self.assertLessEqual(stats["tokens"], stats["budget"] + estimate_tokens("... 50 more rows omitted") + 1)
+        self.assertEqual(stats["rows_included"] + stats["rows_omitted"], 50)
+
+    def test_comprehensive_report_prompt_stays_bounded_and_is_saved_in_metadata(self):
+        for index in range(300):
+            Company.objects.create(name=f"Company {index}", industry=f"Industry {index % 60}",
+                                   cerebras_fit_score=index % 10 + 1, outreach_priority="high",
+                                   recommended_cerebras_product=f"Product {index % 7}")
+        with mock.patch("companies.services.research_service.REPORT_PROMPT_TOKEN_BUDGET", 2000), \
+                mock.patch.object(CompanyResearchService, "get_product_offerings_only", return_value={}), \
+                mock.patch("companies.services.cerebras_service.AIResearchService.generate_text",
+                           return_value="# Report") as generate:
+            response = self.client.post(reverse("companies:customer-report"), {}, content_type="application/json")
+
+        context = generate.call_args[0][1]
+        self.assertLessEqual(estimate_tokens(context), 2200)
+        self.assertIn("smaller industries", context)
+        report = Report.objects.get(id=response.json()["report_id"])
+        self.assertEqual(report.metadata["total_companies"], 300)
+        self.assertGreater(report.metadata["prompt_tokens"], 0)
+        self.assertGreater(report.metadata["prompt_sections"]["industry_breakdown"]["rows_omitted"], 0)
+
+
+class CustomerReportStreamTestCase(TestCase):
+    """
+    Test cases for the Server-Sent Events customer report endpoint
+    """
+
+    def test_think_blocks_split_across_chunks_are_dropped(self):
+        think_filter = ThinkBlockFilter()
+        chunks = ["Hello <thi", "nk>hidden</th", "ink>world <", "b>"]
+        text = "".join(think_filter.feed(chunk) for chunk in chunks) + think_filter.flush()
+        self.assertEqual(text, "Hello world <b>")
+
+    def test_tokens_are_streamed_and_report_is_saved_at_the_end(self):
+        company = Company.objects.create(name="Acme", industry="Software", cerebras_fit_score=8)
+        with mock.patch.object(CompanyResearchService, "get_product_offerings_only", return_value={}), \
+                mock.patch("companies.services.cerebras_service.AIResearchService.stream_text",
+                           return_value=iter(["# Acme", " report"])):
+            response = self.client.get(reverse("companies:customer-report-stream"), {"company_id": company.id})
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            body = b"".join(response.streaming_content).decode()
+
+        events = re.findall(r"event: (\w+)\ndata: (.*)\n\n", body)
+        self.assertEqual([name for name, _ in events], ["token", "token", "done"])
+        done = json.loads(events[-1][1])
+        report = Report.objects.get(id=done["report_id"])
+        self.assertEqual(report.company, company)
+        self.assertEqual(report.content, "# Acme report")
+
+    def test_portfolio_stream_saves_a_comprehensive_report(self):
+        Company.objects.create(name="Acme", industry="Software", cerebras_fit_score=8)
+        with mock.patch.object(CompanyResearchService, "get_product_offerings_only", return_value={}), \
+                mock.patch("companies.services.cerebras_service.AIResearchService.stream_text",
+                           return_value=iter(["# Portfolio"])):
+            response = self.client.get(reverse("companies:customer-report-stream"))
+            body = b"".join(response.streaming_content).decode()
+
+        done = json.loads(re.findall(r"event: done\ndata: (.*)\n\n", body)[0])
+        report = Report.objects.get(id=done["report_id"])
+        self.assertEqual(report.report_type, "comprehensive")
+        self.assertIn("# Portfolio", report.content)
+        self.assertEqual(report.metadata["total_companies"], 1)
+        self.assertGreater(report.metadata["prompt_tokens"], 0)
+
+    def test_failed_stream_reports_an_error_and_saves_nothing(self):
+        company = Company.objects.create(name="Acme", industry="Software")
+
+        def failing_stream(*args, **kwargs):
+            yield "partial"
+            raise RuntimeError("connection dropped")
+
+        with mock.patch.object(CompanyResearchService, "get_product_offerings_only", return_value={}), \
+                mock.patch("companies.services.cerebras_service.AIResearchService.stream_text",
+                           side_effect=failing_stream):
+            response = self.client.get(reverse("companies:customer-report-stream"), {"company_id": company.id})
+            body = b"".join(response.streaming_content).decode()
+
+        self.assertIn("event: error", body)
+        self.assertFalse(Report.objects.exists())
+
+
+class StreamingJSONExtractorTestCase(SimpleTestCase):
+    """
+    Test cases for incremental JSON extraction from streamed model output
+    """
+
+    OUTPUT = (
+        '<think>[{"draft": true}]</think>Here you go:\n```json\n[\n'
+        '  {"name": "Ada", "linkedin_url": "https://linkedin.com/in/ada"}, // primary\n'
+        '  /* next */ {"name": "Bob \\"B\\" }", "tags": ["x",],},\n'
+        ']\n```\nLet me know if {anything} else is needed.'
+    )
+
+    def test_items_are_returned_as_soon_as_they_close(self):
+        extractor = StreamingJSONExtractor()
+        closed_after = []
+        for index, char in enumerate(self.OUTPUT):
+            for item in extractor.feed(char):
+                closed_after.append((index, item["name"]))
+        extractor.close()
+        self.assertEqual([name for _, name in closed_after], ["Ada", 'Bob "B" }'])
+        self.assertLess(closed_after[0][0], self.OUTPUT.index("/* next */"))
+        self.assertTrue(extractor.done)
+        self.assertEqual(len(extractor.result()), 2)
+
+    def test_parse_contact_research_consumes_the_stream(self):
+        chunks = [self.OUTPUT[index:index + 7] for index in range(0, len(self.OUTPUT), 7)]
+        with mock.patch("companies.services.cerebras_service.stream_cerebras", return_value=iter(chunks)):
+            contacts = AIResearchService().parse_contact_research("research", "Acme")
+        self.assertEqual([contact["name"] for contact in contacts], ["Ada", 'Bob "B" }'])
+
+    def test_contacts_closed_before_a_stream_failure_are_kept(self):
+        def failing_stream(*args, **kwargs):
+            yield '[{"name": "Ada"}, {"name": "B'
+            raise RuntimeError("connection dropped")
+
+        with mock.patch("companies.services.cerebras_service.stream_cerebras", side_effect=failing_stream):
+            contacts = AIResearchService().parse_contact_research("research", "Acme")
+        self.assertEqual(contacts, [{"name": "Ada"}])
+
+
+class JSONCleanerTestCase(SimpleTestCase):
+    """
+    Regression corpus and fuzz tests for the single-pass clean_json_response
+    """
+
+    # (model output, expected parsed value)
+    CORPUS = [
+        ('{"a": 1}', {"a": 1}),
+        ('```json\n{"a": 1}\n```', {"a": 1}),
+        ('```\n[1, 2]\n```', [1, 2]),
+        ('<think>maybe {"a": 0}?</think>\n{"a": 1}', {"a": 1}),
+        ('Sure! Here it is: {"a": 1} Let me know if {anything} else is needed.', {"a": 1}),
+        ('{"url": "https://example.com/a//b", "note": "/* kept */"}',
+         {"url": "https://example.com/a//b", "note": "/* kept */"}),
+        ('{\n  "a": 1, // the answer\n  /* multi\n line */ "b": 2\n}', {"a": 1, "b": 2}),
+        ('{"a": [1, 2,], "b": {"c": 3,},}', {"a": [1, 2], "b": {"c": 3}}),
+        ('{"quote": "she said \\"}\\" twice", "slash": "a\\\\"}', {"quote": 'she said "}" twice', "slash": "a\\"}),
+        ('{"a": "x"} {"b": "y"}', {"a": "x"}),
+        ('[{"a": 1}]\n```\n// trailing note', [{"a": 1}]),
+    ]
+
+    def test_regression_corpus(self):
+        for content, expected in self.CORPUS:
+            with self.subTest(content=content):
+                self.assertEqual(json.loads(clean_json_response(content)), expected)
+
+    def test_text_without_json_is_returned_stripped(self):
+        self.assertEqual(clean_json_response("```json\nno data found\n```"), "no data found")
+
+    def test_unbalanced_braces_stay_linear(self):
+        content = "{ \"key\": [1, " * 20000
+        started = time.perf_counter()
+        cleaned = clean_json_response(content)
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertTrue(cleaned.startswith("{"))
+
+    def test_fuzzed_responses_round_trip(self):
+        rng = random.Random(1234)
+        alphabet = 'ab /*{}[],:"\\\n\t'
+
+        def value(depth=0):
+            kind = rng.randrange(6 if depth < 3 else 4)
+            if kind == 0:
+                return rng.randint(-1000, 1000)
+            if kind == 1:
+                return "".join(rng.choice(alphabet) for _ in range(rng.randrange(12)))
+            if kind == 2:
+                return rng.choice([True, False, None])
+            if kind == 3:
+                return rng.random()
+            if kind == 4:
+                return [value(depth + 1) for _ in range(rng.randrange(4))]
+            return {f"k{i}": value(depth + 1) for i in range(rng.randrange(4))}
+
+        for _ in range(300):
+            expected = {"items": value(1), "name": value(3)}
+            body = json.dumps(expected, indent=rng.choice([None, 2]))
+            content = rng.choice(["", "<think>{draft: [}</think>", "Here you go:\n"]) + \
+                rng.choice(["", "```json\n"]) + body + rng.choice(["", "\n```", "\nHope {this} helps."])
+            self.assertEqual(json.loads(clean_json_response(content)), expected)
+
+            # The same output streamed in random chunks yields the same value
+            extractor = StreamingJSONExtractor()
+            position = 0
+            while position < len(content):
+                step = rng.randint(1, 9)
+                extractor.feed(content[position:position + step])
+                position += step
+            extractor.close()
+            self.assertEqual(extractor.result(), expected)
+
+
+def _schema_example(schema):
+    """Smallest value that satisfies one of the parse JSON schemas"""
+    if 'enum' in schema:
+        return schema['enum'][0]
+    types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+    kind = types[0]
+    if kind == 'object':
+        return {key: _schema_example(child) for key, child in schema['properties'].items()}
+    return {'string': 'x', 'integer': schema.get('minimum', 1), 'boolean': False, 'array': []}[kind]
+
+
+@mock.patch.object(AIResearchService, 'client', None)
+class StructuredOutputTestCase(SimpleTestCase):
+    """
+    Test cases for schema-constrained parsing and the repair of invalid fields
+    """
+
+    def setUp(self):
+        self.service = AIResearchService()
+        self.service.structured_output = True
+
+    def test_schema_errors_report_dotted_paths(self):
+        company = _schema_example(COMPANY_PARSE_JSON_SCHEMA)
+        self.assertEqual(schema_errors(company, COMPANY_PARSE_JSON_SCHEMA), {})
+
+        company['product_analysis']['fit_score'] = 42
+        company['business_intelligence']['competitors'] = ['Rival', 3]
+        del company['basic_info']['name']
+        self.assertEqual(schema_errors(company, COMPANY_PARSE_JSON_SCHEMA), {
+            'product_analysis.fit_score': 'must be at most 10',
+            'business_intelligence.competitors.1': 'expected string, got int',
+            'basic_info.name': 'missing',
+        })
+        # Range checks stay local; the schema sent to the model omits them
+        response_format = json_schema_response_format('company_parse', COMPANY_PARSE_JSON_SCHEMA)
+        self.assertNotIn('maximum', json.dumps(response_format))
+
+    def test_repair_call_asks_only_for_invalid_fields(self):
+        company = _schema_example(COMPANY_PARSE_JSON_SCHEMA)
+        company['basic_info']['name'] = 'Acme'
+        company['product_analysis']['fit_score'] = 'high'
+        answers = [json.dumps(company), json.dumps({'product_analysis.fit_score': 7})]
+        with mock.patch('companies.services.cerebras_service.ask_cerebras', side_effect=answers) as ask:
+            parsed = self.service.parse_company_research("research text", "Acme")
+
+        self.assertEqual(parsed['product_analysis']['fit_score'], 7)
+        self.assertEqual(parsed['basic_info']['name'], 'Acme')
+        first, repair = [call.kwargs for call in ask.call_args_list]
+        self.assertEqual(first['question'], COMPANY_PARSE_QUESTION)
+        self.assertEqual(first['model'], get_route('company_parse').model)
+        self.assertEqual(first['task'], 'company_parse')
+        self.assertEqual(first['response_format']['json_schema']['name'], 'company_parse')
+        repair_schema = repair['response_format']['json_schema']['schema']
+        self.assertEqual(list(repair_schema['properties']), ['product_analysis.fit_score'])
+        self.assertIn('product_analysis.fit_score: expected integer or null', repair['context'])
+
+    def test_unrepaired_nullable_fields_are_cleared(self):
+        contact = _schema_example(CONTACT_PARSE_JSON_SCHEMA['properties']['contacts']['items'])
+        contact['basic_info']['seniority_level'] = 'ceo'
+        path = 'contacts.0.basic_info.seniority_level'
+        answers = [json.dumps({'contacts': [contact]}), json.dumps({path: 'chief'})]
+        with mock.patch('companies.services.cerebras_service.ask_cerebras', side_effect=answers):
+            contacts = self.service.parse_contact_research("research text", "Acme")
+
+        self.assertEqual(len(contacts), 1)
+        self.assertIsNone(contacts[0]['basic_info']['seniority_level'])
+        self.assertEqual(contacts[0]['basic_info']['first_name'], 'x')
+
+    def test_failed_structured_call_falls_back_to_free_text(self):
+        answers = ["Error: response_format is not supported", '```json\n{"basic_info": {"name": "Acme"}}\n```']
+        with mock.patch('companies.services.cerebras_service.ask_cerebras', side_effect=answers) as ask:
+            parsed = self.service.parse_company_research("research text", "Acme")
+
+        self.assertEqual(parsed, {'basic_info': {'name': 'Acme'}})
+        fallback = ask.call_args_list[1].kwargs
+        self.assertEqual(fallback['question'], COMPANY_PARSE_QUESTION)
+        self.assertIsNone(fallback['response_format'])
@@ -1,8 +1,10 @@
 from django.urls import path
 from .views import (
     company_research,
+    research_job_status,
     company_list,
     customer_report,
+    customer_report_stream,
     company_delete,
     company_report,
     reports_list,
@@ -16,6 +18,9 @@ app_name = 'companies'
 urlpatterns = [
     # Company research endpoint
     path('research/', company_research, name='company-research'),
+
+    # Background research job status/progress endpoint
+    path('research/jobs/<uuid:job_id>/', research_job_status, name='research-job-status'),
     
     # Company list endpoint - gives detailed information about every company
     path('', company_list, name='company-list'),
@@ -28,6 +33,9 @@ urlpatterns = [
     # Customer report endpoint - uses Cerebras inference for detailed reports
     path('customer-report/', customer_report, name='customer-report'),
     
+    # Streaming customer report endpoint - Server-Sent Events while Cerebras generates
+    path('customer-report/stream/', customer_report_stream, name='customer-report-stream'),
+    
     # Reports management endpoints
     path('reports/', reports_list, name='reports-list'),
     path('reports/<int:report_id>/', report_detail, name='report-detail'),
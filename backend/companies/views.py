@@ -1,11 +1,15 @@
 from rest_framework.decorators import api_view
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.db.models import Count, Q
 from django.utils import timezone
+import json
 import logging
 
-from .models import Company, Report
+from .models import Company, Report, ResearchJob
+from .pagination import CompanyCursorPagination
 from .services.research_service import CompanyResearchService
+from .tasks import start_research_job_task
 
 logger = logging.getLogger(__name__)
 
@@ -24,17 +28,25 @@ def company_research(request):
     {
         "company_name": "string" OR
         "company_names": ["string1", "string2", ...] OR
-        "max_customers": integer (for auto-discovery from company_offerings.json)
+        "max_customers": integer (for auto-discovery from company_offerings.json),
+        "background": boolean (optional - enqueue a research job and return its id immediately),
+        "force_refresh": boolean (optional - refetch every research phase, ignoring phase TTLs and cached provider responses)
     }
 
     Returns:
-        JsonResponse: Research results with company data and fit scores
+        JsonResponse: Research results with company data and fit scores,
+        or 202 with a job_id to poll when "background" is set
     """
     try:
         logger.info("Company research API endpoint called")
 
         data = request.data
+
+        if data.get('background'):
+            return _submit_research_job(data)
+
         research_service = CompanyResearchService()
+        force_refresh = bool(data.get('force_refresh', False))
 
         # Auto-discovery mode - find potential customers from company_offerings.json
         if 'max_customers' in data and not ('company_name' in data or 'company_names' in data):
@@ -69,7 +81,7 @@ def company_research(request):
             company_name = data['company_name']
             logger.info(f"Starting research for company: {company_name}")
 
-            company = research_service.research_and_save_company(company_name)
+            company = research_service.research_and_save_company(company_name, force_refresh=force_refresh)
 
             return JsonResponse({
                 'success': True,
@@ -86,7 +98,7 @@ def company_research(request):
             company_names = data['company_names']
             logger.info(f"Starting batch research for {len(company_names)} companies")
 
-            companies = research_service.batch_research_companies_parallel(company_names)
+            companies = research_service.batch_research_companies_parallel(company_names, force_refresh=force_refresh)
 
             results = []
             for company in companies:
@@ -116,6 +128,165 @@ def company_research(request):
         }, status=500)
 
 
+def _submit_research_job(data):
+    """Create a ResearchJob for the request body and hand it to the Celery workers"""
+    if 'company_name' in data:
+        job = ResearchJob.objects.create(mode='single', company_names=[data['company_name']])
+    elif 'company_names' in data:
+        job = ResearchJob.objects.create(mode='batch', company_names=list(data['company_names']))
+    elif 'max_customers' in data:
+        job = ResearchJob.objects.create(mode='discovery', max_customers=data['max_customers'])
+    else:
+        return JsonResponse({
+            'error': 'Either company_name, company_names, or max_customers must be provided'
+        }, status=400)
+
+    start_research_job_task.delay(str(job.id))
+    logger.info(f"Queued research job {job.id} ({job.mode})")
+
+    return JsonResponse({
+        'success': True,
+        'message': 'Research job queued',
+        'job_id': str(job.id),
+        'status': job.status
+    }, status=202)
+
+
+@api_view(['GET'])
+def research_job_status(request, job_id):
+    """
+    Research Job Status API Endpoint
+
+    GET /api/companies/research/jobs/{job_id}/
+
+    Returns the status and progress of a background research job, with the
+    companies researched so far
+    """
+    try:
+        job = get_object_or_404(ResearchJob, id=job_id)
+
+        results = []
+        for company in job.companies.all().order_by('name'):
+            results.append({
+                'company_id': company.id,
+                'company_name': company.name,
+                'fit_score': company.cerebras_fit_score,
+                'recommended_product': company.recommended_cerebras_product,
+                'outreach_readiness': f"{company.get_outreach_readiness()}%"
+            })
+
+        return JsonResponse({
+            'success': True,
+            'job_id': str(job.id),
+            'mode': job.mode,
+            'status': job.status,
+            'progress': job.get_progress(),
+            'total_companies': job.total_companies,
+            'completed_companies': job.completed_companies,
+            'failed_companies': job.failed_companies,
+            'company_names': job.company_names,
+            'error': job.error,
+            'created_at': job.created_at.isoformat(),
+            'started_at': job.started_at.isoformat() if job.started_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+            'results': results
+        })
+
+    except Exception as e:
+        logger.error(f"Failed to get research job {job_id}: {e}")
+        return JsonResponse({
+            'error': f'Failed to get research job: {str(e)}'
+        }, status=500)
+
+
+# Company list projection: response key -> model fields it reads
+COMPANY_LIST_FIELDS = {
+    'id': ('id',),
+    'name': ('name',),
+    'website': ('website',),
+    'description': ('description',),
+    'industry': ('industry',),
+    'sector': ('sector',),
+    'headquarters_location': ('headquarters_location',),
+    'founded_year': ('founded_year',),
+    'employee_count': ('employee_count',),
+    'employee_count_exact': ('employee_count_exact',),
+
+    # Financial info
+    'ipo_status': ('ipo_status',),
+    'total_funding': ('total_funding',),
+    'revenue': ('revenue',),
+
+    # Business intelligence
+    'business_model': ('business_model',),
+    'key_products': ('key_products',),
+    'key_technologies': ('key_technologies',),
+    'competitors': ('competitors',),
+
+    # AI/ML info
+    'ai_ml_usage': ('ai_ml_usage',),
+    'current_ai_infrastructure': ('current_ai_infrastructure',),
+    'ai_initiatives': ('ai_initiatives',),
+    'ml_use_cases': ('ml_use_cases',),
+    'data_science_team_size': ('data_science_team_size',),
+
+    # Cerebras analysis
+    'recommended_cerebras_product': ('recommended_cerebras_product',),
+    'cerebras_fit_score': ('cerebras_fit_score',),
+    'cerebras_value_proposition': ('cerebras_value_proposition',),
+    'potential_use_cases': ('potential_use_cases',),
+    'implementation_timeline': ('implementation_timeline',),
+    'estimated_budget_range': ('estimated_budget_range',),
+
+    # Metadata
+    'outreach_priority': ('outreach_priority',),
+    'outreach_readiness': (
+        'description', 'industry', 'ai_ml_usage',
+        'recommended_cerebras_product', 'cerebras_value_proposition'
+    ),
+    'research_quality_score': ('research_quality_score',),
+    'research_sources': ('research_sources',),
+    'created_at': ('created_at',),
+    'updated_at': ('updated_at',),
+
+    # Contact summary (annotated)
+    'contacts_count': (),
+    'primary_contacts_count': (),
+}
+
+
+def _serialize_list_company(company, fields, include_contacts):
+    """Serialize one company of the list, restricted to the requested fields"""
+    company_data = {}
+    for field in fields:
+        if field == 'outreach_readiness':
+            company_data[field] = f"{company.get_outreach_readiness()}%"
+        elif field in ('created_at', 'updated_at'):
+            company_data[field] = getattr(company, field).isoformat()
+        else:
+            company_data[field] = getattr(company, field)
+
+    if include_contacts:
+        # Full contact details (prefetched)
+        company_data['contacts'] = [{
+            'id': contact.id,
+            'name': contact.get_full_name(),
+            'title': contact.title,
+            'email': contact.email,
+            'linkedin_url': contact.linkedin_url,
+            'contact_priority': contact.contact_priority,
+            'seniority_level': contact.seniority_level,
+            'decision_maker': contact.decision_maker,
+            'influence_level': contact.influence_level,
+            'technical_background': contact.technical_background,
+            'ai_ml_experience': contact.ai_ml_experience,
+            'personalization_score': f"{contact.get_personalization_score()}%",
+            'research_quality_score': contact.research_quality_score
+        } for contact in company.contacts.all()]
+
+    return company_data
+
+
 @api_view(['GET'])
 def company_list(request):
     """
@@ -128,14 +299,43 @@ def company_list(request):
     - min_fit_score: integer 1-10
     - industry: string
     - has_contacts: true/false
+    - fields: comma-separated company fields to return (default: all)
+    - include_contacts: true/false - include full contact details (default: true)
+    - limit / cursor: cursor pagination ordered by id (limit defaults to 50,
+      at most 500); pass next_cursor back as cursor for the following page
 
     Returns:
-        JsonResponse: List of companies with detailed information
+        JsonResponse: One page of companies with detailed information; count is
+        the total number of companies matching the filters
     """
     try:
         logger.info("Company list API endpoint called")
 
-        queryset = Company.objects.all()
+        # Projection
+        fields_param = request.query_params.get('fields')
+        if fields_param:
+            fields = [field.strip() for field in fields_param.split(',') if field.strip()]
+            unknown = [field for field in fields if field not in COMPANY_LIST_FIELDS]
+            if unknown:
+                return JsonResponse({
+                    'error': f"Unknown fields: {', '.join(unknown)}",
+                    'available_fields': list(COMPANY_LIST_FIELDS)
+                }, status=400)
+        else:
+            fields = list(COMPANY_LIST_FIELDS)
+        include_contacts = request.query_params.get('include_contacts', 'true') != 'false'
+
+        # Contact counts come from one annotated query instead of per-row counts
+        queryset = Company.objects.annotate(
+            contacts_count=Count('contacts', distinct=True),
+            primary_contacts_count=Count('contacts', filter=Q(contacts__contact_priority='primary'), distinct=True)
+        )
+        if fields_param:
+            queryset = queryset.only('id', *{
+                model_field for field in fields for model_field in COMPANY_LIST_FIELDS[field]
+            })
+        if include_contacts:
+            queryset = queryset.prefetch_related('contacts')
 
         # Apply filters
         priority = request.query_params.get('priority')
@@ -152,93 +352,26 @@ def company_list(request):
 
         has_contacts = request.query_params.get('has_contacts')
         if has_contacts == 'true':
-            queryset = queryset.filter(contacts__isnull=False).distinct()
+            queryset = queryset.filter(contacts_count__gt=0)
         elif has_contacts == 'false':
-            queryset = queryset.filter(contacts__isnull=True)
-
-        # Serialize detailed data for every company
-        companies_data = []
-        for company in queryset:
-            contacts_count = company.contacts.count()
-            primary_contacts = company.contacts.filter(contact_priority='primary').count()
-
-            # Get contact details
-            contacts_data = []
-            for contact in company.contacts.all():
-                contacts_data.append({
-                    'id': contact.id,
-                    'name': contact.get_full_name(),
-                    'title': contact.title,
-                    'email': contact.email,
-                    'linkedin_url': contact.linkedin_url,
-                    'contact_priority': contact.contact_priority,
-                    'seniority_level': contact.seniority_level,
-                    'decision_maker': contact.decision_maker,
-                    'influence_level': contact.influence_level,
-                    'technical_background': contact.technical_background,
-                    'ai_ml_experience': contact.ai_ml_experience,
-                    'personalization_score': f"{contact.get_personalization_score()}%",
-                    'research_quality_score': contact.research_quality_score
-                })
+            queryset = queryset.filter(contacts_count=0)
 
-            companies_data.append({
-                'id': company.id,
-                'name': company.name,
-                'website': company.website,
-                'description': company.description,
-                'industry': company.industry,
-                'sector': company.sector,
-                'headquarters_location': company.headquarters_location,
-                'founded_year': company.founded_year,
-                'employee_count': company.employee_count,
-                'employee_count_exact': company.employee_count_exact,
-
-                # Financial info
-                'ipo_status': company.ipo_status,
-                'total_funding': company.total_funding,
-                'revenue': company.revenue,
-
-                # Business intelligence
-                'business_model': company.business_model,
-                'key_products': company.key_products,
-                'key_technologies': company.key_technologies,
-                'competitors': company.competitors,
-
-                # AI/ML info
-                'ai_ml_usage': company.ai_ml_usage,
-                'current_ai_infrastructure': company.current_ai_infrastructure,
-                'ai_initiatives': company.ai_initiatives,
-                'ml_use_cases': company.ml_use_cases,
-                'data_science_team_size': company.data_science_team_size,
-
-                # Cerebras analysis
-                'recommended_cerebras_product': company.recommended_cerebras_product,
-                'cerebras_fit_score': company.cerebras_fit_score,
-                'cerebras_value_proposition': company.cerebras_value_proposition,
-                'potential_use_cases': company.potential_use_cases,
-                'implementation_timeline': company.implementation_timeline,
-                'estimated_budget_range': company.estimated_budget_range,
-
-                # Metadata
-                'outreach_priority': company.outreach_priority,
-                'outreach_readiness': f"{company.get_outreach_readiness()}%",
-                'research_quality_score': company.research_quality_score,
-                'research_sources': company.research_sources,
-                'created_at': company.created_at.isoformat(),
-                'updated_at': company.updated_at.isoformat(),
-
-                # Contact summary
-                'contacts_count': contacts_count,
-                'primary_contacts_count': primary_contacts,
-
-                # Full contact details
-                'contacts': contacts_data
-            })
+        # Always paginated, so a request never loads the whole table
+        paginator = CompanyCursorPagination()
+        companies = paginator.paginate_queryset(queryset, request)
+
+        companies_data = [
+            _serialize_list_company(company, fields, include_contacts)
+            for company in companies
+        ]
 
         return JsonResponse({
             'success': True,
-            'count': len(companies_data),
-            'companies': companies_data
+            'count': queryset.count(),
+            'companies': companies_data,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'next_cursor': paginator.get_next_cursor(),
         })
 
     except Exception as e:
@@ -248,6 +381,64 @@ def company_list(request):
         }, status=500)
 
 
+def _save_company_report(company, report_content, comprehensive_data, metadata_from_report):
+    """Create or refresh the active report for a company"""
+    # Get or create report for this company (update existing if present)
+    report, created = Report.objects.get_or_create(
+        company=company,
+        report_type='company',
+        is_archived=False,
+        defaults={
+            'title': f"Customer Analysis Report - {company.name}",
+            'content': report_content,  # Store only the markdown content
+            'metadata': {
+                'generated_by': 'cerebras_ai',
+                'company_fit_score': company.cerebras_fit_score,
+                'recommended_product': company.recommended_cerebras_product,
+                'comprehensive_data': comprehensive_data,
+                **metadata_from_report
+            }
+        }
+    )
+    
+    # If report already existed, update it with new content
+    if not created:
+        report.content = report_content  # Store only the markdown content
+        report.metadata = {
+            'generated_by': 'cerebras_ai',
+            'company_fit_score': company.cerebras_fit_score,
+            'recommended_product': company.recommended_cerebras_product,
+            'updated_at': timezone.now().isoformat(),
+            'comprehensive_data': comprehensive_data,
+            **metadata_from_report
+        }
+        report.is_edited = False  # Reset edited flag since it's regenerated
+        report.save()
+    return report
+
+
+def _save_comprehensive_report(reports, total_companies):
+    """Store a portfolio-wide report (no specific company) from the comprehensive report result dict"""
+    return Report.objects.create(
+        title="Comprehensive Customer Analysis Report",
+        report_type='comprehensive',
+        content=str(reports),
+        company=None,  # No specific company for comprehensive reports
+        metadata={
+            'generated_by': 'cerebras_ai',
+            'total_companies': total_companies,
+            'generation_date': timezone.now().isoformat(),
+            'prompt_tokens': reports.get('prompt_tokens'),
+            'prompt_sections': reports.get('prompt_sections'),
+        }
+    )
+
+
+def _sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @api_view(['POST'])
 def customer_report(request):
     """
@@ -285,37 +476,7 @@ def customer_report(request):
                 comprehensive_data = {}
                 metadata_from_report = {}
             
-            # Get or create report for this company (update existing if present)
-            report, created = Report.objects.get_or_create(
-                company=company,
-                report_type='company',
-                is_archived=False,
-                defaults={
-                    'title': f"Customer Analysis Report - {company.name}",
-                    'content': report_content,  # Store only the markdown content
-                    'metadata': {
-                        'generated_by': 'cerebras_ai',
-                        'company_fit_score': company.cerebras_fit_score,
-                        'recommended_product': company.recommended_cerebras_product,
-                        'comprehensive_data': comprehensive_data,
-                        **metadata_from_report
-                    }
-                }
-            )
-            
-            # If report already existed, update it with new content
-            if not created:
-                report.content = report_content  # Store only the markdown content
-                report.metadata = {
-                    'generated_by': 'cerebras_ai',
-                    'company_fit_score': company.cerebras_fit_score,
-                    'recommended_product': company.recommended_cerebras_product,
-                    'updated_at': timezone.now().isoformat(),
-                    'comprehensive_data': comprehensive_data,
-                    **metadata_from_report
-                }
-                report.is_edited = False  # Reset edited flag since it's regenerated
-                report.save()
+            report = _save_company_report(company, report_content, comprehensive_data, metadata_from_report)
               
             return JsonResponse({
                 'success': True,
@@ -327,23 +488,15 @@ def customer_report(request):
         else:            # Generate report for all companies
             companies = Company.objects.all()
             reports = research_service.generate_comprehensive_customer_report(companies)
+            pipeline_metrics = reports.get('pipeline_metrics')
+            total_companies = pipeline_metrics['total_companies'] if pipeline_metrics else companies.count()
             
             # Save comprehensive report to database
-            report = Report.objects.create(
-                title="Comprehensive Customer Analysis Report",
-                report_type='comprehensive',
-                content=reports if isinstance(reports, str) else str(reports),
-                company=None,  # No specific company for comprehensive reports
-                metadata={
-                    'generated_by': 'cerebras_ai',
-                    'total_companies': len(companies),
-                    'generation_date': timezone.now().isoformat(),
-                }
-            )
+            report = _save_comprehensive_report(reports, total_companies)
             
             return JsonResponse({
                 'success': True,
-                'total_companies': len(companies),
+                'total_companies': total_companies,
                 'comprehensive_report': reports,
                 'report_id': report.id
             })
@@ -355,6 +508,70 @@ def customer_report(request):
         }, status=500)
 
 
+@api_view(['GET'])
+def customer_report_stream(request):
+    """
+    Streaming Customer Report API Endpoint
+
+    GET /api/companies/customer-report/stream/?company_id={id}
+
+    Same reports as customer_report, streamed over Server-Sent Events while
+    Cerebras generates them:
+    - event "token": {"text": "..."} for every chunk of markdown
+    - event "done": {"report_id": ..., "company_id": ...} once the finished
+      report has been saved
+    - event "error": {"error": "..."} if generation fails (nothing is saved)
+
+    Without company_id the portfolio-wide report is streamed.
+    """
+    company_id = request.query_params.get('company_id')
+    research_service = CompanyResearchService()
+
+    try:
+        if company_id:
+            company = get_object_or_404(Company, id=company_id)
+            prompt = research_service.build_customer_report_prompt(company)
+        else:
+            company = None
+            prompt = research_service.build_comprehensive_report_prompt(Company.objects.all())
+    except Http404:
+        return JsonResponse({'error': 'Company not found'}, status=404)
+    except Exception as e:
+        logger.error(f"Failed to prepare streaming customer report: {e}")
+        return JsonResponse({
+            'error': f'Failed to generate customer report: {str(e)}'
+        }, status=500)
+
+    def event_stream():
+        parts = []
+        try:
+            task = 'single_report' if company is not None else 'portfolio_report'
+            for text in research_service.ai_service.stream_text(prompt['question'], prompt['context'], task=task):
+                parts.append(text)
+                yield _sse_event('token', {'text': text})
+
+            report_content = "".join(parts).strip()
+            if company is not None:
+                report = _save_company_report(
+                    company, report_content, prompt['comprehensive_data'], prompt['metadata']
+                )
+            else:
+                reports = research_service.comprehensive_report_result(prompt, report_content)
+                report = _save_comprehensive_report(reports, prompt['metrics']['total_companies'])
+            yield _sse_event('done', {
+                'report_id': report.id,
+                'company_id': company.id if company is not None else None
+            })
+        except Exception as e:
+            logger.error(f"Streaming customer report failed: {e}")
+            yield _sse_event('error', {'error': str(e)})
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
+
+
 @api_view(['DELETE'])
 def company_delete(request, company_id):
     """
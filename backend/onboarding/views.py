@@ -1,6 +1,8 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from common.clients import get_perplexity_session
 from common.utils import ask_perplexity
+from companies.services.offerings import get_offerings_repository
 import json
 import os
 from datetime import datetime
@@ -10,9 +12,9 @@ def save_company_offerings(company_data):
     Save company and product data to company_offerings.json in the format similar to chatbot_output.json
     """
     try:
-        # Define the path for the company offerings file (relative to backend directory)
-        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        file_path = os.path.join(backend_dir, 'companies', 'company_offerings.json')
+        # The shared offerings repository owns companies/company_offerings.json
+        offerings_repository = get_offerings_repository()
+        file_path = offerings_repository.path
         
         # Load existing data if file exists
         existing_data = {}
@@ -71,9 +73,8 @@ def save_company_offerings(company_data):
                 }
             }
         
-        # Save the updated data back to the file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, indent=2, ensure_ascii=False)
+        # Save the updated data back to the file (also invalidates cached offerings)
+        offerings_repository.save(existing_data)
         
         print(f"Company offerings saved to {file_path}")
         return True
@@ -108,7 +109,7 @@ class ChatbotView(APIView):
             }}
             If not found, return only: {{"found": false}}"""
             
-            result = ask_perplexity(research_prompt, context="")
+            result = ask_perplexity(research_prompt, context="", session=get_perplexity_session())
             print("DEBUG: Perplexity result:", result)
             try:
                 company_data = json.loads(result["content"])
@@ -156,7 +157,7 @@ class ChatbotView(APIView):
                 ]
             }}"""
             
-            result = ask_perplexity(research_prompt, context=open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samples', 'chatbot_output.json')).read())
+            result = ask_perplexity(research_prompt, context=open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samples', 'chatbot_output.json')).read(), session=get_perplexity_session())
             try:
                 # Handle both possible response formats from ask_perplexity
                 if isinstance(result, dict):
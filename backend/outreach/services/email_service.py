@@ -3,6 +3,7 @@ import logging
 from typing import Dict, List, Any, Optional
 from django.template import Template, Context
 from companies.services.cerebras_service import AIResearchService
+from companies.services.offerings import get_offerings_repository
 from companies.models import Company, Contact
 from outreach.models import EmailTemplate, EmailCampaign, EmailDraft
 
@@ -18,18 +19,8 @@ class EmailGenerationService:
         self.cerebras_service = AIResearchService()
         
     def get_company_offerings(self) -> Dict[str, Any]:
-        """Load Cerebras company offerings from JSON file"""
-        try:
-            import os
-            offerings_path = os.path.join(
-                os.path.dirname(__file__), 
-                '..', '..', 'companies', 'company_offerings.json'
-            )
-            with open(offerings_path, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load company offerings: {e}")
-            return {}
+        """Load Cerebras company offerings from the shared offerings repository (read-only)"""
+        return get_offerings_repository().load()
     
     def recommend_cerebras_product(self, company: Company, contact: Contact) -> str:
         """
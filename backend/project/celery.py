@@ -0,0 +1,18 @@
+"""
+Celery application for background jobs.
+
+The broker defaults to a local SQLite database (see CELERY_BROKER_URL in
+settings), so a worker can run without Redis:
+
+    celery -A project worker -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
+
+app = Celery("project")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
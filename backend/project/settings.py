@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 
+from decouple import config as env_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -144,6 +146,19 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Celery settings
+# Defaults to a SQLite broker so background research runs without Redis.
+# Set CELERY_BROKER_URL=memory:// together with CELERY_TASK_ALWAYS_EAGER=True
+# to run jobs in-process (no worker) during local development.
+CELERY_BROKER_URL = env_config(
+    'CELERY_BROKER_URL',
+    default=f"sqla+sqlite:///{BASE_DIR / 'celery_broker.sqlite3'}",
+)
+CELERY_TASK_ALWAYS_EAGER = env_config('CELERY_TASK_ALWAYS_EAGER', default=False, cast=bool)
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
 # Logging configuration
 LOGGING = {
     'version': 1,
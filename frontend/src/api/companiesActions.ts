@@ -29,8 +29,11 @@ export interface CompanyResearchResponse {
 
 export interface CompanyListResponse {
   success: boolean;
-  count: number;
+  count: number; // Total matching the filters, not the page size
   companies: Company[];
+  next?: string | null;
+  previous?: string | null;
+  next_cursor?: string | null; // Pass back as cursor for the following page
 }
 
 export interface Company {
@@ -160,12 +163,20 @@ export class CompaniesApiService extends ApiService {
     min_fit_score?: number;
     industry?: string;
     has_contacts?: boolean;
+    fields?: string[];
+    include_contacts?: boolean;
+    limit?: number;
+    cursor?: string;
   }): Promise<CompanyListResponse> {
     const queryParams = new URLSearchParams();
     if (params?.priority) queryParams.append('priority', params.priority);
     if (params?.min_fit_score) queryParams.append('min_fit_score', params.min_fit_score.toString());
     if (params?.industry) queryParams.append('industry', params.industry);
     if (params?.has_contacts !== undefined) queryParams.append('has_contacts', params.has_contacts.toString());
+    if (params?.fields?.length) queryParams.append('fields', params.fields.join(','));
+    if (params?.include_contacts !== undefined) queryParams.append('include_contacts', params.include_contacts.toString());
+    if (params?.limit) queryParams.append('limit', params.limit.toString());
+    if (params?.cursor) queryParams.append('cursor', params.cursor);
     
     const url = `/companies/${queryParams.toString() ? '?' + queryParams.toString() : ''}`;
     return this.get(url);
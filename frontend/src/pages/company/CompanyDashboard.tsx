@@ -49,14 +49,20 @@ const CompanyDashboard: React.FC = () => {
     }
   };
 
-  const loadCompanies = async () => {
+  // Loads the first page, or appends the page after `cursor` to the companies already shown
+  const loadCompanies = async (cursor?: string) => {
     const filterParams: any = {};
     if (filters.priority) filterParams.priority = filters.priority;
     if (filters.min_fit_score) filterParams.min_fit_score = parseInt(filters.min_fit_score);
     if (filters.industry) filterParams.industry = filters.industry;
     if (filters.has_contacts) filterParams.has_contacts = filters.has_contacts === 'true';
+    if (cursor) filterParams.cursor = cursor;
 
-    await executeGetCompanies(() => companiesApi.getCompanies(filterParams));
+    const loaded = cursor ? companiesState.data?.companies || [] : [];
+    await executeGetCompanies(async () => {
+      const page = await companiesApi.getCompanies(filterParams);
+      return { ...page, companies: [...loaded, ...page.companies] };
+    });
   };  const generateReport = async (companyId?: number) => {
     try {
       await executeGenerateReport(() => 
@@ -367,7 +373,7 @@ const CompanyDashboard: React.FC = () => {
           {/* Left Sidebar - Company List */}
           <div className="w-1/3 bg-white dark:bg-gray-800 rounded-lg shadow-sm border border-gray-200 dark:border-gray-700 flex flex-col">            {/* Filters */}
             <div className="p-4 border-b border-gray-200 dark:border-gray-600 bg-gray-50 dark:bg-gray-700 rounded-t-lg">
-              <h2 className="text-lg font-semibold text-gray-900 dark:text-white mb-4">Companies ({sortedCompanies.length})</h2>              <div className="space-y-3">
+              <h2 className="text-lg font-semibold text-gray-900 dark:text-white mb-4">Companies ({sortedCompanies.length}{companiesState.data && companiesState.data.count > sortedCompanies.length ? ` of ${companiesState.data.count}` : ''})</h2>              <div className="space-y-3">
                 <div className="flex gap-2">
                   <select
                     value={filters.priority}
@@ -428,7 +434,7 @@ const CompanyDashboard: React.FC = () => {
                   </select>
                 </div>
                 <button
-                  onClick={loadCompanies}
+                  onClick={() => loadCompanies()}
                   disabled={companiesState.loading}
                   className="w-full bg-blue-600 text-white py-2 rounded-md text-sm hover:bg-blue-700 disabled:opacity-50"
                 >
@@ -494,6 +500,16 @@ const CompanyDashboard: React.FC = () => {
                       </div>
                     </div>
                   ))}
+                  {companiesState.data?.next_cursor && (
+                    <div className="p-4">
+                      <button
+                        onClick={() => loadCompanies(companiesState.data?.next_cursor || undefined)}
+                        className="w-full text-blue-600 dark:text-blue-400 hover:bg-blue-50 dark:hover:bg-gray-700 py-2 rounded-md text-sm font-medium"
+                      >
+                        Load more companies
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </div>
@@ -1090,10 +1106,10 @@ const CompanyDashboard: React.FC = () => {
                                             </div>
                                           </div>
                                         ))}
-                                        {data.companies.length > 3 && (
+                                        {data.count > 3 && (
                                           <div className="text-center py-2">
                                             <span className="text-sm text-gray-500 dark:text-gray-400 italic bg-gray-50 dark:bg-gray-700 px-3 py-1 rounded-full">
-                                              +{data.companies.length - 3} more companies
+                                              +{data.count - 3} more companies
                                             </span>
                                           </div>
                                         )}
@@ -1164,10 +1180,10 @@ const CompanyDashboard: React.FC = () => {
                                             </div>
                                           ))}
                                         </div>
-                                        {data.companies.length > 6 && (
+                                        {data.count > 6 && (
                                           <div className="text-center mt-4">
                                             <span className="text-sm text-blue-600 dark:text-blue-400 italic bg-blue-50 dark:bg-blue-800 px-4 py-2 rounded-full border border-blue-200 dark:border-blue-600">
-                                              +{data.companies.length - 6} more companies interested in {product}
+                                              +{data.count - 6} more companies interested in {product}
                                             </span>
                                           </div>
                                         )}